@@ -99,5 +99,15 @@ def dev(
     )
 
 
+@app.command()
+def webhooks():
+    """Delivers queued webhook notifications, apart from the API processes."""
+    import asyncio
+
+    from open_webui.utils.webhook_outbox import WEBHOOK_OUTBOX
+
+    asyncio.run(WEBHOOK_OUTBOX.run())
+
+
 if __name__ == "__main__":
     app()
@@ -3,6 +3,7 @@ import logging
 import os
 import shutil
 import base64
+import time
 import redis
 
 from datetime import datetime
@@ -256,50 +257,102 @@ class PersistentConfig(Generic[T]):
 
 
 class AppConfig:
+    """
+    Serves config values from an in-process snapshot. With Redis, changes are
+    published to the other instances, which reload the changed key. A version
+    counter, checked at most every `_version_check_interval` seconds, bounds
+    how long a missed message can leave a value stale.
+    """
+
     _state: dict[str, PersistentConfig]
     _redis: Optional[redis.Redis] = None
+    _redis_key_prefix = "open-webui:config"
+    _version_check_interval = 5
 
     def __init__(
         self, redis_url: Optional[str] = None, redis_sentinels: Optional[list] = []
     ):
         super().__setattr__("_state", {})
+        super().__setattr__("_synced", False)
+        super().__setattr__("_version", None)
+        super().__setattr__("_next_version_check", 0.0)
         if redis_url:
             super().__setattr__(
                 "_redis",
                 get_redis_connection(redis_url, redis_sentinels, decode_responses=True),
             )
+            self._subscribe()
+
+    def _subscribe(self):
+        try:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self._redis_key_prefix: self._on_message})
+            pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except Exception as e:
+            log.warning(f"Failed to subscribe to config updates: {e}")
+
+    def _on_message(self, message):
+        key = message["data"]
+        if key in self._state:
+            self._apply(key, self._redis.get(f"{self._redis_key_prefix}:{key}"))
+
+    def _apply(self, key: str, redis_value: Optional[str]):
+        if redis_value is None:
+            return
+
+        try:
+            decoded_value = json.loads(redis_value)
+
+            # Update the in-memory value if different
+            if self._state[key].value != decoded_value:
+                self._state[key].value = decoded_value
+                log.info(f"Updated {key} from Redis: {decoded_value}")
+
+        except json.JSONDecodeError:
+            log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+
+    def _check_version(self):
+        super().__setattr__(
+            "_next_version_check", time.monotonic() + self._version_check_interval
+        )
+        try:
+            version = self._redis.get(f"{self._redis_key_prefix}:version")
+            if self._synced and version == self._version:
+                return
+
+            keys = list(self._state)
+            redis_values = self._redis.mget(
+                [f"{self._redis_key_prefix}:{key}" for key in keys]
+            )
+            for key, redis_value in zip(keys, redis_values):
+                self._apply(key, redis_value)
+            super().__setattr__("_synced", True)
+            super().__setattr__("_version", version)
+        except Exception as e:
+            log.warning(f"Failed to refresh config from Redis: {e}")
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
             self._state[key] = value
+            # Pick up the value stored in Redis on the next read
+            super().__setattr__("_synced", False)
+            super().__setattr__("_next_version_check", 0.0)
         else:
             self._state[key].value = value
             self._state[key].save()
 
             if self._redis:
-                redis_key = f"open-webui:config:{key}"
+                redis_key = f"{self._redis_key_prefix}:{key}"
                 self._redis.set(redis_key, json.dumps(self._state[key].value))
+                self._redis.incr(f"{self._redis_key_prefix}:version")
+                self._redis.publish(self._redis_key_prefix, key)
 
     def __getattr__(self, key):
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
-        # If Redis is available, check for an updated value
-        if self._redis:
-            redis_key = f"open-webui:config:{key}"
-            redis_value = self._redis.get(redis_key)
-
-            if redis_value is not None:
-                try:
-                    decoded_value = json.loads(redis_value)
-
-                    # Update the in-memory value if different
-                    if self._state[key].value != decoded_value:
-                        self._state[key].value = decoded_value
-                        log.info(f"Updated {key} from Redis: {decoded_value}")
-
-                except json.JSONDecodeError:
-                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+        if self._redis and time.monotonic() >= self._next_version_check:
+            self._check_version()
 
         return self._state[key].value
 
@@ -845,6 +898,19 @@ OLLAMA_API_CONFIGS = PersistentConfig(
     {},
 )
 
+# Backend selection for models served by several Ollama instances: "latency"
+# (EWMA latency x outstanding requests), "least_requests" or "random". A
+# backend is skipped for a cooldown after a number of failed requests in a row.
+OLLAMA_LOAD_BALANCING_STRATEGY = os.environ.get(
+    "OLLAMA_LOAD_BALANCING_STRATEGY", "latency"
+)
+OLLAMA_CIRCUIT_BREAKER_THRESHOLD = int(
+    os.environ.get("OLLAMA_CIRCUIT_BREAKER_THRESHOLD", "3")
+)
+OLLAMA_CIRCUIT_BREAKER_COOLDOWN = int(
+    os.environ.get("OLLAMA_CIRCUIT_BREAKER_COOLDOWN", "30")
+)
+
 ####################################
 # OPENAI_API
 ####################################
@@ -1905,6 +1971,85 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+# Remote (OpenAI/Ollama) embedding requests: batches in flight at once, estimated
+# token budget per batch (0 for no limit) and retries on 429/5xx responses
+RAG_EMBEDDING_CONCURRENCY = int(os.environ.get("RAG_EMBEDDING_CONCURRENCY", "4"))
+RAG_EMBEDDING_MAX_BATCH_TOKENS = int(
+    os.environ.get("RAG_EMBEDDING_MAX_BATCH_TOKENS", "0")
+)
+RAG_EMBEDDING_MAX_RETRIES = int(os.environ.get("RAG_EMBEDDING_MAX_RETRIES", "3"))
+
+# Chunks embedded and inserted into the vector DB at a time when saving documents
+RAG_INGESTION_BATCH_SIZE = int(os.environ.get("RAG_INGESTION_BATCH_SIZE", "256"))
+
+# Embedding cache: in-process LRU in front of SQLite (or Redis when configured)
+ENABLE_RAG_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE", "True").lower() == "true"
+)
+# Memory used by the in-process LRU of each worker
+RAG_EMBEDDING_CACHE_MAX_MEMORY_MB = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_MAX_MEMORY_MB", "64")
+)
+# Seconds before Redis entries expire (0 keeps them until the model changes)
+RAG_EMBEDDING_CACHE_TTL = int(os.environ.get("RAG_EMBEDDING_CACHE_TTL", "604800"))
+# Entries kept in the SQLite store; least recently used ones are evicted
+# beyond it (0 for no limit)
+RAG_EMBEDDING_CACHE_MAX_STORE_ENTRIES = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_MAX_STORE_ENTRIES", "100000")
+)
+
+# Extraction cache: documents extracted from uploaded files, keyed by the file
+# hash and the extraction settings; least recently used entries are evicted
+# beyond the maximum size (in MB, 0 for no limit)
+ENABLE_RAG_EXTRACTION_CACHE = (
+    os.environ.get("ENABLE_RAG_EXTRACTION_CACHE", "True").lower() == "true"
+)
+RAG_EXTRACTION_CACHE_MAX_SIZE = int(
+    os.environ.get("RAG_EXTRACTION_CACHE_MAX_SIZE", "1024")
+)
+
+# Background knowledge reindex: files processed at once and rate limit
+# (0 for no limit)
+KNOWLEDGE_REINDEX_CONCURRENCY = int(
+    os.environ.get("KNOWLEDGE_REINDEX_CONCURRENCY", "4")
+)
+KNOWLEDGE_REINDEX_FILES_PER_MINUTE = int(
+    os.environ.get("KNOWLEDGE_REINDEX_FILES_PER_MINUTE", "0")
+)
+
+# Uploaded files processed at once by each worker in the background
+FILE_INGESTION_CONCURRENCY = int(os.environ.get("FILE_INGESTION_CONCURRENCY", "2"))
+
+# Webhook notifications: URLs posted to at once by each process, posts per
+# second to each URL (0 for no limit) and attempts before giving up
+WEBHOOK_NOTIFICATION_CONCURRENCY = int(
+    os.environ.get("WEBHOOK_NOTIFICATION_CONCURRENCY", "8")
+)
+WEBHOOK_NOTIFICATION_RATE_LIMIT = float(
+    os.environ.get("WEBHOOK_NOTIFICATION_RATE_LIMIT", "1")
+)
+WEBHOOK_NOTIFICATION_MAX_ATTEMPTS = int(
+    os.environ.get("WEBHOOK_NOTIFICATION_MAX_ATTEMPTS", "5")
+)
+# Seconds between checks for retries and for notifications queued by other
+# processes; notifications queued by a process it delivers right away
+WEBHOOK_NOTIFICATION_POLL_INTERVAL = float(
+    os.environ.get("WEBHOOK_NOTIFICATION_POLL_INTERVAL", "10")
+)
+# Set to False when the notifications are delivered by `open-webui webhooks`
+# instead of the API processes
+ENABLE_WEBHOOK_NOTIFICATION_DISPATCH = (
+    os.environ.get("ENABLE_WEBHOOK_NOTIFICATION_DISPATCH", "True").lower() == "true"
+)
+
+# Upper bounds for the in-memory BM25 indexes used by hybrid search
+RAG_BM25_CACHE_MAX_COLLECTIONS = int(
+    os.environ.get("RAG_BM25_CACHE_MAX_COLLECTIONS", "32")
+)
+RAG_BM25_CACHE_MAX_DOCUMENTS = int(
+    os.environ.get("RAG_BM25_CACHE_MAX_DOCUMENTS", "500000")
+)
+
 RAG_RERANKING_MODEL = PersistentConfig(
     "RAG_RERANKING_MODEL",
     "rag.reranking_model",
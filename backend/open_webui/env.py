@@ -316,6 +316,26 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Maximum number of seconds a streamed message may sit in memory before it is written
+REALTIME_CHAT_SAVE_INTERVAL = os.environ.get("REALTIME_CHAT_SAVE_INTERVAL", "1")
+try:
+    REALTIME_CHAT_SAVE_INTERVAL = float(REALTIME_CHAT_SAVE_INTERVAL)
+    if REALTIME_CHAT_SAVE_INTERVAL < 0:
+        REALTIME_CHAT_SAVE_INTERVAL = 1.0
+except ValueError:
+    REALTIME_CHAT_SAVE_INTERVAL = 1.0
+
+# Number of buffered characters that forces a write regardless of the interval
+REALTIME_CHAT_SAVE_BUFFER_SIZE = os.environ.get(
+    "REALTIME_CHAT_SAVE_BUFFER_SIZE", "4096"
+)
+try:
+    REALTIME_CHAT_SAVE_BUFFER_SIZE = int(REALTIME_CHAT_SAVE_BUFFER_SIZE)
+    if REALTIME_CHAT_SAVE_BUFFER_SIZE < 1:
+        REALTIME_CHAT_SAVE_BUFFER_SIZE = 4096
+except ValueError:
+    REALTIME_CHAT_SAVE_BUFFER_SIZE = 4096
+
 ####################################
 # REDIS
 ####################################
@@ -337,6 +357,45 @@ try:
 except ValueError:
     REDIS_SENTINEL_MAX_RETRY_COUNT = 2
 
+####################################
+# USER CACHE
+####################################
+
+# Seconds an authenticated user row and its group memberships are served from memory
+USER_CACHE_TTL = os.environ.get("USER_CACHE_TTL", "5")
+try:
+    USER_CACHE_TTL = float(USER_CACHE_TTL)
+    if USER_CACHE_TTL < 0:
+        USER_CACHE_TTL = 5.0
+except ValueError:
+    USER_CACHE_TTL = 5.0
+
+# Minimum number of seconds between two writes of a user's last_active_at
+USER_LAST_ACTIVE_UPDATE_INTERVAL = os.environ.get(
+    "USER_LAST_ACTIVE_UPDATE_INTERVAL", "60"
+)
+try:
+    USER_LAST_ACTIVE_UPDATE_INTERVAL = int(USER_LAST_ACTIVE_UPDATE_INTERVAL)
+    if USER_LAST_ACTIVE_UPDATE_INTERVAL < 0:
+        USER_LAST_ACTIVE_UPDATE_INTERVAL = 60
+except ValueError:
+    USER_LAST_ACTIVE_UPDATE_INTERVAL = 60
+
+####################################
+# MODEL REGISTRY
+####################################
+
+# Seconds before the model lists of the connections are refreshed in the background
+MODEL_REGISTRY_REFRESH_INTERVAL = os.environ.get(
+    "MODEL_REGISTRY_REFRESH_INTERVAL", "10"
+)
+try:
+    MODEL_REGISTRY_REFRESH_INTERVAL = float(MODEL_REGISTRY_REFRESH_INTERVAL)
+    if MODEL_REGISTRY_REFRESH_INTERVAL < 0:
+        MODEL_REGISTRY_REFRESH_INTERVAL = 10.0
+except ValueError:
+    MODEL_REGISTRY_REFRESH_INTERVAL = 10.0
+
 ####################################
 # UVICORN WORKERS
 ####################################
@@ -410,6 +469,25 @@ WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 
+# Seconds over which presence and model usage changes are coalesced into one
+# broadcast
+WEBSOCKET_BROADCAST_INTERVAL = os.environ.get("WEBSOCKET_BROADCAST_INTERVAL", "1")
+
+try:
+    WEBSOCKET_BROADCAST_INTERVAL = float(WEBSOCKET_BROADCAST_INTERVAL)
+except Exception:
+    WEBSOCKET_BROADCAST_INTERVAL = 1.0
+
+# Seconds between the frames of a message that is being streamed
+WEBSOCKET_CONTENT_FRAME_INTERVAL = os.environ.get(
+    "WEBSOCKET_CONTENT_FRAME_INTERVAL", "0.05"
+)
+
+try:
+    WEBSOCKET_CONTENT_FRAME_INTERVAL = float(WEBSOCKET_CONTENT_FRAME_INTERVAL)
+except Exception:
+    WEBSOCKET_CONTENT_FRAME_INTERVAL = 0.05
+
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
 if AIOHTTP_CLIENT_TIMEOUT == "":
@@ -448,6 +526,27 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA = 10
 
+# Connections kept per upstream by the shared aiohttp sessions
+AIOHTTP_CLIENT_POOL_SIZE_PER_HOST = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_SIZE_PER_HOST", "100"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_SIZE_PER_HOST = int(AIOHTTP_CLIENT_POOL_SIZE_PER_HOST)
+    if AIOHTTP_CLIENT_POOL_SIZE_PER_HOST < 1:
+        AIOHTTP_CLIENT_POOL_SIZE_PER_HOST = 100
+except Exception:
+    AIOHTTP_CLIENT_POOL_SIZE_PER_HOST = 100
+
+AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT", "30"
+)
+
+try:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = float(AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT)
+except Exception:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = 30.0
+
 ####################################
 # OFFLINE_MODE
 ####################################
@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import inspect
 import json
 import logging
@@ -321,6 +322,7 @@ from open_webui.config import (
     QUERY_GENERATION_PROMPT_TEMPLATE,
     AUTOCOMPLETE_GENERATION_PROMPT_TEMPLATE,
     AUTOCOMPLETE_GENERATION_INPUT_MAX_LENGTH,
+    ENABLE_WEBHOOK_NOTIFICATION_DISPATCH,
     AppConfig,
     reset_config,
 )
@@ -356,13 +358,18 @@ from open_webui.utils.models import (
     get_all_base_models,
     check_model_access,
 )
+from open_webui.utils.misc import is_etag_match
 from open_webui.utils.chat import (
     generate_chat_completion as chat_completion_handler,
     chat_completed as chat_completed_handler,
     chat_action as chat_action_handler,
 )
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
-from open_webui.utils.access_control import has_access
+from open_webui.utils.knowledge_reindex import resume_reindex_jobs
+from open_webui.utils.file_ingestion import FILE_INGESTION_QUEUE
+from open_webui.utils.webhook_outbox import WEBHOOK_OUTBOX
+from open_webui.utils.user_cache import USER_CACHE
+from open_webui.utils.access_control import has_access, get_user_group_ids
 
 from open_webui.utils.auth import (
     get_license_data,
@@ -373,11 +380,13 @@ from open_webui.utils.auth import (
 )
 from open_webui.utils.oauth import OAuthManager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
+from open_webui.utils.session_pool import SESSION_POOL
 
 from open_webui.tasks import (
     list_task_ids_by_chat_id,
     stop_task,
     list_tasks,
+    start_task_registry,
 )  # Import from tasks.py
 
 from open_webui.utils.redis import get_sentinels_from_env
@@ -434,8 +443,18 @@ async def lifespan(app: FastAPI):
         get_license_data(app, LICENSE_KEY)
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    asyncio.create_task(resume_reindex_jobs(app))
+    await FILE_INGESTION_QUEUE.start(app)
+    if ENABLE_WEBHOOK_NOTIFICATION_DISPATCH:
+        await WEBHOOK_OUTBOX.start()
+    await start_task_registry()
     yield
 
+    await FILE_INGESTION_QUEUE.stop()
+    await WEBHOOK_OUTBOX.stop()
+
+    await SESSION_POOL.close()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -886,6 +905,12 @@ app.add_middleware(RedirectMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
 
 
+@app.middleware("http")
+async def user_cache_request_scope(request: Request, call_next):
+    with USER_CACHE.request_scope():
+        return await call_next(request)
+
+
 @app.middleware("http")
 async def commit_session_after_request(request: Request, call_next):
     response = await call_next(request)
@@ -997,6 +1022,14 @@ if audit_level != AuditLevel.NONE:
 @app.get("/api/models")
 async def get_models(request: Request, user=Depends(get_verified_user)):
     def get_filtered_models(models, user):
+        user_group_ids = get_user_group_ids(user.id)
+        model_infos = {
+            model_info.id: model_info
+            for model_info in Models.get_models_by_ids(
+                [model["id"] for model in models if not model.get("arena")]
+            )
+        }
+
         filtered_models = []
         for model in models:
             if model.get("arena"):
@@ -1006,14 +1039,18 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
                     access_control=model.get("info", {})
                     .get("meta", {})
                     .get("access_control", {}),
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
+            model_info = model_infos.get(model["id"])
             if model_info:
                 if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
+                    user.id,
+                    type="read",
+                    access_control=model_info.access_control,
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
 
@@ -1058,7 +1095,14 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
     log.debug(
         f"/api/models returned filtered models accessible to the user: {json.dumps([model['id'] for model in models])}"
     )
-    return {"data": models}
+
+    # Clients revalidate the list with If-None-Match instead of downloading it
+    content = json.dumps({"data": models}, default=str).encode("utf-8")
+    etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if is_etag_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @app.get("/api/models/base")
@@ -1217,7 +1261,7 @@ async def stop_task_endpoint(task_id: str, user=Depends(get_verified_user)):
 
 @app.get("/api/tasks")
 async def list_tasks_endpoint(user=Depends(get_verified_user)):
-    return {"tasks": list_tasks()}
+    return {"tasks": await list_tasks()}
 
 
 @app.get("/api/tasks/chat/{chat_id}")
@@ -1226,7 +1270,7 @@ async def list_tasks_by_chat_id_endpoint(chat_id: str, user=Depends(get_verified
     if chat is None or chat.user_id != user.id:
         return {"task_ids": []}
 
-    task_ids = list_task_ids_by_chat_id(chat_id)
+    task_ids = await list_task_ids_by_chat_id(chat_id)
 
     print(f"Task IDs for chat {chat_id}: {task_ids}")
     return {"task_ids": task_ids}
@@ -0,0 +1,94 @@
+"""Add chat_message table
+
+Revision ID: 1845fb9deae7
+Revises: 3781e22d8b01
+Create Date: 2026-10-18 03:00:00.000000
+
+"""
+
+import time
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, select
+
+revision = "1845fb9deae7"
+down_revision = "3781e22d8b01"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+
+def message_to_row(chat_id: str, message_id: str, message: dict, ts: int) -> dict:
+    content = message.get("content")
+    if not isinstance(content, str):
+        content = None
+
+    return {
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "parent_id": message.get("parentId"),
+        "role": message.get("role"),
+        "model": message.get("model"),
+        "content": content,
+        "status_history": message.get("statusHistory"),
+        "data": {
+            key: value
+            for key, value in message.items()
+            if key not in ("id", "parentId", "role", "model", "statusHistory")
+            and not (key == "content" and content is not None)
+        },
+        "synced": True,
+        "created_at": message.get("timestamp") or ts,
+        "updated_at": ts,
+    }
+
+
+def upgrade():
+    chat_message_table = op.create_table(
+        "chat_message",
+        sa.Column("chat_id", sa.Text(), nullable=False, primary_key=True),
+        sa.Column("message_id", sa.Text(), nullable=False, primary_key=True),
+        sa.Column("parent_id", sa.Text(), nullable=True),
+        sa.Column("role", sa.Text(), nullable=True),
+        sa.Column("model", sa.Text(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("status_history", sa.JSON(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("synced", sa.Boolean(), nullable=True, default=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+    )
+
+    # Backfill from the `history.messages` dict of every chat
+    chat_table = table(
+        "chat",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("chat", sa.JSON()),
+    )
+
+    connection = op.get_bind()
+    chat_ids = [row.id for row in connection.execute(select(chat_table.c.id))]
+    ts = int(time.time())
+
+    for idx in range(0, len(chat_ids), BATCH_SIZE):
+        results = connection.execute(
+            select(chat_table.c.id, chat_table.c.chat).where(
+                chat_table.c.id.in_(chat_ids[idx : idx + BATCH_SIZE])
+            )
+        )
+
+        rows = []
+        for row in results:
+            messages = ((row.chat or {}).get("history") or {}).get("messages") or {}
+            for message_id, message in messages.items():
+                if isinstance(message, dict):
+                    rows.append(message_to_row(row.id, message_id, message, ts))
+
+        if rows:
+            op.bulk_insert(chat_message_table, rows)
+
+
+def downgrade():
+    op.drop_table("chat_message")
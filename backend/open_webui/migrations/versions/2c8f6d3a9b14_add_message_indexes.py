@@ -0,0 +1,34 @@
+"""Add message indexes
+
+Revision ID: 2c8f6d3a9b14
+Revises: 7e2f4b9c1a36
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+
+from alembic import op
+
+revision = "2c8f6d3a9b14"
+down_revision = "7e2f4b9c1a36"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Pages of a channel or thread, newest first
+    op.create_index(
+        "message_channel_id_parent_id_created_at_idx",
+        "message",
+        ["channel_id", "parent_id", "created_at"],
+    )
+    # Reply counts of a page of messages
+    op.create_index("message_parent_id_idx", "message", ["parent_id"])
+    op.create_index(
+        "message_reaction_message_id_idx", "message_reaction", ["message_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("message_reaction_message_id_idx", table_name="message_reaction")
+    op.drop_index("message_parent_id_idx", table_name="message")
+    op.drop_index("message_channel_id_parent_id_created_at_idx", table_name="message")
@@ -0,0 +1,44 @@
+"""Add chat unsynced messages flag
+
+Revision ID: 4f7a1c3e9d28
+Revises: 8a4d2e6f1c93
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "4f7a1c3e9d28"
+down_revision = "8a4d2e6f1c93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "chat",
+        sa.Column(
+            "has_unsynced_messages",
+            sa.Boolean(),
+            nullable=True,
+            server_default=sa.false(),
+        ),
+    )
+
+    # Flag chats that already have single-message writes pending
+    op.execute(
+        sa.text(
+            """
+            UPDATE chat SET has_unsynced_messages = :flag
+            WHERE id IN (
+                SELECT chat_id FROM chat_message WHERE synced = :synced
+            )
+            """
+        ).bindparams(flag=True, synced=False)
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("chat", schema=None) as batch_op:
+        batch_op.drop_column("has_unsynced_messages")
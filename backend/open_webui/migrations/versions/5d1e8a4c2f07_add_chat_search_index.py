@@ -0,0 +1,170 @@
+"""Add chat search index
+
+Revision ID: 5d1e8a4c2f07
+Revises: 9b3c2a7d4e51
+Create Date: 2026-10-18 06:00:00.000000
+
+"""
+
+from alembic import op
+
+revision = "5d1e8a4c2f07"
+down_revision = "9b3c2a7d4e51"
+branch_labels = None
+depends_on = None
+
+
+# SQLite: contentless FTS5 tables over chat titles and message contents, kept
+# up to date by triggers. The implicit rowids of chat and chat_message may
+# change on VACUUM (their primary keys are TEXT), so each indexed row gets a
+# stable integer key in a *_fts_key table instead.
+SQLITE_UPGRADE = [
+    """
+    CREATE TABLE chat_title_fts_key (
+        id INTEGER PRIMARY KEY,
+        chat_id TEXT NOT NULL UNIQUE
+    )
+    """,
+    "CREATE VIRTUAL TABLE chat_title_fts USING fts5(title, content='')",
+    """
+    CREATE TRIGGER chat_title_fts_insert AFTER INSERT ON chat BEGIN
+        INSERT INTO chat_title_fts_key(chat_id) VALUES (new.id);
+        INSERT INTO chat_title_fts(rowid, title)
+            SELECT id, new.title FROM chat_title_fts_key WHERE chat_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER chat_title_fts_delete AFTER DELETE ON chat BEGIN
+        INSERT INTO chat_title_fts(chat_title_fts, rowid, title)
+            SELECT 'delete', id, old.title FROM chat_title_fts_key WHERE chat_id = old.id;
+        DELETE FROM chat_title_fts_key WHERE chat_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER chat_title_fts_update AFTER UPDATE OF title ON chat BEGIN
+        INSERT INTO chat_title_fts(chat_title_fts, rowid, title)
+            SELECT 'delete', id, old.title FROM chat_title_fts_key WHERE chat_id = old.id;
+        INSERT INTO chat_title_fts(rowid, title)
+            SELECT id, new.title FROM chat_title_fts_key WHERE chat_id = new.id;
+    END
+    """,
+    """
+    CREATE TABLE chat_message_fts_key (
+        id INTEGER PRIMARY KEY,
+        chat_id TEXT NOT NULL,
+        message_id TEXT NOT NULL,
+        UNIQUE (chat_id, message_id)
+    )
+    """,
+    "CREATE VIRTUAL TABLE chat_message_fts USING fts5(content, content='')",
+    """
+    CREATE TRIGGER chat_message_fts_insert AFTER INSERT ON chat_message BEGIN
+        INSERT INTO chat_message_fts_key(chat_id, message_id)
+            VALUES (new.chat_id, new.message_id);
+        INSERT INTO chat_message_fts(rowid, content)
+            SELECT id, new.content FROM chat_message_fts_key
+            WHERE chat_id = new.chat_id AND message_id = new.message_id;
+    END
+    """,
+    """
+    CREATE TRIGGER chat_message_fts_delete AFTER DELETE ON chat_message BEGIN
+        INSERT INTO chat_message_fts(chat_message_fts, rowid, content)
+            SELECT 'delete', id, old.content FROM chat_message_fts_key
+            WHERE chat_id = old.chat_id AND message_id = old.message_id;
+        DELETE FROM chat_message_fts_key
+            WHERE chat_id = old.chat_id AND message_id = old.message_id;
+    END
+    """,
+    """
+    CREATE TRIGGER chat_message_fts_update AFTER UPDATE OF content ON chat_message BEGIN
+        INSERT INTO chat_message_fts(chat_message_fts, rowid, content)
+            SELECT 'delete', id, old.content FROM chat_message_fts_key
+            WHERE chat_id = old.chat_id AND message_id = old.message_id;
+        INSERT INTO chat_message_fts(rowid, content)
+            SELECT id, new.content FROM chat_message_fts_key
+            WHERE chat_id = new.chat_id AND message_id = new.message_id;
+    END
+    """,
+    # Backfill
+    "INSERT INTO chat_title_fts_key(chat_id) SELECT id FROM chat",
+    """
+    INSERT INTO chat_title_fts(rowid, title)
+        SELECT chat_title_fts_key.id, chat.title FROM chat_title_fts_key
+        JOIN chat ON chat.id = chat_title_fts_key.chat_id
+    """,
+    "INSERT INTO chat_message_fts_key(chat_id, message_id) SELECT chat_id, message_id FROM chat_message",
+    """
+    INSERT INTO chat_message_fts(rowid, content)
+        SELECT chat_message_fts_key.id, chat_message.content FROM chat_message_fts_key
+        JOIN chat_message ON chat_message.chat_id = chat_message_fts_key.chat_id
+            AND chat_message.message_id = chat_message_fts_key.message_id
+    """,
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS chat_message_fts_update",
+    "DROP TRIGGER IF EXISTS chat_message_fts_delete",
+    "DROP TRIGGER IF EXISTS chat_message_fts_insert",
+    "DROP TABLE IF EXISTS chat_message_fts",
+    "DROP TABLE IF EXISTS chat_message_fts_key",
+    "DROP TRIGGER IF EXISTS chat_title_fts_update",
+    "DROP TRIGGER IF EXISTS chat_title_fts_delete",
+    "DROP TRIGGER IF EXISTS chat_title_fts_insert",
+    "DROP TABLE IF EXISTS chat_title_fts",
+    "DROP TABLE IF EXISTS chat_title_fts_key",
+]
+
+# PostgreSQL: generated tsvector columns, computed for existing rows when they
+# are added, with GIN indexes. A tsvector is limited to 1 MB, so only the
+# start of long texts is indexed; otherwise their inserts would fail.
+SEARCH_TEXT_MAX_LENGTH = 100000
+
+POSTGRESQL_UPGRADE = [
+    f"""
+    ALTER TABLE chat ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', left(coalesce(title, ''), {SEARCH_TEXT_MAX_LENGTH}))
+    ) STORED
+    """,
+    "CREATE INDEX chat_search_vector_idx ON chat USING gin (search_vector)",
+    f"""
+    ALTER TABLE chat_message ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', left(coalesce(content, ''), {SEARCH_TEXT_MAX_LENGTH}))
+    ) STORED
+    """,
+    "CREATE INDEX chat_message_search_vector_idx ON chat_message USING gin (search_vector)",
+]
+
+POSTGRESQL_DOWNGRADE = [
+    "DROP INDEX IF EXISTS chat_message_search_vector_idx",
+    "ALTER TABLE chat_message DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS chat_search_vector_idx",
+    "ALTER TABLE chat DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def upgrade():
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == "sqlite":
+        statements = SQLITE_UPGRADE
+    elif dialect_name == "postgresql":
+        statements = POSTGRESQL_UPGRADE
+    else:
+        return
+
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == "sqlite":
+        statements = SQLITE_DOWNGRADE
+    elif dialect_name == "postgresql":
+        statements = POSTGRESQL_DOWNGRADE
+    else:
+        return
+
+    for statement in statements:
+        op.execute(statement)
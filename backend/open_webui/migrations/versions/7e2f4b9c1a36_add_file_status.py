@@ -0,0 +1,26 @@
+"""Add file processing status
+
+Revision ID: 7e2f4b9c1a36
+Revises: 5d1e8a4c2f07
+Create Date: 2026-10-18 07:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "7e2f4b9c1a36"
+down_revision = "5d1e8a4c2f07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("file", sa.Column("status", sa.Text(), nullable=True))
+    op.add_column("file", sa.Column("error", sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("file", schema=None) as batch_op:
+        batch_op.drop_column("error")
+        batch_op.drop_column("status")
@@ -0,0 +1,46 @@
+"""Add webhook notification table
+
+Revision ID: 8a4d2e6f1c93
+Revises: 2c8f6d3a9b14
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "8a4d2e6f1c93"
+down_revision = "2c8f6d3a9b14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "webhook_notification",
+        sa.Column("id", sa.Text(), nullable=False, primary_key=True),
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column("dedup_key", sa.Text(), nullable=False),
+        sa.Column("name", sa.Text(), nullable=True),
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("next_attempt_at", sa.BigInteger(), nullable=False),
+        sa.Column("claim_id", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.BigInteger(), nullable=False),
+    )
+    op.create_index(
+        "webhook_notification_status_next_attempt_at_idx",
+        "webhook_notification",
+        ["status", "next_attempt_at"],
+    )
+    op.create_index(
+        "webhook_notification_dedup_key_idx", "webhook_notification", ["dedup_key"]
+    )
+
+
+def downgrade():
+    op.drop_table("webhook_notification")
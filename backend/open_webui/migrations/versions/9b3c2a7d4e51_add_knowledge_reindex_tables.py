@@ -0,0 +1,50 @@
+"""Add knowledge reindex tables
+
+Revision ID: 9b3c2a7d4e51
+Revises: 1845fb9deae7
+Create Date: 2026-10-18 05:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "9b3c2a7d4e51"
+down_revision = "1845fb9deae7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("knowledge", sa.Column("collection_name", sa.Text(), nullable=True))
+
+    op.create_table(
+        "knowledge_reindex_job",
+        sa.Column("id", sa.Text(), nullable=False, primary_key=True),
+        sa.Column("user_id", sa.Text(), nullable=True),
+        sa.Column("status", sa.Text(), nullable=True),
+        sa.Column("total", sa.Integer(), nullable=True),
+        sa.Column("processed", sa.Integer(), nullable=True),
+        sa.Column("failed", sa.Integer(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+    )
+
+    op.create_table(
+        "knowledge_reindex_file",
+        sa.Column("job_id", sa.Text(), nullable=False, primary_key=True),
+        sa.Column("knowledge_id", sa.Text(), nullable=False, primary_key=True),
+        sa.Column("file_id", sa.Text(), nullable=False, primary_key=True),
+        sa.Column("status", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("knowledge_reindex_file")
+    op.drop_table("knowledge_reindex_job")
+
+    with op.batch_alter_table("knowledge", schema=None) as batch_op:
+        batch_op.drop_column("collection_name")
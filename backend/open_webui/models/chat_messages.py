@@ -0,0 +1,482 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Boolean, Column, Text, JSON, func
+
+####################
+# ChatMessage DB Schema
+####################
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_message"
+
+    chat_id = Column(Text, primary_key=True)
+    message_id = Column(Text, primary_key=True)
+
+    parent_id = Column(Text, nullable=True)
+    role = Column(Text, nullable=True)
+    model = Column(Text, nullable=True)
+
+    content = Column(Text, nullable=True)
+    status_history = Column(JSON, nullable=True)
+    # Remaining message fields (childrenIds, files, sources, ...)
+    data = Column(JSON, nullable=True)
+
+    # False while the row holds changes that are not yet in `chat.chat["history"]`
+    synced = Column(Boolean, default=True)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
+class ChatMessageModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    chat_id: str
+    message_id: str
+
+    parent_id: Optional[str] = None
+    role: Optional[str] = None
+    model: Optional[str] = None
+
+    content: Optional[str] = None
+    status_history: Optional[list] = None
+    data: Optional[dict] = None
+
+    synced: bool = True
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+    def to_message(self) -> dict:
+        """Rebuild the message dict in the legacy `history.messages` format."""
+        return columns_to_message(
+            self.message_id,
+            self.parent_id,
+            self.role,
+            self.model,
+            self.content,
+            self.status_history,
+            self.data,
+        )
+
+
+# Columns that make up a message, in the order `columns_to_message` takes them
+MESSAGE_COLUMNS = (
+    ChatMessage.message_id,
+    ChatMessage.parent_id,
+    ChatMessage.role,
+    ChatMessage.model,
+    ChatMessage.content,
+    ChatMessage.status_history,
+    ChatMessage.data,
+)
+
+
+def columns_to_message(
+    message_id: str,
+    parent_id: Optional[str],
+    role: Optional[str],
+    model: Optional[str],
+    content: Optional[str],
+    status_history: Optional[list],
+    data: Optional[dict],
+) -> dict:
+    message = {**(data or {}), "id": message_id}
+    message["parentId"] = parent_id
+    if role is not None:
+        message["role"] = role
+    if model is not None:
+        message["model"] = model
+    if content is not None:
+        message["content"] = content
+    if status_history is not None:
+        message["statusHistory"] = status_history
+    return message
+
+
+def message_to_columns(message: dict) -> dict:
+    """Split a legacy message dict into `chat_message` columns."""
+    content = message.get("content")
+    if not isinstance(content, str):
+        # Non-text content (e.g. multi-part lists) stays in `data` untouched
+        content = None
+
+    data = {
+        key: value
+        for key, value in message.items()
+        if key not in ("id", "parentId", "role", "model", "statusHistory")
+        and not (key == "content" and content is not None)
+    }
+
+    return {
+        "parent_id": message.get("parentId"),
+        "role": message.get("role"),
+        "model": message.get("model"),
+        "content": content,
+        "status_history": message.get("statusHistory"),
+        "data": data,
+    }
+
+
+class MessageTree:
+    """
+    Parent links of a chat's messages, so that the branch ending at a message
+    (e.g. the chat's `currentId`) can be walked without loading the messages
+    themselves.
+    """
+
+    def __init__(self, links: Optional[list[tuple[str, Optional[str]]]] = None):
+        self.parents: dict[str, Optional[str]] = dict(links or [])
+
+    def set_parent(self, message_id: str, parent_id: Optional[str]):
+        self.parents[message_id] = parent_id
+
+    def remove(self, message_id: str):
+        self.parents.pop(message_id, None)
+
+    def get_path(self, message_id: str) -> Optional[list[str]]:
+        """
+        Returns the ids from the root down to `message_id`, or None if a link
+        on the way is unknown.
+        """
+        path = []
+        current_id = message_id
+        while current_id is not None:
+            if current_id not in self.parents or len(path) > len(self.parents):
+                return None
+            path.append(current_id)
+            current_id = self.parents[current_id]
+
+        path.reverse()
+        return path
+
+
+class ChatMessageTable:
+    def __init__(self, max_trees: int = 1000):
+        # Message trees of recently used chats, kept up to date by the writes below
+        self._trees: OrderedDict[str, MessageTree] = OrderedDict()
+        self._max_trees = max_trees
+        self._lock = threading.Lock()
+
+    def _get_cached_tree(self, chat_id: str) -> Optional[MessageTree]:
+        with self._lock:
+            tree = self._trees.get(chat_id)
+            if tree is not None:
+                self._trees.move_to_end(chat_id)
+            return tree
+
+    def _update_cached_tree(self, chat_id: str, update: Callable[[MessageTree], None]):
+        with self._lock:
+            tree = self._trees.get(chat_id)
+            if tree is not None:
+                update(tree)
+
+    def _drop_trees(self, chat_ids: list[str]):
+        with self._lock:
+            for chat_id in chat_ids:
+                self._trees.pop(chat_id, None)
+
+    def get_message_tree_by_chat_id(self, chat_id: str) -> MessageTree:
+        """
+        Returns the cached tree of the chat, loading it if needed. The tree is
+        shared; only read it while holding `self._lock`.
+        """
+        tree = self._get_cached_tree(chat_id)
+        if tree is not None:
+            return tree
+
+        with get_db() as db:
+            links = (
+                db.query(ChatMessage.message_id, ChatMessage.parent_id)
+                .filter_by(chat_id=chat_id)
+                .order_by(ChatMessage.created_at)
+                .all()
+            )
+        tree = MessageTree([(message_id, parent_id) for message_id, parent_id in links])
+
+        with self._lock:
+            self._trees[chat_id] = tree
+            if len(self._trees) > self._max_trees:
+                self._trees.popitem(last=False)
+        return tree
+
+    def _get_path(self, chat_id: str, message_id: str) -> Optional[list[str]]:
+        tree = self.get_message_tree_by_chat_id(chat_id)
+        with self._lock:
+            return tree.get_path(message_id)
+
+    def get_message_list_by_chat_id_and_message_id(
+        self, chat_id: str, message_id: str
+    ) -> Optional[list[dict]]:
+        """
+        Returns the messages from the root down to `message_id`, loading only
+        those rows, or None if the message is not in the table.
+        """
+        for attempt in range(2):
+            path = self._get_path(chat_id, message_id)
+            if path is not None:
+                with get_db() as db:
+                    # Plain rows; ORM instances cost more than the query on
+                    # long branches
+                    messages = {
+                        row[0]: columns_to_message(*row)
+                        for row in db.query(*MESSAGE_COLUMNS)
+                        .filter(ChatMessage.chat_id == chat_id)
+                        .filter(ChatMessage.message_id.in_(path))
+                        .all()
+                    }
+
+                # The loaded rows must still link up into the cached path
+                if len(messages) == len(path) and all(
+                    messages[id]["parentId"] == (path[i - 1] if i else None)
+                    for i, id in enumerate(path)
+                ):
+                    return [messages[id] for id in path]
+
+            # The cached tree may predate a write made by another instance
+            self._drop_trees([chat_id])
+        return None
+
+    def get_message_by_chat_id_and_message_id(
+        self, chat_id: str, message_id: str
+    ) -> Optional[ChatMessageModel]:
+        try:
+            with get_db() as db:
+                row = db.get(ChatMessage, (chat_id, message_id))
+                return ChatMessageModel.model_validate(row) if row else None
+        except Exception:
+            return None
+
+    def get_messages_by_chat_id(self, chat_id: str) -> dict:
+        with get_db() as db:
+            rows = db.query(ChatMessage).filter_by(chat_id=chat_id).all()
+            return {
+                row.message_id: ChatMessageModel.model_validate(row).to_message()
+                for row in rows
+            }
+
+    def get_unsynced_messages_by_chat_ids(self, chat_ids: list[str]) -> dict:
+        """
+        Returns {chat_id: {message_id: message}} for rows whose changes are not
+        yet reflected in the chat JSON.
+        """
+        if not chat_ids:
+            return {}
+
+        with get_db() as db:
+            rows = (
+                db.query(ChatMessage)
+                .filter(ChatMessage.chat_id.in_(chat_ids))
+                .filter(ChatMessage.synced == False)
+                .all()
+            )
+
+            result = {}
+            for row in rows:
+                result.setdefault(row.chat_id, {})[row.message_id] = (
+                    ChatMessageModel.model_validate(row).to_message()
+                )
+            return result
+
+    def update_message_by_chat_id_and_message_id(
+        self, chat_id: str, message_id: str, message: dict
+    ) -> Optional[dict]:
+        """
+        Merges `message` into an existing row. Returns the merged message, or
+        None if the row does not exist.
+        """
+        try:
+            with get_db() as db:
+                row = db.get(ChatMessage, (chat_id, message_id))
+                if row is None:
+                    return None
+
+                merged = {
+                    **ChatMessageModel.model_validate(row).to_message(),
+                    **message,
+                }
+                for key, value in message_to_columns(merged).items():
+                    setattr(row, key, value)
+                row.synced = False
+                row.updated_at = int(time.time())
+                db.commit()
+
+                self._update_cached_tree(
+                    chat_id,
+                    lambda tree: tree.set_parent(message_id, merged.get("parentId")),
+                )
+
+                return merged
+        except Exception as e:
+            log.exception(f"Error updating chat message {message_id}: {e}")
+            return None
+
+    def append_content_by_chat_id_and_message_id(
+        self, chat_id: str, message_id: str, delta: str, length: int
+    ) -> bool:
+        """
+        Appends `delta` to the content of an existing row, if its content is
+        still `length` characters long. Returns whether it was appended.
+        """
+        try:
+            with get_db() as db:
+                count = (
+                    db.query(ChatMessage)
+                    .filter_by(chat_id=chat_id, message_id=message_id)
+                    .filter(
+                        func.length(func.coalesce(ChatMessage.content, "")) == length
+                    )
+                    .update(
+                        {
+                            "content": func.coalesce(ChatMessage.content, "") + delta,
+                            "synced": False,
+                            "updated_at": int(time.time()),
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                return count == 1
+        except Exception as e:
+            log.exception(f"Error appending to chat message {message_id}: {e}")
+            return False
+
+    def add_status_by_chat_id_and_message_id(
+        self, chat_id: str, message_id: str, status: dict
+    ) -> Optional[dict]:
+        try:
+            with get_db() as db:
+                row = db.get(ChatMessage, (chat_id, message_id))
+                if row is None:
+                    return None
+
+                row.status_history = [*(row.status_history or []), status]
+                row.synced = False
+                row.updated_at = int(time.time())
+                db.commit()
+
+                return ChatMessageModel.model_validate(row).to_message()
+        except Exception as e:
+            log.exception(f"Error adding status to chat message {message_id}: {e}")
+            return None
+
+    def sync_messages_by_chat_id(
+        self, chat_id: str, messages: dict, previous_messages: Optional[dict] = None
+    ) -> bool:
+        """
+        Mirrors the `history.messages` dict of a chat into the table, writing only
+        rows that changed and removing rows for messages that no longer exist.
+
+        `previous_messages` is the dict the rows currently mirror, if known; only
+        messages that differ from it are then loaded and written. Otherwise every
+        row of the chat is compared.
+        """
+        messages = {
+            message_id: message
+            for message_id, message in (messages or {}).items()
+            if isinstance(message, dict)
+        }
+
+        message_ids = None
+        if previous_messages is not None:
+            removed_ids = [
+                message_id
+                for message_id in previous_messages
+                if message_id not in messages
+            ]
+            messages = {
+                message_id: message
+                for message_id, message in messages.items()
+                if previous_messages.get(message_id) != message
+            }
+            message_ids = [*messages, *removed_ids]
+            if not message_ids:
+                return True
+
+        try:
+            with get_db() as db:
+                query = db.query(ChatMessage).filter_by(chat_id=chat_id)
+                if message_ids is not None:
+                    query = query.filter(ChatMessage.message_id.in_(message_ids))
+                rows = {row.message_id: row for row in query.all()}
+                ts = int(time.time())
+
+                for message_id, message in messages.items():
+                    columns = message_to_columns(message)
+                    row = rows.pop(message_id, None)
+                    if row is None:
+                        db.add(
+                            ChatMessage(
+                                chat_id=chat_id,
+                                message_id=message_id,
+                                synced=True,
+                                created_at=ts,
+                                updated_at=ts,
+                                **columns,
+                            )
+                        )
+                        continue
+
+                    changed = False
+                    for key, value in columns.items():
+                        if getattr(row, key) != value:
+                            setattr(row, key, value)
+                            changed = True
+
+                    if changed:
+                        row.updated_at = ts
+                    if changed or not row.synced:
+                        row.synced = True
+
+                for row in rows.values():
+                    db.delete(row)
+
+                db.commit()
+
+                def update_tree(tree: MessageTree):
+                    for message_id in rows:
+                        tree.remove(message_id)
+                    for message_id, message in messages.items():
+                        tree.set_parent(message_id, message.get("parentId"))
+
+                self._update_cached_tree(chat_id, update_tree)
+
+                return True
+        except Exception as e:
+            log.exception(f"Error syncing messages of chat {chat_id}: {e}")
+            return False
+
+    def delete_messages_by_chat_id(self, chat_id: str) -> bool:
+        try:
+            with get_db() as db:
+                db.query(ChatMessage).filter_by(chat_id=chat_id).delete()
+                db.commit()
+                self._drop_trees([chat_id])
+                return True
+        except Exception:
+            return False
+
+    def delete_messages_by_chat_ids(self, chat_ids: list[str]) -> bool:
+        try:
+            with get_db() as db:
+                db.query(ChatMessage).filter(ChatMessage.chat_id.in_(chat_ids)).delete()
+                db.commit()
+                self._drop_trees(chat_ids)
+                return True
+        except Exception:
+            return False
+
+
+ChatMessages = ChatMessageTable()
@@ -1,15 +1,18 @@
 import logging
 import json
+import re
 import time
 import uuid
 from typing import Optional
 
 from open_webui.internal.db import Base, get_db
 from open_webui.models.tags import TagModel, Tag, Tags
+from open_webui.models.chat_messages import ChatMessages
+from open_webui.utils.misc import get_message_list
 from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Float, Integer, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -39,6 +42,9 @@ class Chat(Base):
     meta = Column(JSON, server_default="{}")
     folder_id = Column(Text, nullable=True)
 
+    # True while `chat_message` holds single-message writes not yet in `chat`
+    has_unsynced_messages = Column(Boolean, default=False, nullable=True)
+
 
 class ChatModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -104,6 +110,65 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+def get_history_messages(chat: Optional[dict]) -> dict:
+    return ((chat or {}).get("history") or {}).get("messages") or {}
+
+
+# Chats whose title or messages match a full-text query. Title matches rank
+# first; within each group a lower score is a better match. See the
+# add_chat_search_index migration for the indexes.
+CHAT_SEARCH_HITS_SQL = {
+    "sqlite": """
+        SELECT chat_id, MAX(title_match) AS title_match, MIN(score) AS score FROM (
+            SELECT chat.id AS chat_id, 1 AS title_match, bm25(chat_title_fts) AS score
+            FROM chat_title_fts
+            JOIN chat_title_fts_key ON chat_title_fts_key.id = chat_title_fts.rowid
+            JOIN chat ON chat.id = chat_title_fts_key.chat_id
+            WHERE chat_title_fts MATCH :query AND chat.user_id = :user_id
+            UNION ALL
+            SELECT chat.id AS chat_id, 0 AS title_match,
+                bm25(chat_message_fts) AS score
+            FROM chat_message_fts
+            JOIN chat_message_fts_key
+                ON chat_message_fts_key.id = chat_message_fts.rowid
+            JOIN chat ON chat.id = chat_message_fts_key.chat_id
+            WHERE chat_message_fts MATCH :query AND chat.user_id = :user_id
+        ) AS hits
+        GROUP BY chat_id
+    """,
+    "postgresql": """
+        SELECT chat_id, MAX(title_match) AS title_match, MIN(score) AS score FROM (
+            SELECT chat.id AS chat_id, 1 AS title_match,
+                -ts_rank(chat.search_vector, query) AS score
+            FROM chat, to_tsquery('simple', :query) AS query
+            WHERE chat.search_vector @@ query AND chat.user_id = :user_id
+            UNION ALL
+            SELECT chat_message.chat_id AS chat_id, 0 AS title_match,
+                -ts_rank(chat_message.search_vector, query) AS score
+            FROM chat_message
+            JOIN chat ON chat.id = chat_message.chat_id,
+            to_tsquery('simple', :query) AS query
+            WHERE chat_message.search_vector @@ query AND chat.user_id = :user_id
+        ) AS hits
+        GROUP BY chat_id
+    """,
+}
+
+
+def get_chat_search_query(search_text: str, dialect_name: str) -> Optional[str]:
+    """
+    Turns search text into a full-text query that matches every word as a
+    prefix, so results keep up while a word is being typed.
+    """
+    words = re.findall(r"\w+", search_text)
+    if not words:
+        return None
+
+    if dialect_name == "postgresql":
+        return " & ".join(f"{word}:*" for word in words)
+    return " ".join(f'"{word}"*' for word in words)
+
+
 class ChatTable:
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
@@ -127,6 +192,10 @@ class ChatTable:
             db.add(result)
             db.commit()
             db.refresh(result)
+
+            ChatMessages.sync_messages_by_chat_id(
+                id, get_history_messages(form_data.chat), {}
+            )
             return ChatModel.model_validate(result) if result else None
 
     def import_chat(
@@ -156,18 +225,34 @@ class ChatTable:
             db.add(result)
             db.commit()
             db.refresh(result)
+
+            ChatMessages.sync_messages_by_chat_id(
+                id, get_history_messages(form_data.chat), {}
+            )
             return ChatModel.model_validate(result) if result else None
 
     def update_chat_by_id(self, id: str, chat: dict) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat_item = db.get(Chat, id)
+                # Rows match the previous JSON unless single-message writes
+                # are pending, in which case every row has to be compared
+                previous_messages = (
+                    None
+                    if chat_item.has_unsynced_messages
+                    else get_history_messages(chat_item.chat)
+                )
+
                 chat_item.chat = chat
                 chat_item.title = chat["title"] if "title" in chat else "New Chat"
+                chat_item.has_unsynced_messages = False
                 chat_item.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat_item)
 
+                ChatMessages.sync_messages_by_chat_id(
+                    id, get_history_messages(chat), previous_messages
+                )
                 return ChatModel.model_validate(chat_item)
         except Exception:
             return None
@@ -210,24 +295,87 @@ class ChatTable:
         return chat.chat.get("title", "New Chat")
 
     def get_messages_by_chat_id(self, id: str) -> Optional[dict]:
+        messages = ChatMessages.get_messages_by_chat_id(id)
+        if messages:
+            return messages
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
 
         return chat.chat.get("history", {}).get("messages", {}) or {}
 
+    def get_message_list_by_id_and_message_id(
+        self, id: str, message_id: str
+    ) -> Optional[list[dict]]:
+        """
+        Returns the branch of the chat from its root down to `message_id`.
+        Only the messages on the branch are loaded when the chat has
+        `chat_message` rows.
+        """
+        messages = ChatMessages.get_message_list_by_chat_id_and_message_id(
+            id, message_id
+        )
+        if messages is not None:
+            return messages
+
+        return get_message_list(self.get_messages_by_chat_id(id) or {}, message_id)
+
     def get_message_by_id_and_message_id(
         self, id: str, message_id: str
     ) -> Optional[dict]:
+        chat_message = ChatMessages.get_message_by_chat_id_and_message_id(
+            id, message_id
+        )
+        if chat_message:
+            return chat_message.to_message()
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
 
         return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
+    def get_current_message_id_by_id(self, id: str) -> Optional[str]:
+        try:
+            with get_db() as db:
+                return (
+                    db.query(Chat.chat[("history", "currentId")].as_string())
+                    .filter(Chat.id == id)
+                    .scalar()
+                )
+        except Exception:
+            return None
+
+    def mark_chat_unsynced_by_id(self, id: str) -> bool:
+        try:
+            with get_db() as db:
+                db.query(Chat).filter_by(id=id).update(
+                    {"has_unsynced_messages": True, "updated_at": int(time.time())}
+                )
+                db.commit()
+                return True
+        except Exception:
+            return False
+
     def upsert_message_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
+    ) -> Optional[dict]:
+        """
+        Updates a single message. When the message is already the chat's current
+        message only its `chat_message` row is written; the chat JSON picks the
+        change up on the next full save. Returns the updated message.
+        """
+        if self.get_current_message_id_by_id(id) == message_id:
+            # Flag the chat first so that readers never miss the row; a flag
+            # without unsynced rows only costs one extra query on read
+            self.mark_chat_unsynced_by_id(id)
+            result = ChatMessages.update_message_by_chat_id_and_message_id(
+                id, message_id, message
+            )
+            if result is not None:
+                return result
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
@@ -246,11 +394,36 @@ class ChatTable:
         history["currentId"] = message_id
 
         chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        if self.update_chat_by_id(id, chat) is None:
+            return None
+        return history["messages"][message_id]
+
+    def append_message_content_by_id_and_message_id(
+        self, id: str, message_id: str, delta: str, length: int
+    ) -> bool:
+        """
+        Appends `delta` to the content of the chat's current message, if that
+        is still `length` characters long. Returns whether it was appended;
+        other messages are left to `upsert_message_to_chat_by_id_and_message_id`.
+        """
+        if self.get_current_message_id_by_id(id) != message_id:
+            return False
+
+        self.mark_chat_unsynced_by_id(id)
+        return ChatMessages.append_content_by_chat_id_and_message_id(
+            id, message_id, delta, length
+        )
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
+    ) -> Optional[dict]:
+        self.mark_chat_unsynced_by_id(id)
+        result = ChatMessages.add_status_by_chat_id_and_message_id(
+            id, message_id, status
+        )
+        if result is not None:
+            return result
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
@@ -264,7 +437,9 @@ class ChatTable:
             history["messages"][message_id]["statusHistory"] = status_history
 
         chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        if self.update_chat_by_id(id, chat) is None:
+            return None
+        return history.get("messages", {}).get(message_id)
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
@@ -274,12 +449,13 @@ class ChatTable:
             if chat.share_id:
                 return self.get_chat_by_id_and_user_id(chat.share_id, "shared")
             # Create a new chat with the same data, but with a new ID
+            chat_data = self.get_chat_by_id(chat_id).chat
             shared_chat = ChatModel(
                 **{
                     "id": str(uuid.uuid4()),
                     "user_id": f"shared-{chat_id}",
                     "title": chat.title,
-                    "chat": chat.chat,
+                    "chat": chat_data,
                     "created_at": chat.created_at,
                     "updated_at": int(time.time()),
                 }
@@ -289,6 +465,10 @@ class ChatTable:
             db.commit()
             db.refresh(shared_result)
 
+            ChatMessages.sync_messages_by_chat_id(
+                shared_chat.id, get_history_messages(chat_data), {}
+            )
+
             # Update the original chat with the share_id
             result = (
                 db.query(Chat)
@@ -309,13 +489,20 @@ class ChatTable:
                 if shared_chat is None:
                     return self.insert_shared_chat_by_chat_id(chat_id)
 
+                chat_data = self.get_chat_by_id(chat_id).chat
+                # Shared chats only change through full saves
+                previous_messages = get_history_messages(shared_chat.chat)
                 shared_chat.title = chat.title
-                shared_chat.chat = chat.chat
+                shared_chat.chat = chat_data
 
                 shared_chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(shared_chat)
 
+                ChatMessages.sync_messages_by_chat_id(
+                    shared_chat.id, get_history_messages(chat_data), previous_messages
+                )
+
                 return ChatModel.model_validate(shared_chat)
         except Exception:
             return None
@@ -323,9 +510,17 @@ class ChatTable:
     def delete_shared_chat_by_chat_id(self, chat_id: str) -> bool:
         try:
             with get_db() as db:
+                shared_chat_ids = [
+                    chat.id
+                    for chat in db.query(Chat.id)
+                    .filter_by(user_id=f"shared-{chat_id}")
+                    .all()
+                ]
                 db.query(Chat).filter_by(user_id=f"shared-{chat_id}").delete()
                 db.commit()
 
+                ChatMessages.delete_messages_by_chat_ids(shared_chat_ids)
+
                 return True
         except Exception:
             return False
@@ -387,7 +582,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def get_chat_list_by_user_id(
         self,
@@ -409,7 +604,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -460,13 +655,32 @@ class ChatTable:
                 .order_by(Chat.updated_at.desc())
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
+
+    def _with_unsynced_messages(self, chats: list[Chat]) -> list[ChatModel]:
+        """
+        Validates `chats`, rebuilding `history.messages` for those that have
+        single-message writes not yet folded back into the chat JSON.
+        """
+        unsynced = ChatMessages.get_unsynced_messages_by_chat_ids(
+            [chat.id for chat in chats if chat.has_unsynced_messages]
+        )
+
+        result = []
+        for chat in chats:
+            chat = ChatModel.model_validate(chat)
+            messages = unsynced.get(chat.id)
+            if messages:
+                history = chat.chat.setdefault("history", {})
+                history["messages"] = {**history.get("messages", {}), **messages}
+            result.append(chat)
+        return result
 
     def get_chat_by_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat = db.get(Chat, id)
-                return ChatModel.model_validate(chat)
+                return self._with_unsynced_messages([chat])[0]
         except Exception:
             return None
 
@@ -488,7 +702,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._with_unsynced_messages([chat])[0]
         except Exception:
             return None
 
@@ -499,7 +713,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -508,7 +722,7 @@ class ChatTable:
                 .filter_by(user_id=user_id)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -517,7 +731,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -526,7 +740,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -537,7 +751,8 @@ class ChatTable:
         limit: int = 60,
     ) -> list[ChatModel]:
         """
-        Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        Searches the titles and messages of a user's chats through the full-text
+        index, best matches first, allowing pagination using skip and limit.
         """
         search_text = search_text.lower().strip()
 
@@ -565,29 +780,33 @@ class ChatTable:
             if not include_archived:
                 query = query.filter(Chat.archived == False)
 
-            query = query.order_by(Chat.updated_at.desc())
-
             # Check if the database dialect is either 'sqlite' or 'postgresql'
             dialect_name = db.bind.dialect.name
-            if dialect_name == "sqlite":
-                # SQLite case: using JSON1 extension for JSON searching
-                query = query.filter(
-                    (
-                        Chat.title.ilike(
-                            f"%{search_text}%"
-                        )  # Case-insensitive search in title
-                        | text(
-                            """
-                            EXISTS (
-                                SELECT 1 
-                                FROM json_each(Chat.chat, '$.messages') AS message 
-                                WHERE LOWER(message.value->>'content') LIKE '%' || :search_text || '%'
-                            )
-                            """
-                        )
-                    ).params(search_text=search_text)
+            if dialect_name not in CHAT_SEARCH_HITS_SQL:
+                raise NotImplementedError(
+                    f"Unsupported dialect: {db.bind.dialect.name}"
                 )
 
+            search_query = get_chat_search_query(search_text, dialect_name)
+            if search_query:
+                hits = (
+                    text(CHAT_SEARCH_HITS_SQL[dialect_name])
+                    .bindparams(query=search_query, user_id=user_id)
+                    .columns(chat_id=String, title_match=Integer, score=Float)
+                    .subquery("hits")
+                )
+                query = query.join(hits, hits.c.chat_id == Chat.id).order_by(
+                    hits.c.title_match.desc(), hits.c.score, Chat.updated_at.desc()
+                )
+            elif search_text:
+                # Nothing the index can match (e.g. only punctuation)
+                query = query.filter(
+                    func.lower(Chat.title).contains(search_text, autoescape=True)
+                ).order_by(Chat.updated_at.desc())
+            else:
+                query = query.order_by(Chat.updated_at.desc())
+
+            if dialect_name == "sqlite":
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -619,24 +838,6 @@ class ChatTable:
                     )
 
             elif dialect_name == "postgresql":
-                # PostgreSQL relies on proper JSON query for search
-                query = query.filter(
-                    (
-                        Chat.title.ilike(
-                            f"%{search_text}%"
-                        )  # Case-insensitive search in title
-                        | text(
-                            """
-                            EXISTS (
-                                SELECT 1
-                                FROM json_array_elements(Chat.chat->'messages') AS message
-                                WHERE LOWER(message->>'content') LIKE '%' || :search_text || '%'
-                            )
-                            """
-                        )
-                    ).params(search_text=search_text)
-                )
-
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -666,10 +867,6 @@ class ChatTable:
                             ]
                         )
                     )
-            else:
-                raise NotImplementedError(
-                    f"Unsupported dialect: {db.bind.dialect.name}"
-                )
 
             # Perform pagination at the SQL level
             all_chats = query.offset(skip).limit(limit).all()
@@ -677,7 +874,7 @@ class ChatTable:
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def get_chats_by_folder_id_and_user_id(
         self, folder_id: str, user_id: str
@@ -690,7 +887,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str
@@ -705,7 +902,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str
@@ -757,7 +954,7 @@ class ChatTable:
 
             all_chats = query.all()
             log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._with_unsynced_messages(all_chats)
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str
@@ -857,6 +1054,7 @@ class ChatTable:
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
+                ChatMessages.delete_messages_by_chat_id(id)
                 return True and self.delete_shared_chat_by_chat_id(id)
         except Exception:
             return False
@@ -864,9 +1062,11 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
-                db.query(Chat).filter_by(id=id, user_id=user_id).delete()
+                result = db.query(Chat).filter_by(id=id, user_id=user_id).delete()
                 db.commit()
 
+                if result:
+                    ChatMessages.delete_messages_by_chat_id(id)
                 return True and self.delete_shared_chat_by_chat_id(id)
         except Exception:
             return False
@@ -876,9 +1076,14 @@ class ChatTable:
             with get_db() as db:
                 self.delete_shared_chats_by_user_id(user_id)
 
+                chat_ids = [
+                    chat.id for chat in db.query(Chat.id).filter_by(user_id=user_id)
+                ]
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
+                ChatMessages.delete_messages_by_chat_ids(chat_ids)
+
                 return True
         except Exception:
             return False
@@ -888,9 +1093,17 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db() as db:
+                chat_ids = [
+                    chat.id
+                    for chat in db.query(Chat.id).filter_by(
+                        user_id=user_id, folder_id=folder_id
+                    )
+                ]
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
+                ChatMessages.delete_messages_by_chat_ids(chat_ids)
+
                 return True
         except Exception:
             return False
@@ -901,7 +1114,13 @@ class ChatTable:
                 chats_by_user = db.query(Chat).filter_by(user_id=user_id).all()
                 shared_chat_ids = [f"shared-{chat.id}" for chat in chats_by_user]
 
-                db.query(Chat).filter(Chat.user_id.in_(shared_chat_ids)).delete()
+                shared_chat_query = db.query(Chat).filter(
+                    Chat.user_id.in_(shared_chat_ids)
+                )
+                ChatMessages.delete_messages_by_chat_ids(
+                    [chat.id for chat in shared_chat_query.with_entities(Chat.id)]
+                )
+                shared_chat_query.delete()
                 db.commit()
 
                 return True
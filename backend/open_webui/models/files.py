@@ -5,7 +5,7 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Column, String, Text, JSON, or_
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -14,6 +14,18 @@ log.setLevel(SRC_LOG_LEVELS["MODELS"])
 # Files DB Schema
 ####################
 
+# Processing status of queued files: pending -> extracting -> embedding ->
+# ready, or failed. Files that were never queued have no status.
+FILE_STATUS_TRANSITIONS = {
+    "pending": {None, "ready", "failed"},
+    "extracting": {"pending"},
+    # "extracting" directly to "ready" when embedding is bypassed
+    "embedding": {"extracting"},
+    "ready": {"extracting", "embedding"},
+    "failed": {"pending", "extracting", "embedding"},
+}
+FILE_PROCESSING_STATUSES = ["pending", "extracting", "embedding"]
+
 
 class File(Base):
     __tablename__ = "file"
@@ -29,6 +41,9 @@ class File(Base):
 
     access_control = Column(JSON, nullable=True)
 
+    status = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
     created_at = Column(BigInteger)
     updated_at = Column(BigInteger)
 
@@ -48,6 +63,9 @@ class FileModel(BaseModel):
 
     access_control: Optional[dict] = None
 
+    status: Optional[str] = None
+    error: Optional[str] = None
+
     created_at: Optional[int]  # timestamp in epoch
     updated_at: Optional[int]  # timestamp in epoch
 
@@ -74,6 +92,8 @@ class FileModelResponse(BaseModel):
     data: Optional[dict] = None
     meta: FileMeta
 
+    status: Optional[str] = None
+
     created_at: int  # timestamp in epoch
     updated_at: int  # timestamp in epoch
 
@@ -95,6 +115,7 @@ class FileForm(BaseModel):
     data: dict = {}
     meta: dict = {}
     access_control: Optional[dict] = None
+    status: Optional[str] = None
 
 
 class FilesTable:
@@ -179,6 +200,73 @@ class FilesTable:
                 for file in db.query(File).filter_by(user_id=user_id).all()
             ]
 
+    def get_files_by_status(
+        self, statuses: list[str], updated_before: int
+    ) -> list[FileModel]:
+        with get_db() as db:
+            return [
+                FileModel.model_validate(file)
+                for file in db.query(File)
+                .filter(File.status.in_(statuses), File.updated_at < updated_before)
+                .all()
+            ]
+
+    def update_file_status_by_id(
+        self, id: str, status: str, error: Optional[str] = None
+    ) -> bool:
+        """
+        Moves the file to `status` if that is allowed from its current one
+        (see `FILE_STATUS_TRANSITIONS`). Returns whether it moved.
+        """
+        previous = FILE_STATUS_TRANSITIONS[status]
+        condition = File.status.in_([s for s in previous if s is not None])
+        if None in previous:
+            condition = or_(condition, File.status.is_(None))
+
+        with get_db() as db:
+            count = (
+                db.query(File)
+                .filter_by(id=id)
+                .filter(condition)
+                .update(
+                    {"status": status, "error": error, "updated_at": int(time.time())},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return count == 1
+
+    def claim_file_by_id(self, id: str, stale_before: int) -> bool:
+        """
+        Moves the file to "extracting" for this worker. Fails unless it is
+        pending, or its processing was last updated before `stale_before`.
+        """
+        with get_db() as db:
+            count = (
+                db.query(File)
+                .filter_by(id=id)
+                .filter(
+                    or_(
+                        File.status == "pending",
+                        File.status.in_(["extracting", "embedding"])
+                        & (File.updated_at < stale_before),
+                    )
+                )
+                .update(
+                    {"status": "extracting", "updated_at": int(time.time())},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return count == 1
+
+    def touch_file_by_id(self, id: str):
+        with get_db() as db:
+            db.query(File).filter_by(id=id).update(
+                {"updated_at": int(time.time())}, synchronize_session=False
+            )
+            db.commit()
+
     def update_file_hash_by_id(self, id: str, hash: str) -> Optional[FileModel]:
         with get_db() as db:
             try:
@@ -173,6 +173,17 @@ class FunctionsTable:
                 log.exception(f"Error getting function valves by id {id}: {e}")
                 return None
 
+    def get_function_valves_by_ids(self, ids: list[str]) -> dict[str, dict]:
+        if not ids:
+            return {}
+        with get_db() as db:
+            return {
+                id: valves if valves else {}
+                for id, valves in db.query(Function.id, Function.valves)
+                .filter(Function.id.in_(ids))
+                .all()
+            }
+
     def update_function_valves_by_id(
         self, id: str, valves: dict
     ) -> Optional[FunctionValves]:
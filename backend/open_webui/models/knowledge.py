@@ -14,7 +14,7 @@ from open_webui.models.users import Users, UserResponse
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import filter_by_access
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -36,6 +36,10 @@ class Knowledge(Base):
     data = Column(JSON, nullable=True)
     meta = Column(JSON, nullable=True)
 
+    # Vector DB collection holding the chunks; defaults to `id` and is switched
+    # to a freshly built collection when a reindex completes
+    collection_name = Column(Text, nullable=True)
+
     access_control = Column(JSON, nullable=True)  # Controls data access levels.
     # Defines access control rules for this entry.
     # - `None`: Public access, available to all users with the "user" role.
@@ -69,12 +73,18 @@ class KnowledgeModel(BaseModel):
     data: Optional[dict] = None
     meta: Optional[dict] = None
 
+    collection_name: Optional[str] = None
+
     access_control: Optional[dict] = None
 
     created_at: int  # timestamp in epoch
     updated_at: int  # timestamp in epoch
 
 
+def get_knowledge_collection_name(knowledge: KnowledgeModel) -> str:
+    return knowledge.collection_name or knowledge.id
+
+
 ####################
 # Forms
 ####################
@@ -129,10 +139,15 @@ class KnowledgeTable:
     def get_knowledge_bases(self) -> list[KnowledgeUserModel]:
         with get_db() as db:
             knowledge_bases = []
-            for knowledge in (
+            all_knowledge = (
                 db.query(Knowledge).order_by(Knowledge.updated_at.desc()).all()
-            ):
-                user = Users.get_user_by_id(knowledge.user_id)
+            )
+            users = Users.get_users_by_user_ids(
+                list({knowledge.user_id for knowledge in all_knowledge})
+            )
+            users_by_id = {user.id: user for user in users}
+            for knowledge in all_knowledge:
+                user = users_by_id.get(knowledge.user_id)
                 knowledge_bases.append(
                     KnowledgeUserModel.model_validate(
                         {
@@ -147,12 +162,7 @@ class KnowledgeTable:
         self, user_id: str, permission: str = "write"
     ) -> list[KnowledgeUserModel]:
         knowledge_bases = self.get_knowledge_bases()
-        return [
-            knowledge_base
-            for knowledge_base in knowledge_bases
-            if knowledge_base.user_id == user_id
-            or has_access(user_id, permission, knowledge_base.access_control)
-        ]
+        return filter_by_access(user_id, knowledge_bases, permission)
 
     def get_knowledge_by_id(self, id: str) -> Optional[KnowledgeModel]:
         try:
@@ -198,6 +208,48 @@ class KnowledgeTable:
             log.exception(e)
             return None
 
+    def get_collection_name_by_id(self, id: str) -> Optional[str]:
+        try:
+            with get_db() as db:
+                knowledge = db.query(Knowledge).filter_by(id=id).first()
+                return (
+                    (knowledge.collection_name or knowledge.id) if knowledge else None
+                )
+        except Exception:
+            return None
+
+    def get_collection_names_by_ids(self, ids: list[str]) -> dict[str, str]:
+        """Active collection names of the knowledge bases among `ids`."""
+        if not ids:
+            return {}
+        try:
+            with get_db() as db:
+                rows = (
+                    db.query(Knowledge.id, Knowledge.collection_name)
+                    .filter(Knowledge.id.in_(set(ids)))
+                    .all()
+                )
+                return {id: collection_name or id for id, collection_name in rows}
+        except Exception:
+            return {}
+
+    def update_knowledge_collection_name_by_id(
+        self, id: str, collection_name: str
+    ) -> Optional[KnowledgeModel]:
+        try:
+            with get_db() as db:
+                db.query(Knowledge).filter_by(id=id).update(
+                    {
+                        "collection_name": collection_name,
+                        "updated_at": int(time.time()),
+                    }
+                )
+                db.commit()
+                return self.get_knowledge_by_id(id=id)
+        except Exception as e:
+            log.exception(e)
+            return None
+
     def delete_knowledge_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
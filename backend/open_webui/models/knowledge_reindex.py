@@ -0,0 +1,199 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Integer, Text, JSON, or_
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# KnowledgeReindex DB Schema
+####################
+
+
+class KnowledgeReindexJob(Base):
+    __tablename__ = "knowledge_reindex_job"
+
+    id = Column(Text, primary_key=True)
+    user_id = Column(Text)
+
+    # pending -> running -> completed | failed
+    status = Column(Text)
+
+    total = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+
+    # {"knowledge_ids": [...]}
+    data = Column(JSON, nullable=True)
+
+    created_at = Column(BigInteger)
+    # Doubles as the heartbeat of the worker running the job
+    updated_at = Column(BigInteger)
+
+
+class KnowledgeReindexFile(Base):
+    __tablename__ = "knowledge_reindex_file"
+
+    job_id = Column(Text, primary_key=True)
+    knowledge_id = Column(Text, primary_key=True)
+    file_id = Column(Text, primary_key=True)
+
+    # processing | completed | failed
+    status = Column(Text)
+    error = Column(Text, nullable=True)
+
+    updated_at = Column(BigInteger)
+
+
+class KnowledgeReindexJobModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    user_id: str
+
+    status: str
+
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+
+    data: Optional[dict] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+class KnowledgeReindexTable:
+    def insert_new_job(
+        self, user_id: str, knowledge_ids: list[str], total: int
+    ) -> Optional[KnowledgeReindexJobModel]:
+        with get_db() as db:
+            job = KnowledgeReindexJobModel(
+                **{
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "status": "pending",
+                    "total": total,
+                    "data": {"knowledge_ids": knowledge_ids},
+                    "created_at": int(time.time()),
+                    "updated_at": int(time.time()),
+                }
+            )
+
+            try:
+                result = KnowledgeReindexJob(**job.model_dump())
+                db.add(result)
+                db.commit()
+                db.refresh(result)
+                return KnowledgeReindexJobModel.model_validate(result)
+            except Exception as e:
+                log.exception(e)
+                return None
+
+    def get_job_by_id(self, id: str) -> Optional[KnowledgeReindexJobModel]:
+        try:
+            with get_db() as db:
+                job = db.get(KnowledgeReindexJob, id)
+                return KnowledgeReindexJobModel.model_validate(job) if job else None
+        except Exception:
+            return None
+
+    def get_latest_job(self) -> Optional[KnowledgeReindexJobModel]:
+        with get_db() as db:
+            job = (
+                db.query(KnowledgeReindexJob)
+                .order_by(KnowledgeReindexJob.created_at.desc())
+                .first()
+            )
+            return KnowledgeReindexJobModel.model_validate(job) if job else None
+
+    def get_unfinished_jobs(self) -> list[KnowledgeReindexJobModel]:
+        with get_db() as db:
+            return [
+                KnowledgeReindexJobModel.model_validate(job)
+                for job in db.query(KnowledgeReindexJob)
+                .filter(KnowledgeReindexJob.status.in_(["pending", "running"]))
+                .order_by(KnowledgeReindexJob.created_at)
+                .all()
+            ]
+
+    def claim_job(self, job: KnowledgeReindexJobModel, stale_before: int) -> bool:
+        """
+        Marks `job` as running by this worker. Fails unless the job is still
+        pending or its last heartbeat is older than `stale_before`.
+        """
+        with get_db() as db:
+            count = (
+                db.query(KnowledgeReindexJob)
+                .filter_by(id=job.id)
+                .filter(
+                    or_(
+                        KnowledgeReindexJob.status == "pending",
+                        KnowledgeReindexJob.updated_at < stale_before,
+                    )
+                )
+                .update(
+                    {"status": "running", "updated_at": int(time.time())},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return count == 1
+
+    def update_job_by_id(self, id: str, **fields) -> Optional[KnowledgeReindexJobModel]:
+        try:
+            with get_db() as db:
+                db.query(KnowledgeReindexJob).filter_by(id=id).update(
+                    {**fields, "updated_at": int(time.time())}
+                )
+                db.commit()
+                return self.get_job_by_id(id)
+        except Exception as e:
+            log.exception(e)
+            return None
+
+    def increment_job_counter_by_id(self, id: str, failed: bool = False):
+        column = KnowledgeReindexJob.failed if failed else KnowledgeReindexJob.processed
+        with get_db() as db:
+            db.query(KnowledgeReindexJob).filter_by(id=id).update(
+                {column: column + 1, "updated_at": int(time.time())}
+            )
+            db.commit()
+
+    def get_file_statuses_by_job_id(self, job_id: str) -> dict[tuple[str, str], str]:
+        with get_db() as db:
+            return {
+                (row.knowledge_id, row.file_id): row.status
+                for row in db.query(KnowledgeReindexFile).filter_by(job_id=job_id)
+            }
+
+    def upsert_file_status(
+        self,
+        job_id: str,
+        knowledge_id: str,
+        file_id: str,
+        status: str,
+        error: Optional[str] = None,
+    ):
+        with get_db() as db:
+            row = db.get(KnowledgeReindexFile, (job_id, knowledge_id, file_id))
+            if row is None:
+                row = KnowledgeReindexFile(
+                    job_id=job_id, knowledge_id=knowledge_id, file_id=file_id
+                )
+                db.add(row)
+
+            row.status = status
+            row.error = error
+            row.updated_at = int(time.time())
+            db.commit()
+
+
+KnowledgeReindexJobs = KnowledgeReindexTable()
@@ -15,7 +15,7 @@ from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import filter_by_access
 
 
 log = logging.getLogger(__name__)
@@ -176,8 +176,13 @@ class ModelsTable:
     def get_models(self) -> list[ModelUserResponse]:
         with get_db() as db:
             models = []
-            for model in db.query(Model).filter(Model.base_model_id != None).all():
-                user = Users.get_user_by_id(model.user_id)
+            all_models = db.query(Model).filter(Model.base_model_id != None).all()
+            users = Users.get_users_by_user_ids(
+                list({model.user_id for model in all_models})
+            )
+            users_by_id = {user.id: user for user in users}
+            for model in all_models:
+                user = users_by_id.get(model.user_id)
                 models.append(
                     ModelUserResponse.model_validate(
                         {
@@ -199,12 +204,7 @@ class ModelsTable:
         self, user_id: str, permission: str = "write"
     ) -> list[ModelUserResponse]:
         models = self.get_models()
-        return [
-            model
-            for model in models
-            if model.user_id == user_id
-            or has_access(user_id, permission, model.access_control)
-        ]
+        return filter_by_access(user_id, models, permission)
 
     def get_model_by_id(self, id: str) -> Optional[ModelModel]:
         try:
@@ -214,6 +214,13 @@ class ModelsTable:
         except Exception:
             return None
 
+    def get_models_by_ids(self, ids: list[str]) -> list[ModelModel]:
+        with get_db() as db:
+            return [
+                ModelModel.model_validate(model)
+                for model in db.query(Model).filter(Model.id.in_(ids)).all()
+            ]
+
     def toggle_model_by_id(self, id: str) -> Optional[ModelModel]:
         with get_db() as db:
             try:
@@ -0,0 +1,274 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Integer, Text, JSON, and_, case, or_
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# WebhookNotification DB Schema
+####################
+
+
+class WebhookNotification(Base):
+    """Outbox of webhook notifications waiting to be delivered."""
+
+    __tablename__ = "webhook_notification"
+
+    id = Column(Text, primary_key=True)
+    url = Column(Text)
+    # Identical notifications to the same URL share a key
+    dedup_key = Column(Text)
+
+    name = Column(Text)
+    message = Column(Text)
+    data = Column(JSON, nullable=True)
+
+    # pending -> sending -> delivered (deleted) | pending (retry) | failed
+    status = Column(Text)
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    next_attempt_at = Column(BigInteger)
+    # The delivery that claimed the notification
+    claim_id = Column(Text, nullable=True)
+
+    created_at = Column(BigInteger)
+    # Doubles as the heartbeat of the delivery while sending
+    updated_at = Column(BigInteger)
+
+
+class WebhookNotificationModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    url: str
+    dedup_key: str
+
+    name: str
+    message: str
+    data: Optional[dict] = None
+
+    status: str
+    attempts: int = 0
+    error: Optional[str] = None
+    next_attempt_at: int
+    claim_id: Optional[str] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+####################
+# Forms
+####################
+
+
+class WebhookNotificationForm(BaseModel):
+    url: str
+    name: str
+    message: str
+    data: Optional[dict] = None
+
+
+def get_dedup_key(form_data: WebhookNotificationForm) -> str:
+    return hashlib.sha256(
+        json.dumps(
+            [form_data.url, form_data.message, form_data.data],
+            sort_keys=True,
+            default=str,
+        ).encode()
+    ).hexdigest()
+
+
+class WebhookNotificationTable:
+    def insert_new_notifications(
+        self, notifications: list[WebhookNotificationForm]
+    ) -> int:
+        """
+        Queues notifications, skipping those identical to one that is already
+        waiting. Returns the number queued.
+        """
+        forms = {}
+        for form_data in notifications:
+            forms.setdefault(get_dedup_key(form_data), form_data)
+        if not forms:
+            return 0
+
+        with get_db() as db:
+            waiting = {
+                dedup_key
+                for (dedup_key,) in db.query(WebhookNotification.dedup_key).filter(
+                    WebhookNotification.dedup_key.in_(list(forms)),
+                    WebhookNotification.status == "pending",
+                )
+            }
+
+            now = int(time.time())
+            for dedup_key, form_data in forms.items():
+                if dedup_key in waiting:
+                    continue
+                db.add(
+                    WebhookNotification(
+                        **{
+                            **form_data.model_dump(),
+                            "id": str(uuid.uuid4()),
+                            "dedup_key": dedup_key,
+                            "status": "pending",
+                            "attempts": 0,
+                            "next_attempt_at": now,
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                    )
+                )
+            db.commit()
+            return len(forms) - len(waiting)
+
+    def _get_due_filter(self, now: int, stale_before: int):
+        return or_(
+            and_(
+                WebhookNotification.status == "pending",
+                WebhookNotification.next_attempt_at <= now,
+            ),
+            and_(
+                WebhookNotification.status == "sending",
+                WebhookNotification.updated_at < stale_before,
+            ),
+        )
+
+    def get_due_urls(self, now: int, stale_before: int) -> list[str]:
+        """
+        URLs with notifications to deliver: pending ones whose time has come,
+        and ones left sending by a delivery that went away.
+        """
+        with get_db() as db:
+            return [
+                url
+                for (url,) in db.query(WebhookNotification.url)
+                .filter(self._get_due_filter(now, stale_before))
+                .distinct()
+            ]
+
+    def claim_notifications_by_url(
+        self, url: str, now: int, stale_before: int, limit: int
+    ) -> list[WebhookNotificationModel]:
+        """
+        Marks up to `limit` due notifications to `url` as sending by this
+        delivery, oldest first. Notifications claimed by another delivery in
+        the meantime are left out.
+        """
+        claim_id = str(uuid.uuid4())
+        with get_db() as db:
+            ids = [
+                id
+                for (id,) in db.query(WebhookNotification.id)
+                .filter(
+                    WebhookNotification.url == url,
+                    self._get_due_filter(now, stale_before),
+                )
+                .order_by(WebhookNotification.created_at)
+                .limit(limit)
+            ]
+            if not ids:
+                return []
+
+            db.query(WebhookNotification).filter(
+                WebhookNotification.id.in_(ids),
+                self._get_due_filter(now, stale_before),
+            ).update(
+                {"status": "sending", "claim_id": claim_id, "updated_at": now},
+                synchronize_session=False,
+            )
+            db.commit()
+
+            return [
+                WebhookNotificationModel.model_validate(notification)
+                for notification in db.query(WebhookNotification)
+                .filter_by(claim_id=claim_id)
+                .order_by(WebhookNotification.created_at)
+            ]
+
+    def touch_notifications_by_claim_id(self, claim_id: str) -> bool:
+        """
+        Keeps the notifications claimed by a delivery from going stale.
+        Returns False when another delivery has taken all of them over.
+        """
+        with get_db() as db:
+            count = (
+                db.query(WebhookNotification)
+                .filter_by(claim_id=claim_id, status="sending")
+                .update({"updated_at": int(time.time())}, synchronize_session=False)
+            )
+            db.commit()
+            return count > 0
+
+    def delete_notifications_by_ids(self, ids: list[str], claim_id: str):
+        """Removes delivered notifications still claimed by `claim_id`."""
+        with get_db() as db:
+            db.query(WebhookNotification).filter(
+                WebhookNotification.id.in_(ids),
+                WebhookNotification.claim_id == claim_id,
+            ).delete(synchronize_session=False)
+            db.commit()
+
+    def delete_failed_notifications(self, updated_before: int) -> int:
+        """Removes notifications that failed before `updated_before`."""
+        with get_db() as db:
+            count = (
+                db.query(WebhookNotification)
+                .filter(
+                    WebhookNotification.status == "failed",
+                    WebhookNotification.updated_at < updated_before,
+                )
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return count
+
+    def reschedule_notifications_by_ids(
+        self,
+        ids: list[str],
+        claim_id: str,
+        next_attempt_at: int,
+        error: str,
+        max_attempts: int,
+    ):
+        """
+        Records a failed attempt of notifications still claimed by
+        `claim_id`. They are retried at `next_attempt_at`, or marked as failed
+        after `max_attempts` attempts.
+        """
+        with get_db() as db:
+            db.query(WebhookNotification).filter(
+                WebhookNotification.id.in_(ids),
+                WebhookNotification.claim_id == claim_id,
+            ).update(
+                {
+                    "status": case(
+                        (
+                            WebhookNotification.attempts + 1 >= max_attempts,
+                            "failed",
+                        ),
+                        else_="pending",
+                    ),
+                    "attempts": WebhookNotification.attempts + 1,
+                    "error": error,
+                    "next_attempt_at": next_attempt_at,
+                    "claim_id": None,
+                    "updated_at": int(time.time()),
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+
+
+WebhookNotifications = WebhookNotificationTable()
@@ -0,0 +1,355 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from open_webui.config import (
+    RAG_BM25_CACHE_MAX_COLLECTIONS,
+    RAG_BM25_CACHE_MAX_DOCUMENTS,
+)
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_KEY_PREFIX,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def tokenize(text: str) -> list[str]:
+    # Same default tokenization as langchain's BM25Retriever
+    return text.split()
+
+
+class BM25Index:
+    """
+    Incrementally maintained Okapi BM25 index over the chunks of one collection.
+
+    Scores match `rank_bm25.BM25Okapi` (used by langchain's BM25Retriever), but
+    documents can be added and removed without rebuilding, and queries only
+    touch the postings of the query terms.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self.documents: dict[str, tuple[str, Any]] = {}
+        self.doc_lengths: dict[str, int] = {}
+        self.postings: dict[str, dict[str, int]] = {}
+        self.total_length = 0
+
+        self._idf: Optional[dict[str, float]] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, ids: list[str], texts: list[str], metadatas: list[Any]):
+        with self._lock:
+            self._add(ids, texts, metadatas)
+
+    def _add(self, ids: list[str], texts: list[str], metadatas: list[Any]):
+        for id, text, metadata in zip(ids, texts, metadatas):
+            if id in self.documents:
+                self._remove([id])
+
+            tokens = tokenize(text or "")
+            frequencies: dict[str, int] = {}
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0) + 1
+
+            for token, frequency in frequencies.items():
+                self.postings.setdefault(token, {})[id] = frequency
+
+            self.documents[id] = (text, metadata)
+            self.doc_lengths[id] = len(tokens)
+            self.total_length += len(tokens)
+
+        self._idf = None
+
+    def remove(self, ids: list[str]):
+        with self._lock:
+            self._remove(ids)
+
+    def _remove(self, ids: list[str]):
+        for id in ids:
+            if id not in self.documents:
+                continue
+
+            text, _ = self.documents.pop(id)
+            self.total_length -= self.doc_lengths.pop(id)
+
+            for token in set(tokenize(text or "")):
+                posting = self.postings.get(token)
+                if posting is not None:
+                    posting.pop(id, None)
+                    if not posting:
+                        del self.postings[token]
+
+        self._idf = None
+
+    def remove_where(self, filter: dict):
+        """Removes every document whose metadata contains all `filter` items."""
+        with self._lock:
+            self._remove(
+                [
+                    id
+                    for id, (_, metadata) in self.documents.items()
+                    if isinstance(metadata, dict)
+                    and all(metadata.get(key) == value for key, value in filter.items())
+                ]
+            )
+
+    def _get_idf(self) -> dict[str, float]:
+        if self._idf is None:
+            corpus_size = len(self.documents)
+            idf = {}
+            idf_sum = 0.0
+            negative_idfs = []
+            for token, posting in self.postings.items():
+                frequency = len(posting)
+                value = math.log(corpus_size - frequency + 0.5) - math.log(
+                    frequency + 0.5
+                )
+                idf[token] = value
+                idf_sum += value
+                if value < 0:
+                    negative_idfs.append(token)
+
+            eps = self.epsilon * (idf_sum / len(idf)) if idf else 0.0
+            for token in negative_idfs:
+                idf[token] = eps
+
+            self._idf = idf
+        return self._idf
+
+    def search(self, query: str, k: int) -> list[tuple[float, str, Any]]:
+        """Returns up to `k` (score, text, metadata) tuples, best first."""
+        with self._lock:
+            if not self.documents:
+                return []
+
+            idf = self._get_idf()
+            avgdl = self.total_length / len(self.documents) or 1
+
+            scores: dict[str, float] = {}
+            for token in tokenize(query):
+                posting = self.postings.get(token)
+                if not posting:
+                    continue
+
+                token_idf = idf[token]
+                for id, frequency in posting.items():
+                    length_norm = 1 - self.b + self.b * self.doc_lengths[id] / avgdl
+                    scores[id] = scores.get(id, 0.0) + token_idf * (
+                        frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                    )
+
+            top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(score, *self.documents[id]) for id, score in top]
+
+
+class BM25IndexCache:
+    """
+    LRU cache of BM25 indexes keyed by collection name.
+
+    Every mutation of a collection bumps its version stamp (in Redis when
+    configured, so all workers see it). A cached index is reused only while its
+    version matches; mutations made by this process are applied in place.
+
+    The stamps in Redis are read at most every `_version_check_interval`
+    seconds per collection, which bounds how long another worker's changes
+    go unnoticed.
+    """
+
+    _version_check_interval = 5
+
+    def __init__(
+        self,
+        max_collections: int,
+        max_documents: int,
+        redis_url: str = "",
+        redis_sentinels: Optional[list] = None,
+    ):
+        self.max_collections = max_collections
+        self.max_documents = max_documents
+
+        self._indexes: OrderedDict[str, tuple[tuple, BM25Index]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        # Versions last read from Redis, with the time of the next read
+        self._checked_versions: dict[str, tuple[float, tuple[int, int]]] = {}
+        self._epoch = 0
+        self._lock = threading.RLock()
+        self._build_locks: dict[str, threading.Lock] = {}
+
+        self._redis = (
+            get_redis_connection(redis_url, redis_sentinels, decode_responses=True)
+            if redis_url
+            else None
+        )
+
+    def _version_keys(self, collection_name: str) -> list[str]:
+        return [
+            f"{REDIS_KEY_PREFIX}:{{bm25}}:epoch",
+            f"{REDIS_KEY_PREFIX}:{{bm25}}:version:{collection_name}",
+        ]
+
+    def _get_version(self, collection_name: str) -> Optional[tuple[int, int]]:
+        """Returns (epoch, version); the epoch is bumped by `clear()`."""
+        if self._redis:
+            checked = self._checked_versions.get(collection_name)
+            if checked and time.monotonic() < checked[0]:
+                return checked[1]
+
+            try:
+                epoch, version = self._redis.mget(self._version_keys(collection_name))
+            except Exception as e:
+                log.warning(f"Failed to read BM25 index version: {e}")
+                return None
+            return self._set_checked_version(
+                collection_name, (int(epoch or 0), int(version or 0))
+            )
+        return self._epoch, self._versions.get(collection_name, 0)
+
+    def _set_checked_version(
+        self, collection_name: str, version: tuple[int, int]
+    ) -> tuple[int, int]:
+        self._checked_versions[collection_name] = (
+            time.monotonic() + self._version_check_interval,
+            version,
+        )
+        return version
+
+    def _bump_version(self, collection_name: str) -> Optional[tuple[int, int]]:
+        if self._redis:
+            try:
+                epoch_key, version_key = self._version_keys(collection_name)
+                version = self._redis.incr(version_key)
+                return self._set_checked_version(
+                    collection_name,
+                    (int(self._redis.get(epoch_key) or 0), int(version)),
+                )
+            except Exception as e:
+                log.warning(f"Failed to bump BM25 index version: {e}")
+                self._checked_versions.pop(collection_name, None)
+                return None
+        version = self._versions.get(collection_name, 0) + 1
+        self._versions[collection_name] = version
+        return self._epoch, version
+
+    def _evict(self):
+        total = sum(len(index) for _, index in self._indexes.values())
+        while self._indexes and (
+            len(self._indexes) > self.max_collections or total > self.max_documents
+        ):
+            collection_name, (_, index) = self._indexes.popitem(last=False)
+            self._checked_versions.pop(collection_name, None)
+            total -= len(index)
+            log.debug(f"Evicted BM25 index for {collection_name}")
+
+    def get(
+        self, collection_name: str, loader: Callable[[], Any]
+    ) -> Optional[BM25Index]:
+        """
+        Returns the index for `collection_name`, building it from `loader()` (a
+        vector DB `GetResult`) when missing or stale.
+        """
+        version = self._get_version(collection_name)
+        with self._lock:
+            entry = self._indexes.get(collection_name)
+            if entry and version is not None and entry[0] == version:
+                self._indexes.move_to_end(collection_name)
+                return entry[1]
+            build_lock = self._build_locks.setdefault(collection_name, threading.Lock())
+
+        with build_lock:
+            # Another thread may have built it while we waited
+            with self._lock:
+                entry = self._indexes.get(collection_name)
+                if entry and version is not None and entry[0] == version:
+                    return entry[1]
+
+            result = loader()
+            if result is None:
+                return None
+
+            index = BM25Index()
+            if result.ids:
+                index.add(result.ids[0], result.documents[0], result.metadatas[0])
+
+            with self._lock:
+                if version is not None:
+                    self._indexes[collection_name] = (version, index)
+                    self._evict()
+            return index
+
+    def _mutate(self, collection_name: str, apply: Callable[[BM25Index], None]):
+        with self._lock:
+            entry = self._indexes.get(collection_name)
+            version = self._bump_version(collection_name)
+
+            if entry is None:
+                return
+
+            # Only patch in place if nobody else changed the collection meanwhile
+            if version is not None and entry[0] == (version[0], version[1] - 1):
+                apply(entry[1])
+                self._indexes[collection_name] = (version, entry[1])
+                self._evict()
+            else:
+                self._indexes.pop(collection_name, None)
+
+    def add(
+        self,
+        collection_name: str,
+        ids: list[str],
+        texts: list[str],
+        metadatas: list[Any],
+    ):
+        self._mutate(collection_name, lambda index: index.add(ids, texts, metadatas))
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        def apply(index: BM25Index):
+            if ids:
+                index.remove(ids)
+            if filter:
+                index.remove_where(filter)
+
+        self._mutate(collection_name, apply)
+
+    def invalidate(self, collection_name: str):
+        with self._lock:
+            self._bump_version(collection_name)
+            self._indexes.pop(collection_name, None)
+
+    def clear(self):
+        with self._lock:
+            if self._redis:
+                try:
+                    self._redis.incr(f"{REDIS_KEY_PREFIX}:{{bm25}}:epoch")
+                except Exception as e:
+                    log.warning(f"Failed to bump BM25 index epoch: {e}")
+            self._epoch += 1
+            self._indexes.clear()
+            self._checked_versions.clear()
+
+
+BM25_INDEX_CACHE = BM25IndexCache(
+    max_collections=RAG_BM25_CACHE_MAX_COLLECTIONS,
+    max_documents=RAG_BM25_CACHE_MAX_DOCUMENTS,
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
@@ -0,0 +1,354 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from open_webui.config import (
+    CACHE_DIR,
+    ENABLE_RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_MAX_MEMORY_MB,
+    RAG_EMBEDDING_CACHE_MAX_STORE_ENTRIES,
+    RAG_EMBEDDING_CACHE_TTL,
+)
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_KEY_PREFIX,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Eviction frees entries down to this fraction of the maximum, so that it does
+# not run again on the next write
+EVICTION_TARGET = 0.9
+
+
+def encode_vector(vector: list[float]) -> bytes:
+    return array("d", vector).tobytes()
+
+
+def decode_vector(data: bytes) -> list[float]:
+    vector = array("d")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class SQLiteEmbeddingStore:
+    """
+    Persistent tier backed by a SQLite file shared by all workers on the host.
+
+    Reads refresh the `created_at` of an entry; once there are more than
+    `max_entries` entries, the least recently used ones are deleted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 0):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Entries in the file, counted on the first write and corrected on
+        # eviction; other workers' writes are only seen then
+        self._count: Optional[int] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding ("
+                "key TEXT PRIMARY KEY, namespace TEXT, vector BLOB, created_at INTEGER)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS embedding_namespace ON embedding (namespace)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS embedding_created_at ON embedding (created_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS config (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        result = {}
+        ts = int(time.time())
+        with self._lock:
+            for idx in range(0, len(keys), 500):
+                batch = keys[idx : idx + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embedding WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, data in rows:
+                    result[key] = data
+
+                if rows and self.max_entries:
+                    hits = [key for key, _ in rows]
+                    self.conn.execute(
+                        f"UPDATE embedding SET created_at = ? WHERE key IN ({','.join('?' * len(hits))})",
+                        [ts, *hits],
+                    )
+            if result and self.max_entries:
+                self.conn.commit()
+        return result
+
+    def set_many(self, namespace: str, items: dict[str, bytes]):
+        ts = int(time.time())
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embedding (key, namespace, vector, created_at) VALUES (?, ?, ?, ?)",
+                [(key, namespace, data, ts) for key, data in items.items()],
+            )
+            self.conn.commit()
+
+            if not self.max_entries:
+                return
+            if self._count is None:
+                self._count = self._get_count()
+            else:
+                # Replaced entries are counted again until the next eviction
+                self._count += len(items)
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _get_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM embedding").fetchone()[0]
+
+    def _evict(self):
+        count = self._get_count()
+        excess = count - int(self.max_entries * EVICTION_TARGET)
+        if count > self.max_entries and excess > 0:
+            self.conn.execute(
+                "DELETE FROM embedding WHERE key IN "
+                "(SELECT key FROM embedding ORDER BY created_at LIMIT ?)",
+                (excess,),
+            )
+            self.conn.commit()
+            count -= excess
+            log.debug(f"Evicted {excess} embedding cache entries, {count} left")
+        self._count = count
+
+    def purge(self, namespace: str):
+        """Deletes every entry that does not belong to `namespace`."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM config WHERE key = 'namespace'"
+            ).fetchone()
+            if row and row[0] == namespace:
+                return
+
+            self.conn.execute(
+                "DELETE FROM embedding WHERE namespace != ?", (namespace,)
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO config (key, value) VALUES ('namespace', ?)",
+                (namespace,),
+            )
+            self.conn.commit()
+            self._count = None
+
+
+class RedisEmbeddingStore:
+    """Persistent tier shared by all instances through Redis."""
+
+    def __init__(self, redis_url: str, redis_sentinels: Optional[list], ttl: int):
+        self.redis = get_redis_connection(
+            redis_url, redis_sentinels, decode_responses=False
+        )
+        self.ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:embedding:{key}"
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        values = self.redis.mget([self._key(key) for key in keys])
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, namespace: str, items: dict[str, bytes]):
+        pipe = self.redis.pipeline()
+        for key, data in items.items():
+            pipe.set(self._key(key), data, ex=self.ttl or None)
+        pipe.execute()
+
+    def purge(self, namespace: str):
+        current_key = f"{REDIS_KEY_PREFIX}:embedding:namespace"
+        previous = self.redis.getset(current_key, namespace)
+        if previous is None or previous.decode() == namespace:
+            return
+
+        keys = list(self.redis.scan_iter(match=self._key(f"{previous.decode()}:*")))
+        for idx in range(0, len(keys), 500):
+            self.redis.delete(*keys[idx : idx + 500])
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of embeddings keyed by (engine, base URL, model,
+    prefix, text).
+
+    Lookups go to an in-process LRU first, then to the persistent store. Entries
+    of other engines/models are purged as soon as the configured model changes.
+
+    Vectors are kept packed (see `encode_vector`) in both tiers; the LRU holds
+    at most `max_bytes` of them.
+    """
+
+    def __init__(self, max_bytes: int, store=None):
+        self.max_bytes = max_bytes
+        self.store = store
+
+        self.namespace: Optional[str] = None
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def set_model(self, engine: str, model: str, url: str = "") -> str:
+        """Switches to the namespace of (engine, url, model), purging all others."""
+        namespace = hashlib.sha256(f"{engine}\0{url}\0{model}".encode()).hexdigest()[
+            :16
+        ]
+        with self._lock:
+            if namespace == self.namespace:
+                return namespace
+            self.namespace = namespace
+            self._entries.clear()
+            self._size = 0
+
+        if self.store:
+            try:
+                self.store.purge(namespace)
+            except Exception as e:
+                log.warning(f"Failed to purge embedding cache: {e}")
+        return namespace
+
+    @staticmethod
+    def get_key(namespace: str, text: str, prefix: Optional[str] = None) -> str:
+        digest = hashlib.sha256(f"{prefix or ''}\0{text}".encode()).hexdigest()
+        return f"{namespace}:{digest}"
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        """Packed vectors of the cached `keys`."""
+        result = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    result[key] = self._entries[key]
+            self.memory_hits += len(result)
+
+        missing = [key for key in keys if key not in result]
+        if missing and self.store:
+            try:
+                stored = self.store.get_many(missing)
+            except Exception as e:
+                log.warning(f"Failed to read embedding cache: {e}")
+                stored = {}
+            self._remember(stored)
+            result.update(stored)
+            self.store_hits += len(stored)
+
+        self.misses += len(keys) - len(result)
+        return result
+
+    def set_many(self, namespace: str, items: dict[str, bytes]):
+        self._remember(items)
+        if items and self.store:
+            try:
+                self.store.set_many(namespace, items)
+            except Exception as e:
+                log.warning(f"Failed to write embedding cache: {e}")
+
+    def _remember(self, items: dict[str, bytes]):
+        with self._lock:
+            for key, data in items.items():
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._size -= len(previous)
+                self._entries[key] = data
+                self._size += len(data)
+            while self._entries and self._size > self.max_bytes:
+                _, data = self._entries.popitem(last=False)
+                self._size -= len(data)
+
+    def get_stats(self) -> dict:
+        hits = self.memory_hits + self.store_hits
+        total = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+    def wrap(
+        self, embedding_function: Callable, engine: str, model: str, url: str = ""
+    ) -> Callable:
+        """Returns `embedding_function` with lookups served from the cache."""
+        namespace = self.set_model(engine, model, url)
+
+        def cached_embedding_function(query, prefix=None, user=None):
+            texts = query if isinstance(query, list) else [query]
+            keys = [self.get_key(namespace, text, prefix) for text in texts]
+            cached = self.get_many(list(dict.fromkeys(keys)))
+
+            # Embed each missing text once, even if it repeats in the input
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in cached:
+                    missing.setdefault(key, text)
+
+            vectors = {key: decode_vector(data) for key, data in cached.items()}
+            if missing:
+                embeddings = embedding_function(
+                    list(missing.values()), prefix=prefix, user=user
+                )
+                computed = dict(zip(missing.keys(), embeddings))
+                self.set_many(
+                    namespace,
+                    {key: encode_vector(vector) for key, vector in computed.items()},
+                )
+                vectors.update(computed)
+
+            embeddings = [vectors[key] for key in keys]
+            return embeddings if isinstance(query, list) else embeddings[0]
+
+        return cached_embedding_function
+
+
+def get_embedding_store():
+    if REDIS_URL:
+        return RedisEmbeddingStore(
+            REDIS_URL,
+            get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+            RAG_EMBEDDING_CACHE_TTL,
+        )
+    return SQLiteEmbeddingStore(
+        f"{CACHE_DIR}/embeddings.db", max_entries=RAG_EMBEDDING_CACHE_MAX_STORE_ENTRIES
+    )
+
+
+EMBEDDING_CACHE = (
+    EmbeddingCache(
+        RAG_EMBEDDING_CACHE_MAX_MEMORY_MB * 1024 * 1024, store=get_embedding_store()
+    )
+    if ENABLE_RAG_EMBEDDING_CACHE
+    else None
+)
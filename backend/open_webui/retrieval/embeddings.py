@@ -0,0 +1,183 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from open_webui.config import (
+    RAG_EMBEDDING_CONCURRENCY,
+    RAG_EMBEDDING_MAX_BATCH_TOKENS,
+    RAG_EMBEDDING_MAX_RETRIES,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for BPE tokenizers; engines behind
+    # Ollama use their own tokenizers, so an exact count is not available
+    return len(text) // 4 + 1
+
+
+class EmbeddingExecutor:
+    """
+    Runs embedding requests for remote engines (OpenAI, Ollama).
+
+    Requests share a pooled HTTP session, at most `concurrency` batches are in
+    flight at once (across all callers), 429/5xx responses are retried with
+    exponential backoff, and results are returned in input order.
+
+    Retries sleep in the calling thread, so async code calls the embedding
+    functions in a threadpool.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_batch_tokens: int = 0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._session: Optional[requests.Session] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.concurrency,
+                        pool_maxsize=self.concurrency,
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.concurrency,
+                        thread_name_prefix="embedding",
+                    )
+        return self._pool
+
+    def _get_retry_delay(self, attempt: int, response=None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_backoff)
+                except ValueError:
+                    pass
+
+        delay = min(self.backoff * (2**attempt), self.max_backoff)
+        return delay * random.uniform(0.5, 1.0)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POSTs through the pooled session, retrying on 429/5xx and connection errors."""
+        attempt = 0
+        while True:
+            try:
+                r = self.session.post(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._get_retry_delay(attempt)
+                log.warning(f"Embedding request to {url} failed ({e}), retrying")
+            else:
+                if (
+                    r.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    r.raise_for_status()
+                    return r
+                delay = self._get_retry_delay(attempt, r)
+                log.warning(
+                    f"Embedding request to {url} returned {r.status_code}, "
+                    f"retrying in {delay:.2f}s"
+                )
+
+            attempt += 1
+            time.sleep(delay)
+
+    def get_batches(self, texts: list[str], batch_size: int) -> list[tuple[int, int]]:
+        """
+        Splits `texts` into (start, end) slices of at most `batch_size` items
+        and, when `max_batch_tokens` is set, at most that many estimated tokens.
+        """
+        batch_size = max(1, batch_size or 1)
+
+        batches = []
+        start = 0
+        tokens = 0
+        for idx, text in enumerate(texts):
+            text_tokens = estimate_tokens(text)
+            if idx > start and (
+                idx - start >= batch_size
+                or (
+                    self.max_batch_tokens
+                    and tokens + text_tokens > self.max_batch_tokens
+                )
+            ):
+                batches.append((start, idx))
+                start = idx
+                tokens = 0
+            tokens += text_tokens
+
+        if start < len(texts):
+            batches.append((start, len(texts)))
+        return batches
+
+    def map(
+        self,
+        func: Callable[[list[str]], Optional[list[Any]]],
+        texts: list[str],
+        batch_size: int,
+    ) -> list[Any]:
+        """
+        Calls `func` on batches of `texts` concurrently and returns the
+        concatenated results in input order. Every batch runs in the shared
+        pool, so a single batch also counts towards `concurrency`.
+        """
+        batches = self.get_batches(texts, batch_size)
+        futures = [self.pool.submit(func, texts[start:end]) for start, end in batches]
+        results = [future.result() for future in futures]
+
+        embeddings = []
+        for (start, end), result in zip(batches, results):
+            if result is None or len(result) != end - start:
+                raise ValueError(
+                    f"Failed to generate embeddings for items {start} to {end}"
+                )
+            embeddings.extend(result)
+        return embeddings
+
+
+EMBEDDING_EXECUTOR = EmbeddingExecutor(
+    concurrency=RAG_EMBEDDING_CONCURRENCY,
+    max_batch_tokens=RAG_EMBEDDING_MAX_BATCH_TOKENS,
+    max_retries=RAG_EMBEDDING_MAX_RETRIES,
+)
@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import Optional
+from uuid import uuid4
+
+from langchain_core.documents import Document
+
+from open_webui.config import (
+    CACHE_DIR,
+    ENABLE_RAG_EXTRACTION_CACHE,
+    RAG_EXTRACTION_CACHE_MAX_SIZE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Eviction frees space down to this fraction of the maximum size, so that it
+# does not run again on the next write
+EVICTION_TARGET = 0.9
+ENTRY_SUFFIX = ".json.z"
+
+
+def encode_documents(docs: list[Document]) -> bytes:
+    data = [
+        {"page_content": doc.page_content, "metadata": doc.metadata} for doc in docs
+    ]
+    return zlib.compress(
+        json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    )
+
+
+def decode_documents(data: bytes) -> list[Document]:
+    return [
+        Document(page_content=item["page_content"], metadata=item["metadata"])
+        for item in json.loads(zlib.decompress(data))
+    ]
+
+
+class ExtractionCache:
+    """
+    Documents extracted from files, stored on disk as compressed JSON with one
+    file per key (see `Loader.get_cache_key`). The directory may be shared by
+    several workers.
+
+    Reads mark an entry as used; once the entries take more than `max_size`
+    bytes, the least recently used ones are deleted.
+    """
+
+    def __init__(self, directory: str, max_size: int = 0):
+        self.directory = directory
+        self.max_size = max_size
+
+        os.makedirs(directory, exist_ok=True)
+        # Bytes on disk, counted on the first write and corrected on eviction
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{ENTRY_SUFFIX}")
+
+    def _scan(self) -> list[os.DirEntry]:
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.name.endswith(ENTRY_SUFFIX)]
+
+    def get(self, key: str) -> Optional[list[Document]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                docs = decode_documents(f.read())
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            log.warning(f"Discarding unreadable extraction cache entry {key}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return docs
+
+    def set(self, key: str, docs: list[Document]):
+        try:
+            data = encode_documents(docs)
+            path = self._path(key)
+            tmp_path = f"{path}.{uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            log.warning(f"Failed to write extraction cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry.stat().st_size for entry in self._scan())
+            else:
+                self._size += len(data)
+            if self.max_size and self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in self._scan():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_size * EVICTION_TARGET
+        evicted = 0
+        for _, entry_size, path in sorted(entries):
+            if size <= target:
+                break
+            self._remove(path)
+            size -= entry_size
+            evicted += 1
+
+        self._size = size
+        log.debug(f"Evicted {evicted} extraction cache entries, {size} bytes left")
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> dict:
+        entries = self._scan()
+        total = self.hits + self.misses
+        return {
+            "entries": len(entries),
+            "size": sum(entry.stat().st_size for entry in entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+EXTRACTION_CACHE = (
+    ExtractionCache(
+        f"{CACHE_DIR}/extraction",
+        max_size=RAG_EXTRACTION_CACHE_MAX_SIZE * 1024 * 1024,
+    )
+    if ENABLE_RAG_EXTRACTION_CACHE
+    else None
+)
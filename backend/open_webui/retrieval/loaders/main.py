@@ -1,4 +1,6 @@
 import requests
+import hashlib
+import json
 import logging
 import ftfy
 import sys
@@ -184,6 +186,28 @@ class Loader:
             for doc in docs
         ]
 
+    def get_cache_key(self, filename: str, file_content_type: str, sha256: str) -> str:
+        """
+        Returns the extraction cache key of a file with the given content hash:
+        the same file loaded with the same engine and settings gives the same
+        documents. Credentials only count as set or unset, so rotating a key
+        keeps the cached documents.
+        """
+        settings = {
+            name: bool(value) if name.endswith("_KEY") else value
+            for name, value in sorted(self.kwargs.items())
+        }
+        fingerprint = json.dumps(
+            [
+                self.engine,
+                settings,
+                filename.split(".")[-1].lower(),
+                file_content_type,
+            ],
+            default=str,
+        )
+        return f"{sha256}-{hashlib.sha256(fingerprint.encode()).hexdigest()[:16]}"
+
     def _is_text_file(self, file_ext: str, file_content_type: str) -> bool:
         return file_ext in known_source_ext or (
             file_content_type and file_content_type.find("text/") >= 0
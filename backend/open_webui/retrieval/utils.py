@@ -2,20 +2,22 @@ import logging
 import os
 from typing import Optional, Union
 
-import requests
 import hashlib
 from concurrent.futures import ThreadPoolExecutor
 
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX_CACHE
+from open_webui.retrieval.embeddings import EMBEDDING_EXECUTOR, EmbeddingExecutor
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE, EmbeddingCache
 
 from open_webui.models.users import UserModel
 from open_webui.models.files import Files
+from open_webui.models.knowledge import Knowledges
 
 from open_webui.retrieval.vector.main import GetResult
 
@@ -73,6 +75,31 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
+class BM25IndexRetriever(BaseRetriever):
+    index: Any
+    k: int
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return [
+            # Copy the metadata, the reranker writes scores into it
+            Document(metadata=dict(metadata or {}), page_content=text)
+            for _, text, metadata in self.index.search(query, self.k)
+        ]
+
+
+def get_bm25_index(collection_name: str, collection_result: GetResult = None):
+    return BM25_INDEX_CACHE.get(
+        collection_name,
+        loader=lambda: collection_result
+        or VECTOR_DB_CLIENT.get(collection_name=collection_name),
+    )
+
+
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
@@ -109,7 +136,7 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
+    collection_result: Optional[GetResult],
     query: str,
     embedding_function,
     k: int,
@@ -119,11 +146,9 @@ def query_doc_with_hybrid_search(
 ) -> dict:
     try:
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
+        bm25_retriever = BM25IndexRetriever(
+            index=get_bm25_index(collection_name, collection_result), k=k
         )
-        bm25_retriever.k = k
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -292,20 +317,18 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
-    collection_results = {}
+    # Resolve the cached BM25 index once per collection sequentially,
+    # only collections that changed since the last query are fetched again
+    collection_indexes = {}
     for collection_name in collection_names:
         try:
             log.debug(
-                f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
-            )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
+                f"query_collection_with_hybrid_search:get_bm25_index:collection {collection_name}"
             )
+            collection_indexes[collection_name] = get_bm25_index(collection_name)
         except Exception as e:
             log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results[collection_name] = None
+            collection_indexes[collection_name] = None
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
@@ -315,7 +338,7 @@ def query_collection_with_hybrid_search(
         try:
             result = query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
+                collection_result=None,
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
@@ -333,7 +356,7 @@ def query_collection_with_hybrid_search(
     tasks = [
         (cn, q)
         for cn in collection_names
-        if collection_results[cn] is not None
+        if collection_indexes[cn] is not None
         for q in queries
     ]
 
@@ -362,6 +385,34 @@ def get_embedding_function(
     url,
     key,
     embedding_batch_size,
+    executor: Optional[EmbeddingExecutor] = None,
+    cache: Optional[EmbeddingCache] = EMBEDDING_CACHE,
+):
+    func = _get_embedding_function(
+        embedding_engine,
+        embedding_model,
+        embedding_function,
+        url,
+        key,
+        embedding_batch_size,
+        executor or EMBEDDING_EXECUTOR,
+    )
+    if cache is not None:
+        # Local models do not depend on the base URL of the remote engines
+        return cache.wrap(
+            func, embedding_engine, embedding_model, url if embedding_engine else ""
+        )
+    return func
+
+
+def _get_embedding_function(
+    embedding_engine,
+    embedding_model,
+    embedding_function,
+    url,
+    key,
+    embedding_batch_size,
+    executor: EmbeddingExecutor,
 ):
     if embedding_engine == "":
         return lambda query, prefix=None, user=None: embedding_function.encode(
@@ -376,20 +427,16 @@ def get_embedding_function(
             url=url,
             key=key,
             user=user,
+            executor=executor,
         )
 
         def generate_multiple(query, prefix, user, func):
             if isinstance(query, list):
-                embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(
-                            query[i : i + embedding_batch_size],
-                            prefix=prefix,
-                            user=user,
-                        )
-                    )
-                return embeddings
+                return executor.map(
+                    lambda texts: func(texts, prefix=prefix, user=user),
+                    query,
+                    embedding_batch_size,
+                )
             else:
                 return func(query, prefix, user)
 
@@ -419,6 +466,19 @@ def get_sources_from_files(
     extracted_collections = []
     relevant_contexts = []
 
+    # Knowledge bases may have been reindexed into a new collection
+    knowledge_ids = [
+        (
+            file.get("id")
+            if file.get("type") == "collection"
+            else file.get("collection_name")
+        )
+        for file in files
+    ]
+    knowledge_collection_names = Knowledges.get_collection_names_by_ids(
+        [id for id in knowledge_ids if id]
+    )
+
     for file in files:
 
         context = None
@@ -490,9 +550,15 @@ def get_sources_from_files(
                 if file.get("legacy"):
                     collection_names = file.get("collection_names", [])
                 else:
-                    collection_names.append(file["id"])
+                    collection_names.append(
+                        knowledge_collection_names.get(file["id"], file["id"])
+                    )
             elif file.get("collection_name"):
-                collection_names.append(file["collection_name"])
+                collection_names.append(
+                    knowledge_collection_names.get(
+                        file["collection_name"], file["collection_name"]
+                    )
+                )
             elif file.get("id"):
                 if file.get("legacy"):
                     collection_names.append(f"{file['id']}")
@@ -619,6 +685,7 @@ def generate_openai_batch_embeddings(
     key: str = "",
     prefix: str = None,
     user: UserModel = None,
+    executor: Optional[EmbeddingExecutor] = None,
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
@@ -628,7 +695,7 @@ def generate_openai_batch_embeddings(
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        r = (executor or EMBEDDING_EXECUTOR).post(
             f"{url}/embeddings",
             headers={
                 "Content-Type": "application/json",
@@ -646,7 +713,6 @@ def generate_openai_batch_embeddings(
             },
             json=json_data,
         )
-        r.raise_for_status()
         data = r.json()
         if "data" in data:
             return [elem["embedding"] for elem in data["data"]]
@@ -664,6 +730,7 @@ def generate_ollama_batch_embeddings(
     key: str = "",
     prefix: str = None,
     user: UserModel = None,
+    executor: Optional[EmbeddingExecutor] = None,
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
@@ -673,7 +740,7 @@ def generate_ollama_batch_embeddings(
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        r = (executor or EMBEDDING_EXECUTOR).post(
             f"{url}/api/embed",
             headers={
                 "Content-Type": "application/json",
@@ -685,13 +752,12 @@ def generate_ollama_batch_embeddings(
                         "X-OpenWebUI-User-Email": user.email,
                         "X-OpenWebUI-User-Role": user.role,
                     }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
                     else {}
                 ),
             },
             json=json_data,
         )
-        r.raise_for_status()
         data = r.json()
 
         if "embeddings" in data:
@@ -713,6 +779,7 @@ def generate_embeddings(
     url = kwargs.get("url", "")
     key = kwargs.get("key", "")
     user = kwargs.get("user")
+    executor = kwargs.get("executor")
 
     if prefix is not None and RAG_EMBEDDING_PREFIX_FIELD_NAME is None:
         if isinstance(text, list):
@@ -730,6 +797,7 @@ def generate_embeddings(
                     "key": key,
                     "prefix": prefix,
                     "user": user,
+                    "executor": executor,
                 }
             )
         else:
@@ -741,17 +809,18 @@ def generate_embeddings(
                     "key": key,
                     "prefix": prefix,
                     "user": user,
+                    "executor": executor,
                 }
             )
         return embeddings[0] if isinstance(text, str) else embeddings
     elif engine == "openai":
         if isinstance(text, list):
             embeddings = generate_openai_batch_embeddings(
-                model, text, url, key, prefix, user
+                model, text, url, key, prefix, user, executor
             )
         else:
             embeddings = generate_openai_batch_embeddings(
-                model, [text], url, key, prefix, user
+                model, [text], url, key, prefix, user, executor
             )
         return embeddings[0] if isinstance(text, str) else embeddings
 
@@ -11,6 +11,7 @@ from open_webui.socket.main import sio, get_user_ids_from_room
 from open_webui.models.users import Users, UserNameResponse
 
 from open_webui.models.channels import Channels, ChannelModel, ChannelForm
+from open_webui.models.notifications import WebhookNotificationForm
 from open_webui.models.messages import (
     Messages,
     MessageModel,
@@ -26,7 +27,7 @@ from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, get_users_with_access
-from open_webui.utils.webhook import post_webhook
+from open_webui.utils.webhook_outbox import WEBHOOK_OUTBOX
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -143,9 +144,50 @@ class MessageUserResponse(MessageResponse):
     user: UserNameResponse
 
 
+def get_message_user_responses(
+    messages: list[MessageModel],
+) -> list[MessageUserResponse]:
+    """Adds the replies, reactions and authors to messages in three queries."""
+    message_ids = [message.id for message in messages]
+    reply_stats = Messages.get_reply_stats_by_message_ids(message_ids)
+    reactions = Messages.get_reactions_by_message_ids(message_ids)
+    users = {
+        user.id: user
+        for user in Users.get_users_by_user_ids(
+            list({message.user_id for message in messages})
+        )
+    }
+
+    responses = []
+    for message in messages:
+        author = users.get(message.user_id)
+        if not author:
+            continue
+
+        reply_count, latest_reply_at = reply_stats.get(message.id, (0, None))
+        responses.append(
+            MessageUserResponse(
+                **{
+                    **message.model_dump(),
+                    "reply_count": reply_count,
+                    "latest_reply_at": latest_reply_at,
+                    "reactions": reactions.get(message.id, []),
+                    "user": UserNameResponse(**author.model_dump()),
+                }
+            )
+        )
+
+    return responses
+
+
 @router.get("/{id}/messages", response_model=list[MessageUserResponse])
 async def get_channel_messages(
-    id: str, skip: int = 0, limit: int = 50, user=Depends(get_verified_user)
+    id: str,
+    skip: int = 0,
+    limit: int = 50,
+    before: Optional[int] = None,
+    before_id: Optional[str] = None,
+    user=Depends(get_verified_user),
 ):
     channel = Channels.get_channel_by_id(id)
     if not channel:
@@ -160,31 +202,10 @@ async def get_channel_messages(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
-    message_list = Messages.get_messages_by_channel_id(id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        replies = Messages.get_replies_by_message_id(message.id)
-        latest_reply_at = replies[0].created_at if replies else None
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": len(replies),
-                    "latest_reply_at": latest_reply_at,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    message_list = Messages.get_messages_by_channel_id(
+        id, skip, limit, before, before_id
+    )
+    return get_message_user_responses(message_list)
 
 
 ############################
@@ -194,28 +215,31 @@ async def get_channel_messages(
 
 async def send_notification(name, webui_url, channel, message, active_user_ids):
     users = get_users_with_access("read", channel.access_control)
+    active_user_ids = set(active_user_ids)
 
+    # Delivered by the webhook outbox; users sharing a webhook get one post
+    notifications = []
     for user in users:
-        if user.id in active_user_ids:
+        if user.id in active_user_ids or not user.settings:
             continue
-        else:
-            if user.settings:
-                webhook_url = user.settings.ui.get("notifications", {}).get(
-                    "webhook_url", None
+
+        webhook_url = user.settings.ui.get("notifications", {}).get("webhook_url", None)
+        if webhook_url:
+            notifications.append(
+                WebhookNotificationForm(
+                    url=webhook_url,
+                    name=name,
+                    message=f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
+                    data={
+                        "action": "channel",
+                        "message": message.content,
+                        "title": channel.name,
+                        "url": f"{webui_url}/channels/{channel.id}",
+                    },
                 )
+            )
 
-                if webhook_url:
-                    post_webhook(
-                        name,
-                        webhook_url,
-                        f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
-                        {
-                            "action": "channel",
-                            "message": message.content,
-                            "title": channel.name,
-                            "url": f"{webui_url}/channels/{channel.id}",
-                        },
-                    )
+    await WEBHOOK_OUTBOX.enqueue(notifications)
 
 
 @router.post("/{id}/messages/post", response_model=Optional[MessageModel])
@@ -253,9 +277,7 @@ async def post_new_message(
                             **message.model_dump(),
                             "reply_count": 0,
                             "latest_reply_at": None,
-                            "reactions": Messages.get_reactions_by_message_id(
-                                message.id
-                            ),
+                            "reactions": [],
                             "user": UserNameResponse(**user.model_dump()),
                         }
                     ).model_dump(),
@@ -299,7 +321,7 @@ async def post_new_message(
                         to=f"channel:{channel.id}",
                     )
 
-            active_user_ids = get_user_ids_from_room(f"channel:{channel.id}")
+            active_user_ids = await get_user_ids_from_room(f"channel:{channel.id}")
 
             background_tasks.add_task(
                 send_notification,
@@ -374,6 +396,8 @@ async def get_channel_thread_messages(
     message_id: str,
     skip: int = 0,
     limit: int = 50,
+    before: Optional[int] = None,
+    before_id: Optional[str] = None,
     user=Depends(get_verified_user),
 ):
     channel = Channels.get_channel_by_id(id)
@@ -389,28 +413,10 @@ async def get_channel_thread_messages(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
-    message_list = Messages.get_messages_by_parent_id(id, message_id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": 0,
-                    "latest_reply_at": None,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    message_list = Messages.get_messages_by_parent_id(
+        id, message_id, skip, limit, before, before_id
+    )
+    return get_message_user_responses(message_list)
 
 
 ############################
@@ -32,6 +32,7 @@ from open_webui.routers.retrieval import ProcessFileForm, process_file
 from open_webui.routers.audio import transcribe
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.file_ingestion import AUDIO_CONTENT_TYPES, FILE_INGESTION_QUEUE
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -85,6 +86,7 @@ def upload_file(
     user=Depends(get_verified_user),
     file_metadata: dict = {},
     process: bool = Query(True),
+    process_in_background: bool = Query(True),
 ):
     log.info(f"file.content_type: {file.content_type}")
     try:
@@ -95,7 +97,17 @@ def upload_file(
         id = str(uuid.uuid4())
         name = filename
         filename = f"{id}_{filename}"
-        contents, file_path = Storage.upload_file(file.file, filename)
+        file_info, file_path = Storage.upload_file(file.file, filename)
+
+        # Images are not processed
+        process = process and file.content_type not in [
+            "image/png",
+            "image/jpeg",
+            "image/gif",
+        ]
+        process_in_background = (
+            process and process_in_background and FILE_INGESTION_QUEUE.is_running()
+        )
 
         file_item = Files.insert_new_file(
             user.id,
@@ -107,20 +119,20 @@ def upload_file(
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": file_info["size"],
+                        "sha256": file_info["sha256"],
                         "data": file_metadata,
                     },
+                    "status": "pending" if process_in_background else None,
                 }
             ),
         )
-        if process:
+        if process_in_background:
+            # Poll GET /files/{id}/process/status or listen to "file:status" chat events
+            FILE_INGESTION_QUEUE.enqueue(id)
+        elif process:
             try:
-                if file.content_type in [
-                    "audio/mpeg",
-                    "audio/wav",
-                    "audio/ogg",
-                    "audio/x-m4a",
-                ]:
+                if file.content_type in AUDIO_CONTENT_TYPES:
                     file_path = Storage.get_file(file_path)
                     result = transcribe(request, file_path)
 
@@ -129,7 +141,7 @@ def upload_file(
                         ProcessFileForm(file_id=id, content=result.get("text", "")),
                         user=user,
                     )
-                elif file.content_type not in ["image/png", "image/jpeg", "image/gif"]:
+                else:
                     process_file(request, ProcessFileForm(file_id=id), user=user)
 
                 file_item = Files.get_file_by_id(id=id)
@@ -228,6 +240,7 @@ async def search_files(
 async def delete_all_files(user=Depends(get_admin_user)):
     result = Files.delete_all_files()
     if result:
+        FILE_INGESTION_QUEUE.cancel_all()
         try:
             Storage.delete_all_files()
         except Exception as e:
@@ -273,6 +286,34 @@ async def get_file_by_id(id: str, user=Depends(get_verified_user)):
         )
 
 
+############################
+# Get File Process Status By Id
+############################
+
+
+@router.get("/{id}/process/status")
+async def get_file_process_status_by_id(id: str, user=Depends(get_verified_user)):
+    file = Files.get_file_by_id(id)
+
+    if not file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    if (
+        file.user_id == user.id
+        or user.role == "admin"
+        or has_access_to_file(id, "read", user)
+    ):
+        return {"status": file.status, "error": file.error}
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+
 ############################
 # Get File Data Content By Id
 ############################
@@ -544,6 +585,7 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
 
         result = Files.delete_file_by_id(id)
         if result:
+            FILE_INGESTION_QUEUE.cancel(id)
             try:
                 Storage.delete_file(file.path)
             except Exception as e:
@@ -10,6 +10,8 @@ from open_webui.models.functions import (
     Functions,
 )
 from open_webui.utils.plugin import load_function_module_by_id, replace_imports
+from open_webui.utils.filter import invalidate_compiled_filters
+from open_webui.utils.model_registry import MODEL_REGISTRY
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -78,6 +80,8 @@ async def create_new_function(
             function_cache_dir.mkdir(parents=True, exist_ok=True)
 
             if function:
+                # Pipe functions are listed as models
+                MODEL_REGISTRY.invalidate()
                 return function
             else:
                 raise HTTPException(
@@ -129,6 +133,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            MODEL_REGISTRY.invalidate()
             return function
         else:
             raise HTTPException(
@@ -194,6 +199,7 @@ async def update_function_by_id(
         function = Functions.update_function_by_id(id, updated)
 
         if function:
+            MODEL_REGISTRY.invalidate()
             return function
         else:
             raise HTTPException(
@@ -223,6 +229,8 @@ async def delete_function_by_id(
         FUNCTIONS = request.app.state.FUNCTIONS
         if id in FUNCTIONS:
             del FUNCTIONS[id]
+        invalidate_compiled_filters(id)
+        MODEL_REGISTRY.invalidate()
 
     return result
 
@@ -303,6 +311,8 @@ async def update_function_valves_by_id(
                 form_data = {k: v for k, v in form_data.items() if v is not None}
                 valves = Valves(**form_data)
                 Functions.update_function_valves_by_id(id, valves.model_dump())
+                invalidate_compiled_filters(id)
+                MODEL_REGISTRY.invalidate()
                 return valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function values by id {id}: {e}")
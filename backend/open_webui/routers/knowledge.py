@@ -8,9 +8,15 @@ from open_webui.models.knowledge import (
     KnowledgeForm,
     KnowledgeResponse,
     KnowledgeUserResponse,
+    get_knowledge_collection_name,
 )
-from open_webui.models.files import Files, FileModel
+from open_webui.models.knowledge_reindex import (
+    KnowledgeReindexJobs,
+    KnowledgeReindexJobModel,
+)
+from open_webui.models.files import FILE_PROCESSING_STATUSES, Files, FileModel
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX_CACHE
 from open_webui.routers.retrieval import (
     process_file,
     ProcessFileForm,
@@ -20,7 +26,9 @@ from open_webui.routers.retrieval import (
 from open_webui.storage.provider import Storage
 
 from open_webui.constants import ERROR_MESSAGES
-from open_webui.utils.auth import get_verified_user
+from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.knowledge_reindex import start_reindex_job
+from open_webui.utils.file_ingestion import FILE_INGESTION_QUEUE
 from open_webui.utils.access_control import has_access, has_permission
 
 
@@ -174,59 +182,20 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
             detail=ERROR_MESSAGES.UNAUTHORIZED,
         )
 
-    knowledge_bases = Knowledges.get_knowledge_bases()
-
-    log.info(f"Starting reindexing for {len(knowledge_bases)} knowledge bases")
-
-    for knowledge_base in knowledge_bases:
-        try:
-            files = Files.get_files_by_ids(knowledge_base.data.get("file_ids", []))
-
-            try:
-                if VECTOR_DB_CLIENT.has_collection(collection_name=knowledge_base.id):
-                    VECTOR_DB_CLIENT.delete_collection(
-                        collection_name=knowledge_base.id
-                    )
-            except Exception as e:
-                log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Error deleting vector DB collection",
-                )
-
-            failed_files = []
-            for file in files:
-                try:
-                    process_file(
-                        request,
-                        ProcessFileForm(
-                            file_id=file.id, collection_name=knowledge_base.id
-                        ),
-                        user=user,
-                    )
-                except Exception as e:
-                    log.error(
-                        f"Error processing file {file.filename} (ID: {file.id}): {str(e)}"
-                    )
-                    failed_files.append({"file_id": file.id, "error": str(e)})
-                    continue
+    job = await start_reindex_job(request.app, user)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ERROR_MESSAGES.DEFAULT("Error starting reindex job"),
+        )
 
-        except Exception as e:
-            log.error(f"Error processing knowledge base {knowledge_base.id}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error processing knowledge base",
-            )
+    log.info(f"Reindex job {job.id} started for {job.total} files")
+    return True
 
-        if failed_files:
-            log.warning(
-                f"Failed to process {len(failed_files)} files in knowledge base {knowledge_base.id}"
-            )
-            for failed in failed_files:
-                log.warning(f"File ID: {failed['file_id']}, Error: {failed['error']}")
 
-    log.info("Reindexing completed successfully")
-    return True
+@router.get("/reindex/status", response_model=Optional[KnowledgeReindexJobModel])
+async def get_reindex_status(user=Depends(get_admin_user)):
+    return KnowledgeReindexJobs.get_latest_job()
 
 
 ############################
@@ -348,7 +317,7 @@ def add_file_to_knowledge_by_id(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=ERROR_MESSAGES.NOT_FOUND,
         )
-    if not file.data:
+    if not file.data or file.status in FILE_PROCESSING_STATUSES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=ERROR_MESSAGES.FILE_NOT_PROCESSED,
@@ -435,9 +404,11 @@ def update_file_from_knowledge_by_id(
         )
 
     # Remove content from the vector database
+    collection_name = get_knowledge_collection_name(knowledge)
     VECTOR_DB_CLIENT.delete(
-        collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+        collection_name=collection_name, filter={"file_id": form_data.file_id}
     )
+    BM25_INDEX_CACHE.delete(collection_name, filter={"file_id": form_data.file_id})
 
     # Add content to the vector database
     try:
@@ -506,9 +477,11 @@ def remove_file_from_knowledge_by_id(
 
     # Remove content from the vector database
     try:
+        collection_name = get_knowledge_collection_name(knowledge)
         VECTOR_DB_CLIENT.delete(
-            collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+            collection_name=collection_name, filter={"file_id": form_data.file_id}
         )
+        BM25_INDEX_CACHE.delete(collection_name, filter={"file_id": form_data.file_id})
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -519,6 +492,7 @@ def remove_file_from_knowledge_by_id(
         file_collection = f"file-{form_data.file_id}"
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
             VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+            BM25_INDEX_CACHE.invalidate(file_collection)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -526,6 +500,7 @@ def remove_file_from_knowledge_by_id(
 
     # Delete file from database
     Files.delete_file_by_id(form_data.file_id)
+    FILE_INGESTION_QUEUE.cancel(form_data.file_id)
 
     if knowledge:
         data = knowledge.data or {}
@@ -616,7 +591,9 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     # Clean up vector DB
     try:
-        VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        collection_name = get_knowledge_collection_name(knowledge)
+        VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+        BM25_INDEX_CACHE.invalidate(collection_name)
     except Exception as e:
         log.debug(e)
         pass
@@ -649,7 +626,9 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
         )
 
     try:
-        VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        collection_name = get_knowledge_collection_name(knowledge)
+        VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+        BM25_INDEX_CACHE.invalidate(collection_name)
     except Exception as e:
         log.debug(e)
         pass
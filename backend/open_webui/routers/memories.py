@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import logging
 from typing import Optional
 
 from open_webui.models.memories import Memories, MemoryModel
+from open_webui.retrieval.bm25 import BM25_INDEX_CACHE
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
 from open_webui.utils.auth import get_verified_user
 from open_webui.env import SRC_LOG_LEVELS
@@ -17,7 +19,11 @@ router = APIRouter()
 
 @router.get("/ef")
 async def get_embeddings(request: Request):
-    return {"result": request.app.state.EMBEDDING_FUNCTION("hello world")}
+    return {
+        "result": await run_in_threadpool(
+            request.app.state.EMBEDDING_FUNCTION, "hello world"
+        )
+    }
 
 
 ############################
@@ -51,19 +57,24 @@ async def add_memory(
 ):
     memory = Memories.insert_new_memory(user.id, form_data.content)
 
+    vector = await run_in_threadpool(
+        request.app.state.EMBEDDING_FUNCTION, memory.content, user=user
+    )
+    metadata = {"created_at": memory.created_at}
     VECTOR_DB_CLIENT.upsert(
         collection_name=f"user-memory-{user.id}",
         items=[
             {
                 "id": memory.id,
                 "text": memory.content,
-                "vector": request.app.state.EMBEDDING_FUNCTION(
-                    memory.content, user=user
-                ),
-                "metadata": {"created_at": memory.created_at},
+                "vector": vector,
+                "metadata": metadata,
             }
         ],
     )
+    BM25_INDEX_CACHE.add(
+        f"user-memory-{user.id}", [memory.id], [memory.content], [metadata]
+    )
 
     return memory
 
@@ -82,9 +93,12 @@ class QueryMemoryForm(BaseModel):
 async def query_memory(
     request: Request, form_data: QueryMemoryForm, user=Depends(get_verified_user)
 ):
+    vector = await run_in_threadpool(
+        request.app.state.EMBEDDING_FUNCTION, form_data.content, user=user
+    )
     results = VECTOR_DB_CLIENT.search(
         collection_name=f"user-memory-{user.id}",
-        vectors=[request.app.state.EMBEDDING_FUNCTION(form_data.content, user=user)],
+        vectors=[vector],
         limit=form_data.k,
     )
 
@@ -101,23 +115,29 @@ async def reset_memory_from_vector_db(
     VECTOR_DB_CLIENT.delete_collection(f"user-memory-{user.id}")
 
     memories = Memories.get_memories_by_user_id(user.id)
+    vectors = await run_in_threadpool(
+        lambda: [
+            request.app.state.EMBEDDING_FUNCTION(memory.content, user=user)
+            for memory in memories
+        ]
+    )
     VECTOR_DB_CLIENT.upsert(
         collection_name=f"user-memory-{user.id}",
         items=[
             {
                 "id": memory.id,
                 "text": memory.content,
-                "vector": request.app.state.EMBEDDING_FUNCTION(
-                    memory.content, user=user
-                ),
+                "vector": vector,
                 "metadata": {
                     "created_at": memory.created_at,
                     "updated_at": memory.updated_at,
                 },
             }
-            for memory in memories
+            for memory, vector in zip(memories, vectors)
         ],
     )
+    # After the write, so an index built meanwhile is not kept
+    BM25_INDEX_CACHE.invalidate(f"user-memory-{user.id}")
 
     return True
 
@@ -136,6 +156,7 @@ async def delete_memory_by_user_id(user=Depends(get_verified_user)):
             VECTOR_DB_CLIENT.delete_collection(f"user-memory-{user.id}")
         except Exception as e:
             log.error(e)
+        BM25_INDEX_CACHE.invalidate(f"user-memory-{user.id}")
         return True
 
     return False
@@ -160,22 +181,28 @@ async def update_memory_by_id(
         raise HTTPException(status_code=404, detail="Memory not found")
 
     if form_data.content is not None:
+        vector = await run_in_threadpool(
+            request.app.state.EMBEDDING_FUNCTION, memory.content, user=user
+        )
+        metadata = {
+            "created_at": memory.created_at,
+            "updated_at": memory.updated_at,
+        }
         VECTOR_DB_CLIENT.upsert(
             collection_name=f"user-memory-{user.id}",
             items=[
                 {
                     "id": memory.id,
                     "text": memory.content,
-                    "vector": request.app.state.EMBEDDING_FUNCTION(
-                        memory.content, user=user
-                    ),
-                    "metadata": {
-                        "created_at": memory.created_at,
-                        "updated_at": memory.updated_at,
-                    },
+                    "vector": vector,
+                    "metadata": metadata,
                 }
             ],
         )
+        # Replaces the previous text of the memory
+        BM25_INDEX_CACHE.add(
+            f"user-memory-{user.id}", [memory.id], [memory.content], [metadata]
+        )
 
     return memory
 
@@ -193,6 +220,7 @@ async def delete_memory_by_id(memory_id: str, user=Depends(get_verified_user)):
         VECTOR_DB_CLIENT.delete(
             collection_name=f"user-memory-{user.id}", ids=[memory_id]
         )
+        BM25_INDEX_CACHE.delete(f"user-memory-{user.id}", ids=[memory_id])
         return True
 
     return False
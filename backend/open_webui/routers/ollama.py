@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from typing import Optional, Union
@@ -45,7 +40,10 @@ from open_webui.utils.payload import (
     apply_model_system_prompt_to_body,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, filter_by_access
+from open_webui.utils.session_pool import SESSION_POOL
+from open_webui.utils.model_registry import MODEL_REGISTRY
+from open_webui.utils.ollama_balancer import OLLAMA_BALANCER, BackendRequest
 
 
 from open_webui.config import (
@@ -74,25 +72,25 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": user.name,
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-            ) as response:
-                return await response.json()
+        async with SESSION_POOL.get_session(url).get(
+            url,
+            timeout=timeout,
+            headers={
+                "Content-Type": "application/json",
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -102,11 +100,14 @@ async def send_get_request(url, key=None, user: UserModel = None):
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
     session: Optional[aiohttp.ClientSession],
+    backend_request: Optional[BackendRequest] = None,
 ):
     if response:
         response.close()
     if session:
         await session.close()
+    if backend_request:
+        backend_request.finish()
 
 
 async def send_post_request(
@@ -119,12 +120,9 @@ async def send_post_request(
 ):
 
     r = None
+    backend_request = OLLAMA_BALANCER.start(url)
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
-
-        r = await session.post(
+        r = await SESSION_POOL.get_session(url).post(
             url,
             data=payload,
             headers={
@@ -142,6 +140,7 @@ async def send_post_request(
                 ),
             },
         )
+        backend_request.record(success=r.status < 500)
         r.raise_for_status()
 
         if stream:
@@ -155,15 +154,20 @@ async def send_post_request(
                 status_code=r.status,
                 headers=response_headers,
                 background=BackgroundTask(
-                    cleanup_response, response=r, session=session
+                    cleanup_response,
+                    response=r,
+                    session=None,
+                    backend_request=backend_request,
                 ),
             )
         else:
             res = await r.json()
-            await cleanup_response(r, session)
+            await cleanup_response(r, None, backend_request)
             return res
 
     except Exception as e:
+        backend_request.record(success=False)
+        backend_request.finish()
         detail = None
 
         if r is not None:
@@ -180,6 +184,33 @@ async def send_post_request(
         )
 
 
+async def refresh_loaded_models(request: Request):
+    responses = await get_ollama_loaded_models(request, user=None)
+    for url, response in responses.items():
+        if response is not None:
+            OLLAMA_BALANCER.set_loaded_models(
+                url, [model.get("model") for model in response.get("models", [])]
+            )
+
+
+def select_url_idx(request: Request, model: str, url_idxs: list[int]) -> int:
+    """Picks the backend to send a request for `model` to among `url_idxs`."""
+    if OLLAMA_BALANCER.should_refresh_loaded_models():
+        OLLAMA_BALANCER.run_in_background(refresh_loaded_models(request))
+
+    urls = {idx: request.app.state.config.OLLAMA_BASE_URLS[idx] for idx in url_idxs}
+    prefix_ids = {}
+    for idx, url in urls.items():
+        api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
+            str(idx),
+            request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
+        )
+        if api_config.get("prefix_id"):
+            prefix_ids[idx] = api_config["prefix_id"]
+
+    return OLLAMA_BALANCER.select(model, urls, prefix_ids)
+
+
 def get_api_key(idx, url, configs):
     parsed_url = urlparse(url)
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
@@ -288,6 +319,8 @@ async def update_config(
         if key in keys
     }
 
+    MODEL_REGISTRY.invalidate()
+
     return {
         "ENABLE_OLLAMA_API": request.app.state.config.ENABLE_OLLAMA_API,
         "OLLAMA_BASE_URLS": request.app.state.config.OLLAMA_BASE_URLS,
@@ -304,7 +337,12 @@ async def get_all_models(request: Request, user: UserModel = None):
             if (str(idx) not in request.app.state.config.OLLAMA_API_CONFIGS) and (
                 url not in request.app.state.config.OLLAMA_API_CONFIGS  # Legacy support
             ):
-                request_tasks.append(send_get_request(f"{url}/api/tags", user=user))
+                request_tasks.append(
+                    MODEL_REGISTRY.fetch_upstream(
+                        f"{url}/api/tags",
+                        send_get_request(f"{url}/api/tags", user=user),
+                    )
+                )
             else:
                 api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
                     str(idx),
@@ -318,7 +356,10 @@ async def get_all_models(request: Request, user: UserModel = None):
 
                 if enable:
                     request_tasks.append(
-                        send_get_request(f"{url}/api/tags", key, user=user)
+                        MODEL_REGISTRY.fetch_upstream(
+                            f"{url}/api/tags",
+                            send_get_request(f"{url}/api/tags", key, user=user),
+                        )
                     )
                 else:
                     request_tasks.append(asyncio.ensure_future(asyncio.sleep(0, None)))
@@ -390,15 +431,17 @@ async def get_all_models(request: Request, user: UserModel = None):
 
 async def get_filtered_models(models, user):
     # Filter models based on user access control
-    filtered_models = []
-    for model in models.get("models", []):
-        model_info = Models.get_model_by_id(model["model"])
-        if model_info:
-            if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
-            ):
-                filtered_models.append(model)
-    return filtered_models
+    model_infos = Models.get_models_by_ids(
+        [model["model"] for model in models.get("models", [])]
+    )
+    accessible_model_ids = {
+        model_info.id for model_info in filter_by_access(user.id, model_infos, "read")
+    }
+    return [
+        model
+        for model in models.get("models", [])
+        if model["model"] in accessible_model_ids
+    ]
 
 
 @router.get("/api/tags")
@@ -558,6 +601,18 @@ async def get_ollama_loaded_models(request: Request, user=Depends(get_verified_u
         return {}
 
 
+@router.get("/balancer")
+async def get_balancer_stats(user=Depends(get_admin_user)):
+    """
+    Load balancer view of each backend: circuit state, requests in flight,
+    latency average, failure counts and loaded models.
+    """
+    return {
+        "strategy": OLLAMA_BALANCER.strategy,
+        "backends": OLLAMA_BALANCER.get_stats(),
+    }
+
+
 class ModelNameForm(BaseModel):
     name: str
 
@@ -796,11 +851,13 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(form_data.name),
         )
 
-    url_idx = random.choice(models[form_data.name]["urls"])
+    url_idx = select_url_idx(request, form_data.name, models[form_data.name]["urls"])
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
 
+    r = None
+    backend_request = OLLAMA_BALANCER.start(url)
     try:
         r = requests.request(
             method="POST",
@@ -821,11 +878,13 @@ async def show_model_info(
             },
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
+        backend_request.record(success=r.status_code < 500)
         r.raise_for_status()
 
         return r.json()
     except Exception as e:
         log.exception(e)
+        backend_request.record(success=False)
 
         detail = None
         if r is not None:
@@ -840,6 +899,8 @@ async def show_model_info(
             status_code=r.status_code if r else 500,
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
+    finally:
+        backend_request.finish()
 
 
 class GenerateEmbedForm(BaseModel):
@@ -870,7 +931,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, model, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -880,6 +941,8 @@ async def embed(
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
 
+    r = None
+    backend_request = OLLAMA_BALANCER.start(url)
     try:
         r = requests.request(
             method="POST",
@@ -900,12 +963,14 @@ async def embed(
             },
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
+        backend_request.record(success=r.status_code < 500)
         r.raise_for_status()
 
         data = r.json()
         return data
     except Exception as e:
         log.exception(e)
+        backend_request.record(success=False)
 
         detail = None
         if r is not None:
@@ -920,6 +985,8 @@ async def embed(
             status_code=r.status_code if r else 500,
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
+    finally:
+        backend_request.finish()
 
 
 class GenerateEmbeddingsForm(BaseModel):
@@ -949,7 +1016,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, model, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -959,6 +1026,8 @@ async def embeddings(
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
 
+    r = None
+    backend_request = OLLAMA_BALANCER.start(url)
     try:
         r = requests.request(
             method="POST",
@@ -979,12 +1048,14 @@ async def embeddings(
             },
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
+        backend_request.record(success=r.status_code < 500)
         r.raise_for_status()
 
         data = r.json()
         return data
     except Exception as e:
         log.exception(e)
+        backend_request.record(success=False)
 
         detail = None
         if r is not None:
@@ -999,6 +1070,8 @@ async def embeddings(
             status_code=r.status_code if r else 500,
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
+    finally:
+        backend_request.finish()
 
 
 class GenerateCompletionForm(BaseModel):
@@ -1034,7 +1107,7 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, model, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -1098,7 +1171,7 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = select_url_idx(request, model, models[model].get("urls", []))
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1427,15 +1500,12 @@ async def get_openai_models(
 
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
         # Filter models based on user access control
-        filtered_models = []
-        for model in models:
-            model_info = Models.get_model_by_id(model["id"])
-            if model_info:
-                if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
-                ):
-                    filtered_models.append(model)
-        models = filtered_models
+        model_infos = Models.get_models_by_ids([model["id"] for model in models])
+        accessible_model_ids = {
+            model_info.id
+            for model_info in filter_by_access(user.id, model_infos, "read")
+        }
+        models = [model for model in models if model["id"] in accessible_model_ids]
 
     return {
         "data": models,
@@ -1,7 +1,9 @@
+import itertools
 import json
 import logging
 import mimetypes
 import os
+import re
 import shutil
 
 import uuid
@@ -35,6 +37,9 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX_CACHE
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
+from open_webui.retrieval.extraction_cache import EXTRACTION_CACHE
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -71,6 +76,7 @@ from open_webui.retrieval.utils import (
     query_doc_with_hybrid_search,
 )
 from open_webui.utils.misc import (
+    calculate_sha256,
     calculate_sha256_string,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
@@ -85,6 +91,7 @@ from open_webui.config import (
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_QUERY_PREFIX,
+    RAG_INGESTION_BATCH_SIZE,
 )
 from open_webui.env import (
     SRC_LOG_LEVELS,
@@ -211,6 +218,20 @@ async def get_embedding_config(request: Request, user=Depends(get_admin_user)):
     }
 
 
+@router.get("/embedding/cache")
+async def get_embedding_cache_stats(user=Depends(get_admin_user)):
+    if EMBEDDING_CACHE is None:
+        return {"status": False}
+    return {"status": True, **EMBEDDING_CACHE.get_stats()}
+
+
+@router.get("/extraction/cache")
+async def get_extraction_cache_stats(user=Depends(get_admin_user)):
+    if EXTRACTION_CACHE is None:
+        return {"status": False}
+    return {"status": True, **EXTRACTION_CACHE.get_stats()}
+
+
 @router.get("/reranking")
 async def get_reraanking_config(request: Request, user=Depends(get_admin_user)):
     return {
@@ -832,8 +853,20 @@ def save_docs_to_vector_db(
         if result is not None:
             existing_doc_ids = result.ids[0]
             if existing_doc_ids:
-                log.info(f"Document with hash {metadata['hash']} already exists")
-                raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+                # Only partial chunks are left when an earlier run did not get
+                # to the document's last batch; they are replaced
+                if is_document_complete(result.metadatas[0]):
+                    log.info(f"Document with hash {metadata['hash']} already exists")
+                    raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+
+                log.info(
+                    f"Removing partially indexed document with hash {metadata['hash']}"
+                )
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name, ids=existing_doc_ids
+                )
+                BM25_INDEX_CACHE.delete(collection_name, ids=existing_doc_ids)
+                add = True
 
     if split:
         if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
@@ -857,36 +890,24 @@ def save_docs_to_vector_db(
         else:
             raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
 
-        docs = text_splitter.split_documents(docs)
+        chunks = iter_split_documents(text_splitter, docs)
+    else:
+        chunks = iter(docs)
 
-    if len(docs) == 0:
+    # Fail before touching the collection when there is nothing to insert
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
         raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    chunks = itertools.chain([first_chunk], chunks)
 
-    texts = [doc.page_content for doc in docs]
-    metadatas = [
+    embedding_config = json.dumps(
         {
-            **doc.metadata,
-            **(metadata if metadata else {}),
-            "embedding_config": json.dumps(
-                {
-                    "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                    "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-                }
-            ),
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
         }
-        for doc in docs
-    ]
-
-    # ChromaDB does not like datetime formats
-    # for meta-data so convert them to string.
-    for metadata in metadatas:
-        for key, value in metadata.items():
-            if (
-                isinstance(value, datetime)
-                or isinstance(value, list)
-                or isinstance(value, dict)
-            ):
-                metadata[key] = str(value)
+    )
+    # Set by the ingestion queue, e.g. when the file is deleted meanwhile
+    is_cancelled = getattr(request.state, "is_cancelled", None)
 
     try:
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
@@ -894,6 +915,7 @@ def save_docs_to_vector_db(
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                BM25_INDEX_CACHE.invalidate(collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -919,26 +941,41 @@ def save_docs_to_vector_db(
             request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
         )
 
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
-        )
+        # Split, embed and insert a batch at a time, so only one batch of
+        # chunks and embeddings is held in memory. Inserted batches are kept
+        # when processing fails or is cancelled; their chunks are marked
+        # partial until the last batch is inserted
+        for batch, is_last in iter_batches(chunks, RAG_INGESTION_BATCH_SIZE):
+            if is_cancelled and is_cancelled():
+                raise ValueError(ERROR_MESSAGES.DEFAULT("Processing cancelled"))
+
+            texts = [doc.page_content for doc in batch]
+            metadatas = [
+                get_chunk_metadata(doc, metadata, embedding_config, partial=not is_last)
+                for doc in batch
+            ]
+            embeddings = embedding_function(
+                [text.replace("\n", " ") for text in texts],
+                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                user=user,
+            )
 
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
+            items = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "text": text,
+                    "vector": embeddings[idx],
+                    "metadata": metadatas[idx],
+                }
+                for idx, text in enumerate(texts)
+            ]
+            ids = [item["id"] for item in items]
 
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
-        )
+            VECTOR_DB_CLIENT.insert(
+                collection_name=collection_name,
+                items=items,
+            )
+            BM25_INDEX_CACHE.add(collection_name, ids, texts, metadatas)
 
         return True
     except Exception as e:
@@ -946,6 +983,126 @@ def save_docs_to_vector_db(
         raise e
 
 
+# Characters of a document split at once
+SPLIT_WINDOW_SIZE = 1_000_000
+
+
+def iter_split_documents(text_splitter, docs: list[Document]) -> Iterator[Document]:
+    """
+    Splits `docs` lazily, one document at a time. Long documents are split a
+    window at a time, cut at a paragraph (or line, or word) break, so only the
+    chunks of one window are held at once.
+
+    The last chunk of a window is split again as the start of the next one,
+    so the chunks around a cut overlap like the others. `text_splitter` must
+    add the `start_index` of its chunks.
+    """
+    for doc in docs:
+        text = doc.page_content
+        offset = 0
+        while offset < len(text):
+            end = get_split_window_end(text, offset, SPLIT_WINDOW_SIZE)
+            window = text[offset:end]
+            chunks = text_splitter.create_documents([window], [doc.metadata])
+            fix_start_indexes(window, chunks)
+
+            next_offset = end
+            if end < len(text) and len(chunks) > 1:
+                last_start_index = chunks[-1].metadata["start_index"]
+                if last_start_index > 0:
+                    chunks.pop()
+                    next_offset = offset + last_start_index
+                else:
+                    log.warning(
+                        f"Start of the last chunk at {end} is unknown, "
+                        "splitting the next window without overlap"
+                    )
+
+            for chunk in chunks:
+                if chunk.metadata["start_index"] >= 0:
+                    chunk.metadata["start_index"] += offset
+                yield chunk
+            offset = next_offset
+
+
+def fix_start_indexes(text: str, chunks: list[Document]):
+    """
+    Looks up chunks whose `start_index` the splitter could not find in `text`
+    (-1) after the previous chunk. The token splitter searches from an offset
+    that counts its overlap in characters instead of tokens, which overshoots
+    the start of chunks. Chunks that are not part of `text` as is (e.g. cut
+    inside a multi-byte character) keep -1.
+    """
+    previous_start_index = -1
+    for chunk in chunks:
+        start_index = chunk.metadata["start_index"]
+        if start_index < 0:
+            start_index = text.find(chunk.page_content, previous_start_index + 1)
+            chunk.metadata["start_index"] = start_index
+        if start_index >= 0:
+            previous_start_index = start_index
+
+
+def get_split_window_end(text: str, offset: int, size: int) -> int:
+    end = offset + size
+    if end >= len(text):
+        return len(text)
+
+    for separator in ["\n\n", "\n", " "]:
+        idx = text.rfind(separator, offset + size // 2, end)
+        if idx != -1:
+            return idx + len(separator)
+    return end
+
+
+def iter_batches(iterable, size: int) -> Iterator[tuple[list, bool]]:
+    """Yields lists of `size` items, each with whether it is the last one."""
+    iterator = iter(iterable)
+    batch = list(itertools.islice(iterator, size))
+    while batch:
+        next_batch = list(itertools.islice(iterator, size))
+        yield batch, not next_batch
+        batch = next_batch
+
+
+def is_document_complete(metadatas: list[Optional[dict]]) -> bool:
+    """
+    Whether the chunks of a document include its last batch, i.e. processing
+    it was not interrupted.
+    """
+    return any(not (metadata or {}).get("partial") for metadata in metadatas)
+
+
+def get_chunk_metadata(
+    doc: Document, metadata: Optional[dict], embedding_config: str, partial: bool
+) -> dict:
+    chunk_metadata = {
+        **doc.metadata,
+        **(metadata if metadata else {}),
+        "embedding_config": embedding_config,
+    }
+    # Chunks re-split from a file's collection may carry the flag already
+    chunk_metadata.pop("partial", None)
+    if partial:
+        chunk_metadata["partial"] = True
+
+    # ChromaDB does not like datetime formats
+    # for meta-data so convert them to string.
+    for key, value in chunk_metadata.items():
+        if (
+            isinstance(value, datetime)
+            or isinstance(value, list)
+            or isinstance(value, dict)
+        ):
+            chunk_metadata[key] = str(value)
+    return chunk_metadata
+
+
+def get_vector_collection_name(collection_name: str) -> str:
+    """Maps a knowledge base id to the vector DB collection currently serving it."""
+    return Knowledges.get_collection_name_by_id(collection_name) or collection_name
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -966,6 +1123,13 @@ def process_file(
         if collection_name is None:
             collection_name = f"file-{file.id}"
 
+        # Knowledge bases may have been reindexed into a differently named collection
+        vector_collection_name = (
+            get_vector_collection_name(collection_name)
+            if form_data.collection_name
+            else collection_name
+        )
+
         if form_data.content:
             # Update the content in the file
             # Usage: /files/{file_id}/data/content/update, /files/ (audio file upload pipeline)
@@ -973,6 +1137,7 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                BM25_INDEX_CACHE.invalidate(f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -999,7 +1164,7 @@ def process_file(
                 collection_name=f"file-{file.id}", filter={"file_id": file.id}
             )
 
-            if result is not None and len(result.ids[0]) > 0:
+            if result is not None and is_document_complete(result.metadatas[0]):
                 docs = [
                     Document(
                         page_content=result.documents[0][idx],
@@ -1037,9 +1202,24 @@ def process_file(
                     DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
                     MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
                 )
-                docs = loader.load(
-                    file.filename, file.meta.get("content_type"), file_path
-                )
+
+                docs = None
+                if EXTRACTION_CACHE is not None:
+                    sha256 = file.meta.get("sha256")
+                    if not re.fullmatch(r"[0-9a-f]{64}", str(sha256)):
+                        # Uploaded before the hash was stored
+                        sha256 = calculate_sha256(file_path, 8 * 1024 * 1024)
+                    cache_key = loader.get_cache_key(
+                        file.filename, file.meta.get("content_type"), sha256
+                    )
+                    docs = EXTRACTION_CACHE.get(cache_key)
+
+                if docs is None:
+                    docs = loader.load(
+                        file.filename, file.meta.get("content_type"), file_path
+                    )
+                    if EXTRACTION_CACHE is not None:
+                        EXTRACTION_CACHE.set(cache_key, docs)
 
                 docs = [
                     Document(
@@ -1079,11 +1259,16 @@ def process_file(
         Files.update_file_hash_by_id(file.id, hash)
 
         if not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
+            # Set by the ingestion queue to track the file's progress
+            set_file_status = getattr(request.state, "set_file_status", None)
+            if set_file_status:
+                set_file_status("embedding")
+
             try:
                 result = save_docs_to_vector_db(
                     request,
                     docs=docs,
-                    collection_name=collection_name,
+                    collection_name=vector_collection_name,
                     metadata={
                         "file_id": file.id,
                         "name": file.filename,
@@ -1566,13 +1751,9 @@ def query_doc_handler(
 ):
     try:
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
-            collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
-            )
             return query_doc_with_hybrid_search(
-                collection_name=form_data.collection_name,
-                collection_result=collection_results[form_data.collection_name],
+                collection_name=get_vector_collection_name(form_data.collection_name),
+                collection_result=None,
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -1586,11 +1767,10 @@ def query_doc_handler(
                     if form_data.r
                     else request.app.state.config.RELEVANCE_THRESHOLD
                 ),
-                user=user,
             )
         else:
             return query_doc(
-                collection_name=form_data.collection_name,
+                collection_name=get_vector_collection_name(form_data.collection_name),
                 query_embedding=request.app.state.EMBEDDING_FUNCTION(
                     form_data.query, prefix=RAG_EMBEDDING_QUERY_PREFIX, user=user
                 ),
@@ -1623,7 +1803,10 @@ def query_collection_handler(
     try:
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
             return query_collection_with_hybrid_search(
-                collection_names=form_data.collection_names,
+                collection_names=[
+                    get_vector_collection_name(collection_name)
+                    for collection_name in form_data.collection_names
+                ],
                 queries=[form_data.query],
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -1640,7 +1823,10 @@ def query_collection_handler(
             )
         else:
             return query_collection(
-                collection_names=form_data.collection_names,
+                collection_names=[
+                    get_vector_collection_name(collection_name)
+                    for collection_name in form_data.collection_names
+                ],
                 queries=[form_data.query],
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -1671,14 +1857,16 @@ class DeleteForm(BaseModel):
 @router.post("/delete")
 def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin_user)):
     try:
-        if VECTOR_DB_CLIENT.has_collection(collection_name=form_data.collection_name):
+        collection_name = get_vector_collection_name(form_data.collection_name)
+        if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
             file = Files.get_file_by_id(form_data.file_id)
             hash = file.hash
 
             VECTOR_DB_CLIENT.delete(
-                collection_name=form_data.collection_name,
+                collection_name=collection_name,
                 metadata={"hash": hash},
             )
+            BM25_INDEX_CACHE.delete(collection_name, filter={"hash": hash})
             return {"status": True}
         else:
             return {"status": False}
@@ -1690,6 +1878,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    BM25_INDEX_CACHE.clear()
     Knowledges.delete_all_knowledge()
 
 
@@ -1721,8 +1910,10 @@ if ENV == "dev":
     @router.get("/ef/{text}")
     async def get_embeddings(request: Request, text: Optional[str] = "Hello World!"):
         return {
-            "result": request.app.state.EMBEDDING_FUNCTION(
-                text, prefix=RAG_EMBEDDING_QUERY_PREFIX
+            "result": await run_in_threadpool(
+                request.app.state.EMBEDDING_FUNCTION,
+                text,
+                prefix=RAG_EMBEDDING_QUERY_PREFIX,
             )
         }
 
@@ -1794,7 +1985,7 @@ def process_files_batch(
             save_docs_to_vector_db(
                 request=request,
                 docs=all_docs,
-                collection_name=collection_name,
+                collection_name=get_vector_collection_name(collection_name),
                 add=True,
                 user=user,
             )
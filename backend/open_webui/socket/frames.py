@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["SOCKET"])
+
+
+class ContentFrameEmitter:
+    """
+    Streams the content of a message that is being generated to the sessions
+    of its user as coalesced frames, at most one per `interval` seconds,
+    instead of the whole content on every token.
+
+    A session receives the whole content first and then only what was
+    appended to it:
+
+        {"content": <content>, "seq": <n>}
+        {"content_delta": <appended text>, "seq": <n + 1>}
+
+    Clients apply a delta only on top of the frame numbered before it. The
+    whole content is sent again to every session when the beginning of it
+    changed (e.g. a reasoning block was closed or a tool call added), and to
+    sessions that did not receive the previous frame (e.g. after a reconnect).
+    """
+
+    def __init__(
+        self,
+        serializer: Callable[[], str],
+        emit: Callable[[str, dict], Awaitable],
+        get_sids: Callable[[], Awaitable[list[str]]],
+        interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.serializer = serializer
+        self.emit = emit
+        self.get_sids = get_sids
+        self.interval = interval
+        self.clock = clock
+
+        # The content of the last frame and the sessions that have it
+        self.content = ""
+        self.seq = 0
+        self.sids: set[str] = set()
+
+        self.dirty = False
+        self.last_sent_at: Optional[float] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        self.frames = 0
+        self.bytes = 0
+
+    async def update(self):
+        """
+        Records that the content changed. It is sent right away if no frame
+        was sent for `interval` seconds, and at the end of the interval
+        otherwise.
+        """
+        self.dirty = True
+        if self._get_wait() <= 0:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def send(self):
+        """Sends the content now, e.g. before waiting on a tool call."""
+        self.dirty = True
+        await self.flush()
+
+    def _get_wait(self) -> float:
+        if self.last_sent_at is None:
+            return 0
+        return self.last_sent_at + self.interval - self.clock()
+
+    async def _flush_later(self):
+        await asyncio.sleep(max(self._get_wait(), 0))
+        await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            self.last_sent_at = self.clock()
+
+            content = self.serializer()
+            sids = await self.get_sids()
+
+            delta = None
+            if content != self.content:
+                self.seq += 1
+                if content.startswith(self.content):
+                    delta = {
+                        "content_delta": content[len(self.content) :],
+                        "seq": self.seq,
+                    }
+                else:
+                    # The beginning changed, every session needs all of it
+                    self.sids = set()
+
+            snapshot = {"content": content, "seq": self.seq}
+            sent = set()
+            for sid in sids:
+                if sid not in self.sids:
+                    frame = snapshot
+                elif delta is not None:
+                    frame = delta
+                else:
+                    sent.add(sid)
+                    continue
+
+                if await self._send(sid, frame):
+                    sent.add(sid)
+
+            self.content = content
+            self.sids = sent
+
+    async def _send(self, sid: str, frame: dict) -> bool:
+        try:
+            await self.emit(sid, frame)
+        except Exception as e:
+            log.warning(f"Failed to send content frame to {sid}: {e}")
+            return False
+
+        self.frames += 1
+        self.bytes += len(json.dumps(frame))
+        return True
+
+    def close(self):
+        """
+        Stops sending frames; the final content is sent with the completion.
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        log.debug(f"Sent {self.frames} content frames, {self.bytes} bytes")
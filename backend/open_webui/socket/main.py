@@ -9,6 +9,7 @@ from open_webui.models.users import Users, UserNameResponse
 from open_webui.models.channels import Channels
 from open_webui.models.chats import Chats
 from open_webui.utils.redis import (
+    get_redis_connection,
     get_sentinels_from_env,
     get_sentinel_url_from_env,
 )
@@ -20,9 +21,21 @@ from open_webui.env import (
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_BROADCAST_INTERVAL,
+    WEBSOCKET_CONTENT_FRAME_INTERVAL,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.frames import ContentFrameEmitter
+from open_webui.socket.presence import DeltaBroadcaster
+from open_webui.socket.utils import (
+    LocalSessionPool,
+    LocalUsagePool,
+    LocalUserPool,
+    RedisLock,
+    RedisSessionPool,
+    RedisUsagePool,
+    RedisUserPool,
+)
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -72,21 +85,15 @@ if WEBSOCKET_MANAGER == "redis":
     redis_sentinels = get_sentinels_from_env(
         WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
     )
-    SESSION_POOL = RedisDict(
-        "open-webui:session_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USER_POOL = RedisDict(
-        "open-webui:user_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USAGE_POOL = RedisDict(
-        "open-webui:usage_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
+    redis = get_redis_connection(
+        WEBSOCKET_REDIS_URL,
+        redis_sentinels,
+        async_mode=True,
+        decode_responses=True,
     )
+    SESSION_POOL = RedisSessionPool("open-webui:session_pool", redis)
+    USER_POOL = RedisUserPool("open-webui:{user_pool}", redis)
+    USAGE_POOL = RedisUsagePool("open-webui:{usage_pool}", redis)
 
     clean_up_lock = RedisLock(
         redis_url=WEBSOCKET_REDIS_URL,
@@ -98,51 +105,50 @@ if WEBSOCKET_MANAGER == "redis":
     renew_func = clean_up_lock.renew_lock
     release_func = clean_up_lock.release_lock
 else:
-    SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
-    aquire_func = release_func = renew_func = lambda: True
+    SESSION_POOL = LocalSessionPool()
+    USER_POOL = LocalUserPool()
+    USAGE_POOL = LocalUsagePool()
+
+    async def aquire_func():
+        return True
+
+    release_func = renew_func = aquire_func
+
+
+# Clients get a snapshot of the online users and models in use when they
+# connect (or ask for one), and coalesced deltas afterwards
+USER_LIST_BROADCASTER = DeltaBroadcaster(
+    lambda delta: sio.emit("user-list-delta", delta),
+    USER_POOL.count,
+    WEBSOCKET_BROADCAST_INTERVAL,
+)
+USAGE_BROADCASTER = DeltaBroadcaster(
+    lambda delta: sio.emit("usage-delta", delta),
+    USAGE_POOL.count,
+    WEBSOCKET_BROADCAST_INTERVAL,
+)
 
 
 async def periodic_usage_pool_cleanup():
-    if not aquire_func():
+    if not await aquire_func():
         log.debug("Usage pool cleanup lock already exists. Not running it.")
         return
     log.debug("Running periodic_usage_pool_cleanup")
     try:
         while True:
-            if not renew_func():
+            if not await renew_func():
                 log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
                 raise Exception("Unable to renew usage pool cleanup lock.")
 
+            # Sessions that have not pinged a model for a while stopped using it
             now = int(time.time())
-            send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
-
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
-
-                send_usage = True
-
-            if send_usage:
-                # Emit updated usage information after cleaning
-                await sio.emit("usage", {"models": get_models_in_use()})
+            for model_id in await USAGE_POOL.expire(now - TIMEOUT_DURATION):
+                log.debug(f"Cleaning up model {model_id} from usage pool")
+                USAGE_BROADCASTER.remove(model_id)
 
             await asyncio.sleep(TIMEOUT_DURATION)
     finally:
-        release_func()
+        await release_func()
 
 
 app = socketio.ASGIApp(
@@ -151,26 +157,33 @@ app = socketio.ASGIApp(
 )
 
 
-def get_models_in_use():
+async def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
-    return models_in_use
+    return await USAGE_POOL.get_model_ids()
+
+
+async def add_user_session(user, sid):
+    await SESSION_POOL.set(sid, user.model_dump())
+    if await USER_POOL.add(user.id, sid):
+        USER_LIST_BROADCASTER.add(user.id)
+
+
+async def emit_snapshots(sid):
+    await sio.emit("user-list", {"user_ids": await USER_POOL.get_user_ids()}, to=sid)
+    await sio.emit("usage", {"models": await get_models_in_use()}, to=sid)
 
 
 @sio.on("usage")
 async def usage(sid, data):
     model_id = data["model"]
     # Record the timestamp for the last update
-    current_time = int(time.time())
+    if await USAGE_POOL.touch(model_id, sid, int(time.time())):
+        USAGE_BROADCASTER.add(model_id)
 
-    # Store the new usage data and task
-    USAGE_POOL[model_id] = {
-        **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-        sid: {"updated_at": current_time},
-    }
 
-    # Broadcast the usage data to all clients
-    await sio.emit("usage", {"models": get_models_in_use()})
+@sio.on("usage-list")
+async def usage_list(sid):
+    await sio.emit("usage", {"models": await get_models_in_use()}, to=sid)
 
 
 @sio.event
@@ -183,15 +196,9 @@ async def connect(sid, environ, auth):
             user = Users.get_user_by_id(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
+            await add_user_session(user, sid)
 
             # print(f"user {user.name}({user.id}) connected with session ID {sid}")
-            await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
-            await sio.emit("usage", {"models": get_models_in_use()})
 
 
 @sio.on("user-join")
@@ -209,11 +216,7 @@ async def user_join(sid, data):
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    await add_user_session(user, sid)
 
     # Join all the channels
     channels = Channels.get_channels_by_user_id(user.id)
@@ -223,7 +226,7 @@ async def user_join(sid, data):
 
     # print(f"user {user.name}({user.id}) connected with session ID {sid}")
 
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await emit_snapshots(sid)
     return {"id": user.id, "name": user.name}
 
 
@@ -264,13 +267,17 @@ async def channel_events(sid, data):
     event_type = event_data["type"]
 
     if event_type == "typing":
+        user = await SESSION_POOL.get(sid)
+        if user is None:
+            return
+
         await sio.emit(
             "channel-events",
             {
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": UserNameResponse(**user).model_dump(),
             },
             room=room,
         )
@@ -278,22 +285,15 @@ async def channel_events(sid, data):
 
 @sio.on("user-list")
 async def user_list(sid):
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": await USER_POOL.get_user_ids()}, to=sid)
 
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
-
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
-
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
-
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    user = await SESSION_POOL.pop(sid)
+    if user:
+        if await USER_POOL.remove(user["id"], sid):
+            USER_LIST_BROADCASTER.remove(user["id"])
     else:
         pass
         # print(f"Unknown session ID {sid} disconnected")
@@ -305,7 +305,7 @@ def get_event_emitter(request_info, update_db=True):
 
         session_ids = list(
             set(
-                USER_POOL.get(user_id, [])
+                await USER_POOL.get_sids(user_id)
                 + (
                     [request_info.get("session_id")]
                     if request_info.get("session_id")
@@ -365,6 +365,35 @@ def get_event_emitter(request_info, update_db=True):
     return __event_emitter__
 
 
+def get_content_frame_emitter(request_info, serializer):
+    user_id = request_info["user_id"]
+    session_id = request_info.get("session_id")
+
+    async def get_sids():
+        sids = await USER_POOL.get_sids(user_id)
+        if session_id and session_id not in sids:
+            sids.append(session_id)
+        return sids
+
+    async def emit(sid, frame):
+        await sio.emit(
+            "chat-events",
+            {
+                "chat_id": request_info.get("chat_id", None),
+                "message_id": request_info.get("message_id", None),
+                "data": {
+                    "type": "chat:completion",
+                    "data": frame,
+                },
+            },
+            to=sid,
+        )
+
+    return ContentFrameEmitter(
+        serializer, emit, get_sids, WEBSOCKET_CONTENT_FRAME_INTERVAL
+    )
+
+
 def get_event_call(request_info):
     async def __event_caller__(event_data):
         response = await sio.call(
@@ -384,28 +413,25 @@ def get_event_call(request_info):
 get_event_caller = get_event_call
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await SESSION_POOL.get(sid)
     if user:
         return user["id"]
     return None
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = sio.manager.get_participants(
         namespace="/",
         room=room,
     )
 
-    active_user_ids = list(
-        set(
-            [SESSION_POOL.get(session_id[0])["id"] for session_id in active_session_ids]
-        )
+    users = await SESSION_POOL.get_many(
+        [session_id[0] for session_id in active_session_ids]
     )
+    active_user_ids = list(set([user["id"] for user in users if user]))
     return active_user_ids
 
 
-def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
-        return True
-    return False
+async def get_active_status_by_user_id(user_id):
+    return await USER_POOL.contains(user_id)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["SOCKET"])
+
+
+class DeltaSet:
+    """Additions to and removals from a set since the last flush, netted out."""
+
+    def __init__(self):
+        self.added: set[str] = set()
+        self.removed: set[str] = set()
+
+    def add(self, item: str):
+        if item in self.removed:
+            # Removed and back again within the window: nothing changed
+            self.removed.discard(item)
+        else:
+            self.added.add(item)
+
+    def remove(self, item: str):
+        if item in self.added:
+            self.added.discard(item)
+        else:
+            self.removed.add(item)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+    def pop(self) -> tuple[list[str], list[str]]:
+        added, removed = sorted(self.added), sorted(self.removed)
+        self.added, self.removed = set(), set()
+        return added, removed
+
+
+class DeltaBroadcaster:
+    """
+    Coalesces changes to a set (online users, models in use) and broadcasts
+    them as one delta per `interval` seconds instead of the whole set on every
+    change:
+
+        {"added": [...], "removed": [...], "count": <size of the set>}
+
+    `add`/`remove` must only be called for actual transitions (a user's first
+    session connects, a model's last session stops using it). Clients apply
+    deltas to their copy of the set and fetch a snapshot when `count` does
+    not match it, e.g. after a missed or reordered delta.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[dict], Awaitable],
+        get_count: Callable[[], Awaitable[int]],
+        interval: float,
+    ):
+        self.emit = emit
+        self.get_count = get_count
+        self.interval = interval
+
+        self.delta = DeltaSet()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.changes = 0
+        self.broadcasts = 0
+
+    def add(self, item: str):
+        self.delta.add(item)
+        self._schedule()
+
+    def remove(self, item: str):
+        self.delta.remove(item)
+        self._schedule()
+
+    def _schedule(self):
+        self.changes += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        await self.flush()
+
+    async def flush(self):
+        if not self.delta:
+            return
+
+        added, removed = self.delta.pop()
+        self.broadcasts += 1
+        try:
+            count = await self.get_count()
+            await self.emit({"added": added, "removed": removed, "count": count})
+        except Exception as e:
+            log.warning(f"Failed to broadcast delta: {e}")
@@ -1,5 +1,7 @@
 import json
 import uuid
+from typing import Optional
+
 from open_webui.utils.redis import get_redis_connection
 
 
@@ -10,82 +12,261 @@ class RedisLock:
         self.timeout_secs = timeout_secs
         self.lock_obtained = False
         self.redis = get_redis_connection(
-            redis_url, redis_sentinels, decode_responses=True
+            redis_url, redis_sentinels, async_mode=True, decode_responses=True
         )
 
-    def aquire_lock(self):
+    async def aquire_lock(self):
         # nx=True will only set this key if it _hasn't_ already been set
-        self.lock_obtained = self.redis.set(
+        self.lock_obtained = await self.redis.set(
             self.lock_name, self.lock_id, nx=True, ex=self.timeout_secs
         )
         return self.lock_obtained
 
-    def renew_lock(self):
+    async def renew_lock(self):
         # xx=True will only set this key if it _has_ already been set
-        return self.redis.set(
+        return await self.redis.set(
             self.lock_name, self.lock_id, xx=True, ex=self.timeout_secs
         )
 
-    def release_lock(self):
-        lock_value = self.redis.get(self.lock_name)
+    async def release_lock(self):
+        lock_value = await self.redis.get(self.lock_name)
         if lock_value and lock_value == self.lock_id:
-            self.redis.delete(self.lock_name)
+            await self.redis.delete(self.lock_name)
+
+
+####################
+# Socket pools
+#
+# Each pool has a Redis implementation, shared by all workers, and an
+# in-memory one for a single worker, with the same async interface.
+# The keys of a Redis pool share a hash tag (e.g. "open-webui:{user_pool}") so
+# that its scripts and transactions work on Redis Cluster.
+####################
 
 
-class RedisDict:
-    def __init__(self, name, redis_url, redis_sentinels=[]):
+class RedisSessionPool:
+    """The user of each session, as JSON in a hash keyed by session id."""
+
+    def __init__(self, name, redis):
         self.name = name
-        self.redis = get_redis_connection(
-            redis_url, redis_sentinels, decode_responses=True
+        self.redis = redis
+
+    async def set(self, sid: str, user: dict):
+        await self.redis.hset(self.name, sid, json.dumps(user))
+
+    async def get(self, sid: str) -> Optional[dict]:
+        value = await self.redis.hget(self.name, sid)
+        return json.loads(value) if value is not None else None
+
+    async def get_many(self, sids: list[str]) -> list[Optional[dict]]:
+        if not sids:
+            return []
+        values = await self.redis.hmget(self.name, sids)
+        return [json.loads(value) if value is not None else None for value in values]
+
+    async def pop(self, sid: str) -> Optional[dict]:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hget(self.name, sid)
+        pipe.hdel(self.name, sid)
+        value, _ = await pipe.execute()
+        return json.loads(value) if value is not None else None
+
+
+class LocalSessionPool:
+    def __init__(self):
+        self.users: dict[str, dict] = {}
+
+    async def set(self, sid: str, user: dict):
+        self.users[sid] = user
+
+    async def get(self, sid: str) -> Optional[dict]:
+        return self.users.get(sid)
+
+    async def get_many(self, sids: list[str]) -> list[Optional[dict]]:
+        return [self.users.get(sid) for sid in sids]
+
+    async def pop(self, sid: str) -> Optional[dict]:
+        return self.users.pop(sid, None)
+
+
+# KEYS: sessions of the user, online users. ARGV: user id, session id.
+# Returns 1 when the user's last session was removed.
+REMOVE_USER_SESSION_SCRIPT = """
+redis.call('SREM', KEYS[1], ARGV[2])
+if redis.call('SCARD', KEYS[1]) == 0 then
+    return redis.call('SREM', KEYS[2], ARGV[1])
+end
+return 0
+"""
+
+
+class RedisUserPool:
+    """
+    The sessions of each user as a set ("<name>:user:<user id>"), and the
+    users with at least one session as another ("<name>:online").
+    """
+
+    def __init__(self, name, redis):
+        self.name = name
+        self.redis = redis
+        self.online_key = f"{name}:online"
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.name}:user:{user_id}"
+
+    async def add(self, user_id: str, sid: str) -> bool:
+        """Adds a session; returns whether it is the user's first one."""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.sadd(self._user_key(user_id), sid)
+        pipe.sadd(self.online_key, user_id)
+        _, added = await pipe.execute()
+        return added == 1
+
+    async def remove(self, user_id: str, sid: str) -> bool:
+        """Removes a session; returns whether it was the user's last one."""
+        removed = await self.redis.eval(
+            REMOVE_USER_SESSION_SCRIPT,
+            2,
+            self._user_key(user_id),
+            self.online_key,
+            user_id,
+            sid,
         )
+        return removed == 1
+
+    async def get_sids(self, user_id: str) -> list[str]:
+        return list(await self.redis.smembers(self._user_key(user_id)))
+
+    async def get_user_ids(self) -> list[str]:
+        return list(await self.redis.smembers(self.online_key))
+
+    async def contains(self, user_id: str) -> bool:
+        return bool(await self.redis.sismember(self.online_key, user_id))
+
+    async def count(self) -> int:
+        return await self.redis.scard(self.online_key)
+
+
+class LocalUserPool:
+    def __init__(self):
+        self.sids: dict[str, set[str]] = {}
+
+    async def add(self, user_id: str, sid: str) -> bool:
+        sids = self.sids.setdefault(user_id, set())
+        first = not sids
+        sids.add(sid)
+        return first
+
+    async def remove(self, user_id: str, sid: str) -> bool:
+        sids = self.sids.get(user_id)
+        if sids is None:
+            return False
+        sids.discard(sid)
+        if sids:
+            return False
+        del self.sids[user_id]
+        return True
+
+    async def get_sids(self, user_id: str) -> list[str]:
+        return list(self.sids.get(user_id, ()))
+
+    async def get_user_ids(self) -> list[str]:
+        return list(self.sids)
+
+    async def contains(self, user_id: str) -> bool:
+        return user_id in self.sids
+
+    async def count(self) -> int:
+        return len(self.sids)
+
+
+# KEYS: sessions using the model, models in use. ARGV: model id, cutoff.
+# Returns 1 when the model's last session was removed.
+EXPIRE_MODEL_USAGE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[2])
+if redis.call('ZCARD', KEYS[1]) == 0 then
+    return redis.call('SREM', KEYS[2], ARGV[1])
+end
+return 0
+"""
+
+
+class RedisUsagePool:
+    """
+    The sessions using each model, as a sorted set scored by the time each
+    was last seen ("<name>:model:<model id>"), and the models in use as a set
+    ("<name>:models").
+    """
+
+    def __init__(self, name, redis):
+        self.name = name
+        self.redis = redis
+        self.models_key = f"{name}:models"
 
-    def __setitem__(self, key, value):
-        serialized_value = json.dumps(value)
-        self.redis.hset(self.name, key, serialized_value)
+    def _model_key(self, model_id: str) -> str:
+        return f"{self.name}:model:{model_id}"
 
-    def __getitem__(self, key):
-        value = self.redis.hget(self.name, key)
-        if value is None:
-            raise KeyError(key)
-        return json.loads(value)
+    async def touch(self, model_id: str, sid: str, now: int) -> bool:
+        """Records that a session uses a model; returns whether it is new."""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.zadd(self._model_key(model_id), {sid: now})
+        pipe.sadd(self.models_key, model_id)
+        _, added = await pipe.execute()
+        return added == 1
 
-    def __delitem__(self, key):
-        result = self.redis.hdel(self.name, key)
-        if result == 0:
-            raise KeyError(key)
+    async def expire(self, before: int) -> list[str]:
+        """
+        Removes the sessions last seen before `before`; returns the models
+        that are no longer in use.
+        """
+        model_ids = list(await self.redis.smembers(self.models_key))
+        if not model_ids:
+            return []
 
-    def __contains__(self, key):
-        return self.redis.hexists(self.name, key)
+        pipe = self.redis.pipeline(transaction=False)
+        for model_id in model_ids:
+            pipe.eval(
+                EXPIRE_MODEL_USAGE_SCRIPT,
+                2,
+                self._model_key(model_id),
+                self.models_key,
+                model_id,
+                before,
+            )
+        results = await pipe.execute()
+        return [
+            model_id for model_id, removed in zip(model_ids, results) if removed == 1
+        ]
 
-    def __len__(self):
-        return self.redis.hlen(self.name)
+    async def get_model_ids(self) -> list[str]:
+        return list(await self.redis.smembers(self.models_key))
 
-    def keys(self):
-        return self.redis.hkeys(self.name)
+    async def count(self) -> int:
+        return await self.redis.scard(self.models_key)
 
-    def values(self):
-        return [json.loads(v) for v in self.redis.hvals(self.name)]
 
-    def items(self):
-        return [(k, json.loads(v)) for k, v in self.redis.hgetall(self.name).items()]
+class LocalUsagePool:
+    def __init__(self):
+        self.models: dict[str, dict[str, int]] = {}
 
-    def get(self, key, default=None):
-        try:
-            return self[key]
-        except KeyError:
-            return default
+    async def touch(self, model_id: str, sid: str, now: int) -> bool:
+        added = model_id not in self.models
+        self.models.setdefault(model_id, {})[sid] = now
+        return added
 
-    def clear(self):
-        self.redis.delete(self.name)
+    async def expire(self, before: int) -> list[str]:
+        removed = []
+        for model_id, sessions in list(self.models.items()):
+            for sid, updated_at in list(sessions.items()):
+                if updated_at < before:
+                    del sessions[sid]
+            if not sessions:
+                del self.models[model_id]
+                removed.append(model_id)
+        return removed
 
-    def update(self, other=None, **kwargs):
-        if other is not None:
-            for k, v in other.items() if hasattr(other, "items") else other:
-                self[k] = v
-        for k, v in kwargs.items():
-            self[k] = v
+    async def get_model_ids(self) -> list[str]:
+        return list(self.models)
 
-    def setdefault(self, key, default=None):
-        if key not in self:
-            self[key] = default
-        return self[key]
+    async def count(self) -> int:
+        return len(self.models)
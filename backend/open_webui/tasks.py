@@ -1,12 +1,88 @@
 # tasks.py
 import asyncio
+import json
+import logging
+import time
 from typing import Dict
 from uuid import uuid4
 
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_KEY_PREFIX,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
 # A dictionary to keep track of active tasks
 tasks: Dict[str, asyncio.Task] = {}
 chat_tasks = {}
 
+# With Redis, tasks are also registered cluster-wide so that any worker can
+# list them and stop them; the worker running a task cancels it when it
+# receives a stop command over pub/sub.
+REDIS_TASKS_KEY = f"{REDIS_KEY_PREFIX}:tasks"
+REDIS_CHAT_TASKS_KEY = f"{REDIS_KEY_PREFIX}:tasks:chat"
+REDIS_WORKER_KEY = f"{REDIS_KEY_PREFIX}:tasks:worker"
+REDIS_PUBSUB_CHANNEL = f"{REDIS_KEY_PREFIX}:tasks:commands"
+
+HEARTBEAT_INTERVAL = 10
+# Tasks of a worker that has not sent a heartbeat for this long are removed
+HEARTBEAT_TIMEOUT = 30
+
+WORKER_ID = str(uuid4())
+
+redis = (
+    get_redis_connection(
+        REDIS_URL,
+        get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+        async_mode=True,
+    )
+    if REDIS_URL
+    else None
+)
+
+# Keep references so background coroutines are not garbage collected
+_background_tasks = set()
+
+
+def _run_in_background(coroutine):
+    task = asyncio.create_task(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _get_chat_tasks_key(id) -> str:
+    return f"{REDIS_CHAT_TASKS_KEY}:{id}"
+
+
+async def _touch_worker():
+    await redis.set(
+        f"{REDIS_WORKER_KEY}:{WORKER_ID}", int(time.time()), ex=HEARTBEAT_TIMEOUT
+    )
+
+
+async def _register_task(task_id: str, id=None):
+    await _touch_worker()
+    await redis.hset(
+        REDIS_TASKS_KEY, task_id, json.dumps({"worker_id": WORKER_ID, "chat_id": id})
+    )
+    if id:
+        await redis.sadd(_get_chat_tasks_key(id), task_id)
+
+
+async def _unregister_task(task_id: str, id=None):
+    try:
+        await redis.hdel(REDIS_TASKS_KEY, task_id)
+        if id:
+            await redis.srem(_get_chat_tasks_key(id), task_id)
+    except Exception as e:
+        log.warning(f"Failed to unregister task {task_id}: {e}")
+
 
 def cleanup_task(task_id: str, id=None):
     """
@@ -20,8 +96,11 @@ def cleanup_task(task_id: str, id=None):
         if not chat_tasks[id]:  # If no tasks left for this ID, remove the entry
             chat_tasks.pop(id, None)
 
+    if redis is not None:
+        _run_in_background(_unregister_task(task_id, id))
+
 
-def create_task(coroutine, id=None):
+async def create_task(coroutine, id=None):
     """
     Create a new asyncio task and add it to the global task dictionary.
     """
@@ -38,6 +117,15 @@ def create_task(coroutine, id=None):
     else:
         chat_tasks[id] = [task_id]
 
+    if redis is not None:
+        try:
+            await _register_task(task_id, id)
+            # The task may have finished while it was being registered
+            if task.done():
+                await _unregister_task(task_id, id)
+        except Exception as e:
+            log.warning(f"Failed to register task {task_id}: {e}")
+
     return task_id, task
 
 
@@ -48,17 +136,21 @@ def get_task(task_id: str):
     return tasks.get(task_id)
 
 
-def list_tasks():
+async def list_tasks():
     """
     List all currently active task IDs.
     """
+    if redis is not None:
+        return list(await redis.hkeys(REDIS_TASKS_KEY))
     return list(tasks.keys())
 
 
-def list_task_ids_by_chat_id(id):
+async def list_task_ids_by_chat_id(id):
     """
     List all tasks associated with a specific ID.
     """
+    if redis is not None:
+        return list(await redis.smembers(_get_chat_tasks_key(id)))
     return chat_tasks.get(id, [])
 
 
@@ -68,6 +160,14 @@ async def stop_task(task_id: str):
     """
     task = tasks.get(task_id)
     if not task:
+        # The task may be running on another worker
+        if redis is not None and await redis.hexists(REDIS_TASKS_KEY, task_id):
+            await redis.publish(
+                REDIS_PUBSUB_CHANNEL,
+                json.dumps({"action": "stop", "task_id": task_id}),
+            )
+            return {"status": True, "message": f"Stop signal sent for {task_id}."}
+
         raise ValueError(f"Task with ID {task_id} not found.")
 
     task.cancel()  # Request task cancellation
@@ -79,3 +179,72 @@ async def stop_task(task_id: str):
         return {"status": True, "message": f"Task {task_id} successfully stopped."}
 
     return {"status": False, "message": f"Failed to stop task {task_id}."}
+
+
+async def cleanup_orphaned_tasks():
+    """
+    Removes registered tasks whose worker stopped sending heartbeats, e.g.
+    because it crashed, as well as stale entries of this worker.
+    """
+    workers_alive = {WORKER_ID: True}
+    for task_id, value in (await redis.hgetall(REDIS_TASKS_KEY)).items():
+        try:
+            entry = json.loads(value)
+        except Exception:
+            entry = {}
+
+        worker_id = entry.get("worker_id")
+        if worker_id not in workers_alive:
+            workers_alive[worker_id] = bool(
+                await redis.exists(f"{REDIS_WORKER_KEY}:{worker_id}")
+            )
+
+        if not workers_alive[worker_id] or (
+            worker_id == WORKER_ID and task_id not in tasks
+        ):
+            log.info(f"Removing orphaned task {task_id} of worker {worker_id}")
+            await _unregister_task(task_id, entry.get("chat_id"))
+
+
+async def task_heartbeat():
+    while True:
+        try:
+            await _touch_worker()
+            await cleanup_orphaned_tasks()
+        except Exception as e:
+            log.warning(f"Task heartbeat failed: {e}")
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+
+async def task_command_listener():
+    while True:
+        try:
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(REDIS_PUBSUB_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+
+                try:
+                    command = json.loads(message["data"])
+                except Exception:
+                    continue
+
+                if command.get("action") == "stop":
+                    task = tasks.get(command.get("task_id"))
+                    if task:
+                        task.cancel()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"Task command listener failed, reconnecting: {e}")
+            await asyncio.sleep(1)
+
+
+async def start_task_registry():
+    """Starts the heartbeat and the stop command listener when Redis is used."""
+    if redis is None:
+        return
+
+    _run_in_background(task_heartbeat())
+    _run_in_background(task_command_listener())
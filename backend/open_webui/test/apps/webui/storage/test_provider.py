@@ -1,3 +1,4 @@
+import hashlib
 import io
 import os
 import pytest
@@ -84,13 +85,35 @@ class TestLocalStorageProvider:
 
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         storage = provider.LocalStorageProvider()
-        contents, file_path = storage.upload_file(self.file_bytesio, self.filename)
+        file_info, file_path = storage.upload_file(self.file_bytesio, self.filename)
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert file_info == {
+            "size": len(self.file_content),
+            "sha256": hashlib.sha256(self.file_content).hexdigest(),
+        }
         assert file_path == str(upload_dir / self.filename)
         with pytest.raises(ValueError):
             storage.upload_file(self.file_bytesio_empty, self.filename)
+        assert not (upload_dir / self.filename).exists()
+
+    def test_upload_file_in_chunks(self, monkeypatch, tmp_path):
+        from open_webui.storage import provider
+
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        monkeypatch.setattr(provider, "UPLOAD_CHUNK_SIZE", 4)
+        reads = []
+
+        class ChunkedFile(io.BytesIO):
+            def read(self, size=-1):
+                reads.append(size)
+                return super().read(size)
+
+        storage = provider.LocalStorageProvider()
+        file_info, _ = storage.upload_file(ChunkedFile(self.file_content), "chunked")
+        assert reads == [4, 4, 4, 4]
+        assert file_info["size"] == len(self.file_content)
+        assert (upload_dir / "chunked").read_bytes() == self.file_content
 
     def test_get_file(self, monkeypatch, tmp_path):
         from open_webui.storage import provider
@@ -135,7 +158,7 @@ def _s3_storage_with_fake(monkeypatch):
         def __init__(self, s):
             self.store = s
 
-        def upload_file(self, file_path, bucket, key):
+        def upload_file(self, file_path, bucket, key, Config=None):
             with open(file_path, "rb") as f:
                 self.store[(bucket, key)] = f.read()
 
@@ -166,11 +189,11 @@ def test_s3_upload_file(monkeypatch, tmp_path):
     filename_extra = "test_exyta.txt"
     file_bytesio_empty = io.BytesIO()
     upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-    contents, s3_file_path = Storage.upload_file(io.BytesIO(file_content), filename)
+    file_info, s3_file_path = Storage.upload_file(io.BytesIO(file_content), filename)
     assert _store[(Storage.bucket_name, filename)] == file_content
     assert (upload_dir / filename).exists()
     assert (upload_dir / filename).read_bytes() == file_content
-    assert contents == file_content
+    assert file_info["size"] == len(file_content)
     assert s3_file_path == "s3://" + Storage.bucket_name + "/" + filename
     with pytest.raises(ValueError):
         Storage.upload_file(file_bytesio_empty, filename)
@@ -181,7 +204,7 @@ def test_s3_get_and_delete(monkeypatch, tmp_path):
     file_content = b"test content"
     filename = "test.txt"
     upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-    contents, s3_file_path = Storage.upload_file(io.BytesIO(file_content), filename)
+    _, s3_file_path = Storage.upload_file(io.BytesIO(file_content), filename)
     file_path = Storage.get_file(s3_file_path)
     assert file_path == str(upload_dir / filename)
     assert (upload_dir / filename).exists()
@@ -250,7 +273,7 @@ def _gcs_storage_with_fake(monkeypatch):
         def __init__(self, s):
             self.store = s
 
-        def blob(self, filename):
+        def blob(self, filename, chunk_size=None):
             return SimpleNamespace(
                 upload_from_filename=lambda path: self._upload(filename, path)
             )
@@ -301,11 +324,11 @@ def test_gcs_upload_get_delete(monkeypatch, tmp_path):
     file_content = b"test content"
     filename = "test.txt"
     upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-    contents, gcs_file_path = Storage.upload_file(io.BytesIO(file_content), filename)
+    file_info, gcs_file_path = Storage.upload_file(io.BytesIO(file_content), filename)
     obj = Storage.bucket.get_blob(filename)
     assert file_content == obj.download_as_bytes()
     assert (upload_dir / filename).exists()
-    assert contents == file_content
+    assert file_info["sha256"] == hashlib.sha256(file_content).hexdigest()
     assert gcs_file_path == f"gs://{Storage.bucket_name}/{filename}"
     # get_file
     path = Storage.get_file(gcs_file_path)
@@ -380,8 +403,8 @@ def test_azure_flow(monkeypatch, tmp_path):
     with pytest.raises(Exception):
         Storage.upload_file(io.BytesIO(file_content), filename)
     Storage.container_client.get_blob_client.side_effect = None
-    contents, url = Storage.upload_file(io.BytesIO(file_content), filename)
-    assert contents == file_content
+    file_info, url = Storage.upload_file(io.BytesIO(file_content), filename)
+    assert file_info["size"] == len(file_content)
     assert (
         url
         == f"https://myaccount.blob.core.windows.net/{Storage.container_name}/{filename}"
@@ -0,0 +1,122 @@
+"""
+Benchmark: filtering an upstream model list by user access control.
+
+Registers `--models` models, a quarter of them shared with one of the user's
+groups, and compares looking up and checking each model on its own (the
+previous behaviour) with the bulk `Models.get_models_by_ids` and
+`filter_by_access` path.
+
+Run from backend/:
+    python open_webui/test/benchmarks/bench_access_filtering.py --models 400 --groups 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", type=int, default=400)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DATA_DIR", data_dir)
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{data_dir}/webui.db")
+    # Measure the lookups themselves rather than the membership cache
+    os.environ.setdefault("USER_CACHE_TTL", "0")
+
+    from sqlalchemy import event
+
+    from open_webui.internal.db import engine
+    from open_webui.models.groups import Groups, GroupForm, GroupUpdateForm
+    from open_webui.models.models import Models, ModelForm, ModelMeta, ModelParams
+    from open_webui.utils.access_control import filter_by_access, has_access
+
+    user_id = str(uuid.uuid4())
+    group_ids = []
+    for idx in range(args.groups):
+        group = Groups.insert_new_group(
+            "admin", GroupForm(name=f"group {idx}", description="")
+        )
+        Groups.update_group_by_id(
+            group.id,
+            GroupUpdateForm(
+                name=group.name, description="", user_ids=[user_id, "other"]
+            ),
+        )
+        group_ids.append(group.id)
+
+    upstream = []
+    for idx in range(args.models):
+        model_id = f"model-{idx}"
+        access_control = {
+            "read": {
+                "group_ids": [group_ids[idx % len(group_ids)]] if idx % 4 == 0 else [],
+                "user_ids": [],
+            },
+            "write": {"group_ids": [], "user_ids": []},
+        }
+        Models.insert_new_model(
+            ModelForm(
+                id=model_id,
+                name=model_id,
+                meta=ModelMeta(),
+                params=ModelParams(),
+                access_control=access_control,
+            ),
+            "admin",
+        )
+        upstream.append({"id": model_id})
+
+    queries = 0
+
+    def count_query(*_):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine, "before_cursor_execute", count_query)
+
+    def per_model():
+        filtered_models = []
+        for model in upstream:
+            model_info = Models.get_model_by_id(model["id"])
+            if model_info:
+                if user_id == model_info.user_id or has_access(
+                    user_id, type="read", access_control=model_info.access_control
+                ):
+                    filtered_models.append(model)
+        return filtered_models
+
+    def bulk():
+        model_infos = Models.get_models_by_ids([model["id"] for model in upstream])
+        accessible_model_ids = {
+            model_info.id
+            for model_info in filter_by_access(user_id, model_infos, "read")
+        }
+        return [model for model in upstream if model["id"] in accessible_model_ids]
+
+    def run(label, filter_models):
+        nonlocal queries
+        queries = 0
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            result = filter_models()
+        elapsed = (time.perf_counter() - start) / args.rounds
+
+        assert len(result) == len(range(0, args.models, 4))
+        print(
+            f"{label:<10} {elapsed * 1000:8.1f}ms  {queries // args.rounds:6d} queries"
+        )
+
+    print(f"{args.models} models, {args.groups} groups")
+    run("per-model", per_model)
+    run("bulk", bulk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark: listing the messages of a busy channel.
+
+Creates a channel of `--messages` messages by `--users` users, with replies
+and reactions, and compares assembling pages of 50 messages the previous way
+(replies, reactions and author looked up per message, pages by offset) with
+`get_message_user_responses` over keyset pages. Reports queries and time per
+page, for the newest page and for one `--depth` messages back.
+
+Run from backend/:
+    python open_webui/test/benchmarks/bench_channel_messages.py --messages 20000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=15000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DATA_DIR", data_dir)
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{data_dir}/webui.db")
+
+    # Creates the tables
+    import open_webui.config  # noqa: F401
+    from sqlalchemy import event
+
+    from open_webui.internal.db import engine, get_db
+    from open_webui.models.channels import ChannelForm, Channels
+    from open_webui.models.messages import (
+        Message,
+        MessageModel,
+        MessageReaction,
+        Messages,
+    )
+    from open_webui.models.users import UserNameResponse, Users
+    from open_webui.routers.channels import (
+        MessageUserResponse,
+        get_message_user_responses,
+    )
+
+    rng = random.Random(0)
+    user_ids = [
+        Users.insert_new_user(
+            str(uuid.uuid4()), f"User {idx}", f"user{idx}@example.com"
+        ).id
+        for idx in range(args.users)
+    ]
+    channel = Channels.insert_new_channel(
+        None, ChannelForm(name="general"), user_ids[0]
+    )
+
+    # Inserted directly: a message and its reply at every step
+    ts = time.time_ns()
+    with get_db() as db:
+        message_ids = []
+        for idx in range(args.messages):
+            ts += 1000
+            message_id = str(uuid.uuid4())
+            parent_id = None
+            if message_ids and rng.random() < 0.2:
+                parent_id = rng.choice(message_ids[-200:])
+            else:
+                message_ids.append(message_id)
+
+            db.add(
+                Message(
+                    id=message_id,
+                    user_id=rng.choice(user_ids),
+                    channel_id=channel.id,
+                    parent_id=parent_id,
+                    content=f"message {idx}",
+                    created_at=ts,
+                    updated_at=ts,
+                )
+            )
+            if rng.random() < 0.3:
+                db.add(
+                    MessageReaction(
+                        id=str(uuid.uuid4()),
+                        user_id=rng.choice(user_ids),
+                        message_id=message_id,
+                        name=rng.choice(["thumbsup", "heart", "eyes"]),
+                        created_at=ts,
+                    )
+                )
+        db.commit()
+
+    queries = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(*_):
+        nonlocal queries
+        queries += 1
+
+    def previous_page(skip):
+        with get_db() as db:
+            message_list = [
+                MessageModel.model_validate(message)
+                for message in db.query(Message)
+                .filter_by(channel_id=channel.id, parent_id=None)
+                .order_by(Message.created_at.desc())
+                .offset(skip)
+                .limit(50)
+                .all()
+            ]
+
+        users = {}
+        messages = []
+        for message in message_list:
+            if message.user_id not in users:
+                users[message.user_id] = Users.get_user_by_id(message.user_id)
+
+            replies = Messages.get_replies_by_message_id(message.id)
+            messages.append(
+                MessageUserResponse(
+                    **{
+                        **message.model_dump(),
+                        "reply_count": len(replies),
+                        "latest_reply_at": replies[0].created_at if replies else None,
+                        "reactions": Messages.get_reactions_by_message_id(message.id),
+                        "user": UserNameResponse(**users[message.user_id].model_dump()),
+                    }
+                )
+            )
+        return messages
+
+    def keyset_page(cursor):
+        before, before_id = cursor if cursor else (None, None)
+        return get_message_user_responses(
+            Messages.get_messages_by_channel_id(
+                channel.id, limit=50, before=before, before_id=before_id
+            )
+        )
+
+    top_level_ids = message_ids[::-1]
+    skip = min(args.depth, len(top_level_ids) - 50)
+    with get_db() as db:
+        message = db.get(Message, top_level_ids[skip - 1])
+        before = (message.created_at, message.id)
+
+    print(
+        f"{args.messages} messages ({len(top_level_ids)} top-level) "
+        f"by {args.users} users"
+    )
+    for label, page, cursor in (
+        ("newest, previous", previous_page, 0),
+        ("newest, batched", keyset_page, None),
+        (f"at {skip}, previous", previous_page, skip),
+        (f"at {skip}, batched", keyset_page, before),
+    ):
+        queries = 0
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            result = page(cursor)
+        elapsed = (time.perf_counter() - start) / args.rounds
+        print(
+            f"  {label:<22} {queries / args.rounds:6.0f} queries "
+            f"{elapsed * 1000:9.2f} ms  ({len(result)} messages)"
+        )
+
+    # Both return the same page
+    assert [m.model_dump() for m in previous_page(skip)] == [
+        m.model_dump() for m in keyset_page(before)
+    ]
+
+
+if __name__ == "__main__":
+    main()
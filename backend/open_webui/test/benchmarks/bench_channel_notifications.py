@@ -0,0 +1,130 @@
+"""
+Benchmark: webhook notifications of a message posted to a large channel.
+
+Serves a local webhook endpoint answering after `--latency` seconds and
+notifies `--users` offline users whose webhooks point to `--urls` distinct
+URLs. Compares posting to each user's webhook in turn with `post_webhook`
+(the previous behaviour) with queueing the notifications in the webhook
+outbox, and reports the time spent in the request and until delivery.
+
+Run from backend/:
+    python open_webui/test/benchmarks/bench_channel_notifications.py --users 2000
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import time
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--urls", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DATA_DIR", data_dir)
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{data_dir}/webui.db")
+
+    from aiohttp import web
+
+    # Creates the tables
+    import open_webui.config  # noqa: F401
+    from open_webui.models.channels import ChannelForm, Channels
+    from open_webui.models.messages import MessageForm, Messages
+    from open_webui.models.notifications import WebhookNotifications
+    from open_webui.models.users import Users
+    from open_webui.routers.channels import send_notification
+    from open_webui.utils.session_pool import SESSION_POOL
+    from open_webui.utils.webhook import post_webhook
+    from open_webui.utils.webhook_outbox import WEBHOOK_OUTBOX
+
+    received = 0
+
+    async def hook(request):
+        nonlocal received
+        await request.json()
+        await asyncio.sleep(args.latency)
+        received += 1
+        return web.json_response({})
+
+    server = web.Application()
+    server.router.add_post("/hook/{id}", hook)
+    runner = web.AppRunner(server)
+    await runner.setup()
+    port = get_free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    for idx in range(args.users):
+        user = Users.insert_new_user(
+            f"user-{idx}", f"User {idx}", f"user{idx}@example.com"
+        )
+        Users.update_user_settings_by_id(
+            user.id,
+            {
+                "ui": {
+                    "notifications": {
+                        "webhook_url": f"http://127.0.0.1:{port}/hook/{idx % args.urls}"
+                    }
+                }
+            },
+        )
+
+    channel = Channels.insert_new_channel(None, ChannelForm(name="all"), "user-0")
+    message = Messages.insert_new_message(
+        MessageForm(content="Hello everyone"), channel.id, "user-0"
+    )
+    webui_url = "http://localhost:8080"
+    print(
+        f"{args.users} offline users, {args.urls} webhook URLs, "
+        f"{args.latency * 1000:g} ms per post"
+    )
+
+    # Previous behaviour: one blocking post per user
+    start = time.perf_counter()
+    for user in Users.get_users():
+        webhook_url = user.settings.ui["notifications"]["webhook_url"]
+        await asyncio.to_thread(
+            post_webhook,
+            "Open WebUI",
+            webhook_url,
+            f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
+            {"action": "channel", "message": message.content},
+        )
+    print(
+        f"  post per user: {received:5d} posts, "
+        f"{time.perf_counter() - start:7.2f} s in the request"
+    )
+
+    received = 0
+    await WEBHOOK_OUTBOX.start()
+    start = time.perf_counter()
+    await send_notification("Open WebUI", webui_url, channel, message, [])
+    queued = time.perf_counter() - start
+    while received < args.urls:
+        await asyncio.sleep(0.01)
+    delivered = time.perf_counter() - start
+    print(
+        f"  outbox:        {received:5d} posts, {queued:7.2f} s in the request, "
+        f"{delivered:.2f} s until delivered"
+    )
+
+    await asyncio.sleep(0.5)
+    assert not WebhookNotifications.get_due_urls(int(time.time()) + 1, 0)
+    await WEBHOOK_OUTBOX.stop()
+    await SESSION_POOL.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Benchmark: bytes sent to the browser while an answer is streamed.
+
+Streams an answer of `--tokens` deltas at `--rate` tokens per second to
+`--tabs` sessions and compares sending the whole content on every delta (the
+previous behaviour) with the coalesced frames of `ContentFrameEmitter`.
+
+Run from backend/:
+    python open_webui/test/benchmarks/bench_chat_frames.py --tokens 1500 --rate 150
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+
+def get_tokens(count: int) -> list[str]:
+    words = "the quick brown fox jumps over the lazy dog".split()
+    return [f"{words[idx % len(words)]} " for idx in range(count)]
+
+
+async def stream(tokens: list[str], rate: float, on_token):
+    start = time.perf_counter()
+    for idx, token in enumerate(tokens):
+        await on_token(token)
+        # Keep to the token rate without drifting
+        delay = start + (idx + 1) / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=1500)
+    parser.add_argument("--rate", type=float, default=150)
+    parser.add_argument("--tabs", type=int, default=2)
+    parser.add_argument("--interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    import open_webui.config  # noqa: F401
+    from open_webui.socket.frames import ContentFrameEmitter
+
+    tokens = get_tokens(args.tokens)
+    sids = [f"sid-{idx}" for idx in range(args.tabs)]
+    print(
+        f"{args.tokens} tokens at {args.rate:g} tokens/s to {args.tabs} tabs, "
+        f"{len(''.join(tokens)) / 1024:.1f} KB answer"
+    )
+
+    # Previous behaviour: the whole content to every tab on every delta
+    sent = {"frames": 0, "bytes": 0}
+    content = ""
+
+    async def send_content(token):
+        nonlocal content
+        content += token
+        frame = json.dumps({"content": content})
+        for _ in sids:
+            sent["frames"] += 1
+            sent["bytes"] += len(frame)
+
+    await stream(tokens, args.rate, send_content)
+    print(
+        f"  every delta:     {sent['frames']:6d} frames "
+        f"{sent['bytes'] / 1024:10.1f} KB"
+    )
+
+    # Coalesced frames
+    content = ""
+
+    async def emit(sid, frame):
+        pass
+
+    async def get_sids():
+        return sids
+
+    frames = ContentFrameEmitter(lambda: content, emit, get_sids, args.interval)
+
+    async def update_frames(token):
+        nonlocal content
+        content += token
+        await frames.update()
+
+    await stream(tokens, args.rate, update_frames)
+    await frames.flush()
+    frames.close()
+    print(
+        f"  {args.interval * 1000:g} ms frames:   {frames.frames:6d} frames "
+        f"{frames.bytes / 1024:10.1f} KB"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
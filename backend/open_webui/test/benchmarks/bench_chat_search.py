@@ -0,0 +1,133 @@
+"""
+Benchmark: sidebar chat search for a user with many chats.
+
+Creates `--chats` chats of `--messages` messages each and compares the previous
+search (LIKE over the title and the JSON `chat` column of every chat the user
+owns) with `Chats.get_chats_by_user_id_and_search_text` on the full-text index.
+
+Run from backend/:
+    python open_webui/test/benchmarks/bench_chat_search.py --chats 5000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+        for _ in range(size)
+    ]
+
+
+def sentence(rng: random.Random, vocabulary: list[str], length: int) -> str:
+    # Zipf-like: a few words are everywhere, most are rare
+    return " ".join(
+        vocabulary[min(int(rng.paretovariate(1.0)) - 1, len(vocabulary) - 1)]
+        for _ in range(length)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=6)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DATA_DIR", data_dir)
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{data_dir}/webui.db")
+
+    # Creates the tables
+    import open_webui.config  # noqa: F401
+    from sqlalchemy import text
+
+    from open_webui.internal.db import get_db
+    from open_webui.models.chats import Chat, Chats, ChatForm
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng, 20000)
+    user_id = str(uuid.uuid4())
+    for idx in range(args.chats):
+        messages = []
+        history = {}
+        parent_id = None
+        for _ in range(args.messages):
+            message_id = str(uuid.uuid4())
+            message = {
+                "id": message_id,
+                "parentId": parent_id,
+                "role": "user",
+                "content": sentence(rng, vocabulary, 80),
+            }
+            messages.append(message)
+            history[message_id] = message
+            parent_id = message_id
+
+        Chats.insert_new_chat(
+            user_id,
+            ChatForm(
+                chat={
+                    "title": sentence(rng, vocabulary, 4),
+                    "messages": messages,
+                    "history": {"messages": history, "currentId": parent_id},
+                }
+            ),
+        )
+
+    def like_search(search_text):
+        # The previous query on SQLite
+        with get_db() as db:
+            return (
+                db.query(Chat)
+                .filter(Chat.user_id == user_id, Chat.archived == False)
+                .order_by(Chat.updated_at.desc())
+                .filter(
+                    (
+                        Chat.title.ilike(f"%{search_text}%")
+                        | text(
+                            """
+                            EXISTS (
+                                SELECT 1
+                                FROM json_each(Chat.chat, '$.messages') AS message
+                                WHERE LOWER(message.value->>'content') LIKE '%' || :search_text || '%'
+                            )
+                            """
+                        )
+                    ).params(search_text=search_text)
+                )
+                .offset(0)
+                .limit(60)
+                .all()
+            )
+
+    def index_search(search_text):
+        return Chats.get_chats_by_user_id_and_search_text(user_id, search_text)
+
+    print(f"{args.chats} chats of {args.messages} messages")
+    # A word in most chats, a word in a few chats, two words, and no match
+    for search_text in (
+        vocabulary[0],
+        vocabulary[200],
+        f"{vocabulary[5]} {vocabulary[50]}",
+        "nomatch",
+    ):
+        for label, search in (("like", like_search), ("index", index_search)):
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                result = search(search_text)
+            elapsed = (time.perf_counter() - start) / args.rounds
+            print(
+                f"{search_text!r:<24} {label:<6} {elapsed * 1000:9.2f}ms  "
+                f"{len(result)} results"
+            )
+
+
+if __name__ == "__main__":
+    main()
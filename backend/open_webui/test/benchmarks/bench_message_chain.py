@@ -0,0 +1,138 @@
+"""
+Benchmark: rebuilding the active branch of a long, branched chat after a turn.
+
+Creates a chat of `--messages` messages in which every few replies were
+regenerated, so the history holds abandoned branches next to the active one.
+Compares the previous behaviour (load and deserialize every message, then walk
+the parent links with `list.insert(0, ...)`) with
+`Chats.get_message_list_by_id_and_message_id`, which walks the cached message
+tree and loads only the messages on the branch.
+
+Run from backend/:
+    python open_webui/test/benchmarks/bench_message_chain.py --messages 5000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+
+def get_message_list_insert(messages, message_id):
+    # The previous implementation of utils.misc.get_message_list
+    current_message = messages.get(message_id)
+    if not current_message:
+        return None
+
+    message_list = []
+    while current_message:
+        message_list.insert(0, current_message)
+        parent_id = current_message["parentId"]
+        current_message = messages.get(parent_id) if parent_id else None
+    return message_list
+
+
+def build_history(count: int, regenerate_every: int) -> tuple[dict, str]:
+    messages = {}
+    parent_id = None
+    turn = 0
+    while len(messages) < count:
+        user_id = str(uuid.uuid4())
+        messages[user_id] = {
+            "id": user_id,
+            "parentId": parent_id,
+            "childrenIds": [],
+            "role": "user",
+            "content": f"Question {turn} " + "lorem ipsum " * 20,
+            "timestamp": turn,
+        }
+
+        replies = 2 if turn % regenerate_every == 0 else 1
+        for _ in range(replies):
+            reply_id = str(uuid.uuid4())
+            messages[reply_id] = {
+                "id": reply_id,
+                "parentId": user_id,
+                "childrenIds": [],
+                "role": "assistant",
+                "model": "llama3",
+                "content": f"Answer {turn} " + "dolor sit amet " * 60,
+                "timestamp": turn,
+            }
+            messages[user_id]["childrenIds"].append(reply_id)
+
+        if parent_id:
+            messages[parent_id]["childrenIds"].append(user_id)
+        # Continue from the latest reply
+        parent_id = reply_id
+        turn += 1
+
+    return messages, parent_id
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--regenerate-every", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DATA_DIR", data_dir)
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{data_dir}/webui.db")
+
+    # Creates the tables
+    import open_webui.config  # noqa: F401
+    from open_webui.models.chats import Chats, ChatForm
+    from open_webui.utils.misc import get_message_list
+
+    messages, current_id = build_history(args.messages, args.regenerate_every)
+    chat = Chats.insert_new_chat(
+        "user",
+        ChatForm(
+            chat={
+                "title": "Long chat",
+                "history": {"messages": messages, "currentId": current_id},
+            }
+        ),
+    )
+
+    def full_load():
+        message_map = Chats.get_messages_by_chat_id(chat.id)
+        return get_message_list_insert(message_map, current_id)
+
+    def branch_index():
+        return Chats.get_message_list_by_id_and_message_id(chat.id, current_id)
+
+    def run(label, get_branch):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            result = get_branch()
+        elapsed = (time.perf_counter() - start) / args.rounds
+        print(f"{label:<14} {elapsed * 1000:9.2f}ms  {len(result)} messages on branch")
+        return result
+
+    print(
+        f"{len(messages)} messages, a regenerated reply every {args.regenerate_every} turns"
+    )
+
+    expected = run("full load", full_load)
+    assert [m["id"] for m in run("branch index", branch_index)] == [
+        m["id"] for m in expected
+    ]
+
+    # The chain walk alone, on the messages already in memory
+    for label, walk in (
+        ("insert(0)", get_message_list_insert),
+        ("append", get_message_list),
+    ):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            walk(messages, current_id)
+        elapsed = (time.perf_counter() - start) / args.rounds
+        print(f"{label:<14} {elapsed * 1000:9.2f}ms  (walk only)")
+
+
+if __name__ == "__main__":
+    main()
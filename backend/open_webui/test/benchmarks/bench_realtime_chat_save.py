@@ -0,0 +1,96 @@
+"""
+Benchmark: persisting a streamed assistant reply with ENABLE_REALTIME_CHAT_SAVE.
+
+Streams a reply of `--tokens` deltas into a chat that already holds `--messages`
+messages and compares writing the chat on every delta (the previous behaviour)
+with the write-behind `MessageWriteBuffer`.
+
+Run from backend/:
+    python open_webui/test/benchmarks/bench_realtime_chat_save.py --tokens 4000 --messages 500
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+
+def build_chat(message_count: int) -> dict:
+    messages = {}
+    parent_id = None
+    for idx in range(message_count):
+        message_id = str(uuid.uuid4())
+        messages[message_id] = {
+            "id": message_id,
+            "parentId": parent_id,
+            "childrenIds": [],
+            "role": "user" if idx % 2 == 0 else "assistant",
+            "content": "lorem ipsum dolor sit amet " * 20,
+            "timestamp": int(time.time()),
+        }
+        if parent_id:
+            messages[parent_id]["childrenIds"].append(message_id)
+        parent_id = message_id
+
+    return {
+        "title": "Benchmark",
+        "history": {"messages": messages, "currentId": parent_id},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=4000)
+    parser.add_argument("--messages", type=int, default=500)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DATA_DIR", data_dir)
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{data_dir}/webui.db")
+
+    # Creates the tables
+    import open_webui.config  # noqa: F401
+    from open_webui.models.chats import Chats, ChatForm
+    from open_webui.utils.message_buffer import MessageWriteBuffer
+
+    tokens = [f"tok{idx} " for idx in range(args.tokens)]
+
+    def run(label, stream):
+        chat = Chats.insert_new_chat("bench", ChatForm(chat=build_chat(args.messages)))
+        message_id = str(uuid.uuid4())
+        start = time.perf_counter()
+        writes = stream(chat.id, message_id)
+        elapsed = time.perf_counter() - start
+
+        stored = Chats.get_message_by_id_and_message_id(chat.id, message_id)
+        assert stored["content"] == "".join(tokens).strip()
+        print(f"{label:<12} {elapsed:8.3f}s  {writes:6d} writes")
+
+    def per_delta(chat_id, message_id):
+        content = ""
+        for token in tokens:
+            content += token
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                chat_id, message_id, {"content": content.strip()}
+            )
+        return len(tokens)
+
+    def buffered(chat_id, message_id):
+        content = ""
+        buffer = MessageWriteBuffer(
+            chat_id, message_id, serializer=lambda: content.strip()
+        )
+        for token in tokens:
+            content += token
+            buffer.append(token)
+        buffer.flush(content.strip())
+        return buffer.flushes
+
+    print(f"{args.tokens} tokens into a {args.messages}-message chat")
+    run("per-delta", per_delta)
+    run("buffered", buffered)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: upstream chat requests with a new aiohttp session per call versus
+the shared `ClientSessionPool`.
+
+Starts a local stub server that streams a short SSE completion, sends
+`--requests` requests with `--concurrency` in flight, and reports the latency
+and how many sockets the server had to accept.
+
+Run from backend/:
+    python open_webui/test/benchmarks/bench_session_pool.py --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+from aiohttp import web
+
+
+async def completions(request: web.Request) -> web.StreamResponse:
+    request.app["peers"].add(request.transport.get_extra_info("peername"))
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    for idx in range(5):
+        await response.write(f'data: {{"delta": "tok{idx}"}}\n\n'.encode())
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    from open_webui.utils.session_pool import ClientSessionPool
+
+    app = web.Application()
+    app["peers"] = set()
+    app.router.add_post("/chat/completions", completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/chat/completions"
+
+    async def consume(response):
+        async for _ in response.content:
+            pass
+
+    async def per_call():
+        async with aiohttp.ClientSession(trust_env=True) as session:
+            async with session.post(url, data=b"{}") as response:
+                await consume(response)
+
+    pool = ClientSessionPool(limit_per_host=args.concurrency, keepalive_timeout=30)
+
+    async def pooled():
+        async with pool.get_session(url).post(url, data=b"{}") as response:
+            await consume(response)
+
+    async def run(label, send):
+        app["peers"].clear()
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def timed():
+            async with semaphore:
+                start = time.perf_counter()
+                await send()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[timed() for _ in range(args.requests)])
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        print(
+            f"{label:<10} {elapsed:7.2f}s  "
+            f"p50 {statistics.median(latencies) * 1000:6.2f}ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:6.2f}ms  "
+            f"{len(app['peers']):5d} sockets"
+        )
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent")
+    await run("per-call", per_call)
+    await run("pooled", pooled)
+
+    await pool.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
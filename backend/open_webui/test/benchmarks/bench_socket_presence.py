@@ -0,0 +1,172 @@
+"""
+Load test: presence and usage traffic of the Socket.IO layer during a
+reconnect storm.
+
+Serves `open_webui.socket.main.app` locally and connects `--clients`
+simulated clients (one user each) at `--concurrency` connections at a time,
+as after a deploy. Every `--chatting`-th client then pings `usage` for a model
+once a second for `--usage-seconds`, and finally half of the clients
+disconnect. Reports the events and bytes the clients received per event type,
+and checks that every client's view of the online users converged.
+
+Run from backend/:
+    python open_webui/test/benchmarks/bench_socket_presence.py --clients 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import time
+import uuid
+from collections import Counter
+
+
+class SimulatedClient:
+    def __init__(self, url: str, token: str):
+        import socketio
+
+        self.url = url
+        self.token = token
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.events = Counter()
+        self.bytes = Counter()
+        self.user_ids: set[str] = set()
+
+        self.client.on("*", self.on_event)
+
+    async def on_event(self, event, data=None):
+        self.events[event] += 1
+        self.bytes[event] += len(json.dumps(data))
+
+        # What the frontend keeps of the online users
+        if event == "user-list":
+            self.user_ids = set(data["user_ids"])
+        elif event == "user-list-delta":
+            self.user_ids |= set(data["added"])
+            self.user_ids -= set(data["removed"])
+
+    async def connect(self):
+        await self.client.connect(
+            self.url,
+            socketio_path="/ws/socket.io",
+            transports=["websocket"],
+            auth={"token": self.token},
+        )
+
+    async def ping_usage(self, model: str, seconds: int):
+        for _ in range(seconds):
+            await self.client.emit("usage", {"action": "chat", "model": model})
+            await asyncio.sleep(1)
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--chatting", type=int, default=10)
+    parser.add_argument("--usage-seconds", type=int, default=5)
+    parser.add_argument("--settle", type=float, default=3)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DATA_DIR", data_dir)
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{data_dir}/webui.db")
+    os.environ.setdefault("ENABLE_WEBSOCKET_SUPPORT", "True")
+
+    import uvicorn
+
+    # Creates the tables
+    import open_webui.config  # noqa: F401
+    from open_webui.models.users import Users
+    from open_webui.socket.main import app, periodic_usage_pool_cleanup
+    from open_webui.utils.auth import create_token
+
+    tokens = []
+    for idx in range(args.clients):
+        user = Users.insert_new_user(
+            str(uuid.uuid4()), f"User {idx}", f"user{idx}@example.com", role="user"
+        )
+        tokens.append(create_token(data={"id": user.id}))
+
+    port = get_free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    cleanup_task = asyncio.create_task(periodic_usage_pool_cleanup())
+
+    url = f"http://127.0.0.1:{port}"
+    clients = [SimulatedClient(url, token) for token in tokens]
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def connect(client):
+        async with semaphore:
+            await client.connect()
+
+    def report(label, elapsed):
+        events, sizes = Counter(), Counter()
+        for client in clients:
+            events.update(client.events)
+            sizes.update(client.bytes)
+            client.events.clear()
+            client.bytes.clear()
+
+        print(f"{label} ({elapsed:.2f}s)")
+        for event in sorted(events):
+            print(
+                f"  {event:<16} {events[event]:9d} events  "
+                f"{sizes[event] / 1024 / 1024:9.2f} MB"
+            )
+        print(
+            f"  {'total':<16} {sum(events.values()):9d} events  "
+            f"{sum(sizes.values()) / 1024 / 1024:9.2f} MB"
+        )
+
+    print(f"{args.clients} clients, {args.concurrency} connecting at a time")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[connect(client) for client in clients])
+    await asyncio.sleep(args.settle)
+    report("connect storm", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[
+            client.ping_usage(f"model-{idx % 3}", args.usage_seconds)
+            for idx, client in enumerate(clients[:: args.chatting])
+        ]
+    )
+    await asyncio.sleep(args.settle + 3)
+    report("usage pings", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    leaving = clients[: len(clients) // 2]
+    await asyncio.gather(*[client.client.disconnect() for client in leaving])
+    await asyncio.sleep(args.settle)
+    report("half disconnect", time.perf_counter() - start)
+
+    staying = clients[len(clients) // 2 :]
+    expected = len(staying)
+    converged = sum(1 for client in staying if len(client.user_ids) == expected)
+    print(f"{converged}/{len(staying)} clients see {expected} online users")
+
+    await asyncio.gather(*[client.client.disconnect() for client in staying])
+    cleanup_task.cancel()
+    server.should_exit = True
+    await server_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from open_webui.utils import access_control
+from open_webui.utils.access_control import filter_by_access, has_access
+
+
+def _resource(user_id, access_control=None):
+    return SimpleNamespace(user_id=user_id, access_control=access_control)
+
+
+class TestFilterByAccess:
+    def setup_method(self):
+        self.lookups = []
+
+    def _get_user_group_ids(self, user_id):
+        self.lookups.append(user_id)
+        return {"g1"}
+
+    def test_groups_are_resolved_once(self, monkeypatch):
+        monkeypatch.setattr(
+            access_control, "get_user_group_ids", self._get_user_group_ids
+        )
+        resources = [
+            _resource("u1"),
+            _resource("u2"),
+            _resource("u2", {"read": {"group_ids": ["g1"], "user_ids": []}}),
+            _resource("u2", {"read": {"group_ids": ["g2"], "user_ids": ["u1"]}}),
+            _resource("u2", {"read": {"group_ids": ["g2"], "user_ids": []}}),
+        ]
+
+        assert filter_by_access("u1", resources, "read") == resources[:4]
+        assert filter_by_access("u1", resources, "write") == resources[:1]
+        assert self.lookups == ["u1", "u1"]
+
+    def test_has_access_with_group_ids(self):
+        access = {"write": {"group_ids": ["g1"], "user_ids": []}}
+        assert has_access("u1", "write", access, user_group_ids={"g1"})
+        assert not has_access("u1", "write", access, user_group_ids={"g2"})
+        assert not has_access("u1", "read", access, user_group_ids={"g1"})
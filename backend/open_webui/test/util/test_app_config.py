@@ -0,0 +1,79 @@
+import json
+
+from open_webui.config import AppConfig, PersistentConfig
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.gets = 0
+        self.published = []
+
+    def get(self, key):
+        self.gets += 1
+        return self.store.get(key)
+
+    def mget(self, keys):
+        self.gets += 1
+        return [self.store.get(key) for key in keys]
+
+    def set(self, key, value):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+def _config(redis):
+    config = AppConfig()
+    object.__setattr__(config, "_redis", redis)
+    config.ENABLE_TEST_FEATURE = PersistentConfig(
+        "ENABLE_TEST_FEATURE", "test.enable_test_feature", False
+    )
+    return config
+
+
+class TestAppConfig:
+    def test_reads_are_served_from_the_snapshot(self):
+        redis = FakeRedis()
+        redis.store["open-webui:config:ENABLE_TEST_FEATURE"] = json.dumps(True)
+        config = _config(redis)
+
+        for _ in range(100):
+            assert config.ENABLE_TEST_FEATURE is True
+        # One version check and one bulk load
+        assert redis.gets == 2
+
+    def test_version_change_reloads_values(self):
+        redis = FakeRedis()
+        config = _config(redis)
+        assert config.ENABLE_TEST_FEATURE is False
+
+        redis.store["open-webui:config:ENABLE_TEST_FEATURE"] = json.dumps(True)
+        redis.incr("open-webui:config:version")
+        assert config.ENABLE_TEST_FEATURE is False
+
+        object.__setattr__(config, "_next_version_check", 0.0)
+        assert config.ENABLE_TEST_FEATURE is True
+
+    def test_invalidation_message_reloads_key(self):
+        redis = FakeRedis()
+        config = _config(redis)
+        assert config.ENABLE_TEST_FEATURE is False
+
+        redis.store["open-webui:config:ENABLE_TEST_FEATURE"] = json.dumps(True)
+        config._on_message({"data": "ENABLE_TEST_FEATURE"})
+        assert config.ENABLE_TEST_FEATURE is True
+
+    def test_updates_are_published(self, monkeypatch):
+        monkeypatch.setattr(PersistentConfig, "save", lambda self: None)
+        redis = FakeRedis()
+        config = _config(redis)
+
+        config.ENABLE_TEST_FEATURE = True
+        assert redis.store["open-webui:config:ENABLE_TEST_FEATURE"] == "true"
+        assert redis.store["open-webui:config:version"] == "1"
+        assert redis.published == [("open-webui:config", "ENABLE_TEST_FEATURE")]
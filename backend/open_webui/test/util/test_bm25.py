@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+from open_webui.retrieval import bm25
+from open_webui.retrieval.bm25 import BM25Index, BM25IndexCache
+
+
+def get_result(ids, texts, metadatas):
+    return SimpleNamespace(ids=[ids], documents=[texts], metadatas=[metadatas])
+
+
+class TestBM25Index:
+    def setup_method(self):
+        self.index = BM25Index()
+        self.index.add(
+            ["1", "2", "3"],
+            ["the cat sat", "the dog barked loudly", "a cat and a dog"],
+            [{"file_id": "a"}, {"file_id": "b"}, {"file_id": "b"}],
+        )
+
+    def test_search_ranks_matching_documents(self):
+        results = self.index.search("cat", k=2)
+        assert [metadata for _, _, metadata in results] == [
+            {"file_id": "a"},
+            {"file_id": "b"},
+        ]
+        assert results[0][0] >= results[1][0]
+
+    def test_incremental_updates_match_rebuild(self):
+        self.index.add(["4"], ["a bird sang"], [{"file_id": "c"}])
+        self.index.remove(["2"])
+
+        rebuilt = BM25Index()
+        rebuilt.add(
+            ["1", "3", "4"],
+            ["the cat sat", "a cat and a dog", "a bird sang"],
+            [{"file_id": "a"}, {"file_id": "b"}, {"file_id": "c"}],
+        )
+        assert self.index.search("a cat dog", k=3) == rebuilt.search("a cat dog", k=3)
+
+    def test_remove_where_filters_by_metadata(self):
+        self.index.remove_where({"file_id": "b"})
+        assert len(self.index) == 1
+        assert self.index.search("dog", k=3) == []
+
+
+class TestBM25IndexCache:
+    def setup_method(self):
+        self.loads = 0
+        self.cache = BM25IndexCache(max_collections=2, max_documents=100)
+
+    def _loader(self):
+        self.loads += 1
+        return get_result(["1"], ["hello world"], [{"file_id": "a"}])
+
+    def test_index_is_built_once(self):
+        self.cache.get("kb", self._loader)
+        self.cache.get("kb", self._loader)
+        assert self.loads == 1
+
+    def test_mutations_are_applied_in_place(self):
+        self.cache.get("kb", self._loader)
+        self.cache.add("kb", ["2"], ["hello there"], [{"file_id": "b"}])
+        self.cache.delete("kb", filter={"file_id": "a"})
+
+        index = self.cache.get("kb", self._loader)
+        assert self.loads == 1
+        assert [text for _, text, _ in index.search("hello", k=5)] == ["hello there"]
+
+    def test_invalidate_and_eviction_force_rebuild(self):
+        self.cache.get("kb", self._loader)
+        self.cache.invalidate("kb")
+        self.cache.get("kb", self._loader)
+        assert self.loads == 2
+
+        self.cache.get("other", self._loader)
+        self.cache.get("third", self._loader)
+        self.cache.get("kb", self._loader)
+        assert self.loads == 5
+
+    def test_redis_versions_are_read_at_most_every_interval(self, monkeypatch):
+        redis = FakeRedis()
+        self.cache._redis = redis
+        now = [0.0]
+        monkeypatch.setattr(bm25.time, "monotonic", lambda: now[0])
+
+        self.cache.get("kb", self._loader)
+        self.cache.get("kb", self._loader)
+        assert (redis.reads, self.loads) == (1, 1)
+
+        # Another worker changes the collection
+        redis.incr(self.cache._version_keys("kb")[1])
+        self.cache.get("kb", self._loader)
+        assert (redis.reads, self.loads) == (1, 1)
+
+        now[0] += BM25IndexCache._version_check_interval
+        self.cache.get("kb", self._loader)
+        assert (redis.reads, self.loads) == (2, 2)
+
+        # Changes made by this worker are seen right away
+        self.cache.add("kb", ["2"], ["hello there"], [{"file_id": "b"}])
+        index = self.cache.get("kb", self._loader)
+        assert (redis.reads, self.loads) == (2, 2)
+        assert len(index) == 2
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.reads = 0
+
+    def mget(self, keys):
+        self.reads += 1
+        return [self.values.get(key) for key in keys]
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
@@ -0,0 +1,116 @@
+from open_webui.internal.db import Base, engine, get_db
+from open_webui.models.messages import (
+    Message,
+    MessageForm,
+    MessageReaction,
+    Messages,
+)
+from open_webui.models.users import User, Users
+from open_webui.routers.channels import get_message_user_responses
+
+
+def insert_message(user_id: str, parent_id: str = None, created_at: int = None):
+    message = Messages.insert_new_message(
+        MessageForm(content="hello", parent_id=parent_id), "channel", user_id
+    )
+    if created_at is not None:
+        with get_db() as db:
+            db.query(Message).filter_by(id=message.id).update(
+                {"created_at": created_at}
+            )
+            db.commit()
+        message.created_at = created_at
+    return message
+
+
+class TestChannelMessages:
+    def setup_method(self):
+        tables = [Message.__table__, MessageReaction.__table__, User.__table__]
+        Base.metadata.drop_all(bind=engine, tables=tables)
+        Base.metadata.create_all(bind=engine, tables=tables)
+
+        Users.insert_new_user("alice", "Alice", "alice@example.com", role="user")
+        Users.insert_new_user("bob", "Bob", "bob@example.com", role="user")
+
+    def test_reply_stats(self):
+        first = insert_message("alice")
+        second = insert_message("alice")
+        insert_message("bob", parent_id=first.id, created_at=10)
+        insert_message("alice", parent_id=first.id, created_at=20)
+
+        assert Messages.get_reply_stats_by_message_ids([first.id, second.id]) == {
+            first.id: (2, 20)
+        }
+        assert Messages.get_reply_stats_by_message_ids([]) == {}
+
+    def test_reactions(self):
+        first = insert_message("alice")
+        second = insert_message("alice")
+        Messages.add_reaction_to_message(first.id, "alice", "+1")
+        Messages.add_reaction_to_message(first.id, "bob", "+1")
+        Messages.add_reaction_to_message(first.id, "bob", "eyes")
+        Messages.add_reaction_to_message(second.id, "bob", "+1")
+
+        reactions = Messages.get_reactions_by_message_ids([first.id, second.id])
+        assert [r.model_dump() for r in reactions[first.id]] == [
+            {"name": "+1", "user_ids": ["alice", "bob"], "count": 2},
+            {"name": "eyes", "user_ids": ["bob"], "count": 1},
+        ]
+        assert [r.name for r in reactions[second.id]] == ["+1"]
+        assert Messages.get_reactions_by_message_ids([]) == {}
+
+    def test_message_user_responses(self):
+        first = insert_message("alice")
+        second = insert_message("bob")
+        insert_message("bob", parent_id=first.id, created_at=10)
+        Messages.add_reaction_to_message(second.id, "alice", "+1")
+        # Messages of deleted users are left out
+        insert_message("carol")
+
+        responses = get_message_user_responses(
+            Messages.get_messages_by_channel_id("channel")
+        )
+
+        assert [(r.id, r.user.name) for r in responses] == [
+            (second.id, "Bob"),
+            (first.id, "Alice"),
+        ]
+        assert (responses[1].reply_count, responses[1].latest_reply_at) == (1, 10)
+        assert (responses[0].reply_count, responses[0].latest_reply_at) == (0, None)
+        assert [r.name for r in responses[0].reactions] == ["+1"]
+
+    def test_pages_do_not_skip_messages_created_at_once(self):
+        message_ids = {insert_message("alice", created_at=100).id for _ in range(5)}
+        message_ids.add(insert_message("alice", created_at=50).id)
+
+        pages = []
+        before = before_id = None
+        while page := Messages.get_messages_by_channel_id(
+            "channel", limit=2, before=before, before_id=before_id
+        ):
+            pages.append(page)
+            before, before_id = page[-1].created_at, page[-1].id
+
+        assert [len(page) for page in pages] == [2, 2, 2]
+        assert {m.id for page in pages for m in page} == message_ids
+        assert pages[-1][-1].created_at == 50
+
+    def test_thread_pages(self):
+        parent = insert_message("alice", created_at=1)
+        reply_ids = [
+            insert_message("bob", parent_id=parent.id, created_at=100).id
+            for _ in range(3)
+        ]
+
+        page = Messages.get_messages_by_parent_id("channel", parent.id, limit=2)
+        assert len(page) == 2
+
+        # The last page ends with the parent message
+        page += Messages.get_messages_by_parent_id(
+            "channel",
+            parent.id,
+            limit=2,
+            before=page[-1].created_at,
+            before_id=page[-1].id,
+        )
+        assert [m.id for m in page] == sorted(reply_ids, reverse=True) + [parent.id]
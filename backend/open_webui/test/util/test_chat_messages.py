@@ -0,0 +1,199 @@
+from open_webui.internal.db import engine, get_db
+from open_webui.models.chat_messages import (
+    ChatMessage,
+    ChatMessageModel,
+    ChatMessages,
+    MessageTree,
+    message_to_columns,
+)
+from open_webui.models.chats import Chat, ChatForm, Chats
+from open_webui.utils.misc import get_message_list
+
+
+def _round_trip(message: dict) -> dict:
+    return ChatMessageModel(
+        chat_id="chat",
+        message_id=message["id"],
+        created_at=0,
+        updated_at=0,
+        **message_to_columns(message),
+    ).to_message()
+
+
+class TestChatMessageColumns:
+    def test_round_trip_assistant_message(self):
+        message = {
+            "id": "m2",
+            "parentId": "m1",
+            "childrenIds": [],
+            "role": "assistant",
+            "model": "gpt-4o",
+            "content": "Hello!",
+            "statusHistory": [{"description": "Searching", "done": True}],
+            "sources": [{"source": {"id": "file"}}],
+            "timestamp": 1700000000,
+        }
+        assert _round_trip(message) == message
+
+    def test_columns_are_split_out_of_data(self):
+        columns = message_to_columns(
+            {"id": "m1", "parentId": None, "role": "user", "content": "Hi"}
+        )
+        assert columns["content"] == "Hi"
+        assert columns["role"] == "user"
+        assert columns["data"] == {}
+
+    def test_non_text_content_is_kept_in_data(self):
+        message = {
+            "id": "m1",
+            "parentId": None,
+            "role": "user",
+            "content": [{"type": "text", "text": "Hi"}],
+        }
+        columns = message_to_columns(message)
+        assert columns["content"] is None
+        assert _round_trip(message) == message
+
+
+class TestMessageTree:
+    def _tree(self):
+        # m1 -> m2 -> m3, and m1 -> m4 (a regenerated reply) -> m5
+        return MessageTree(
+            [("m1", None), ("m2", "m1"), ("m3", "m2"), ("m4", "m1"), ("m5", "m4")]
+        )
+
+    def test_path(self):
+        tree = self._tree()
+        assert tree.get_path("m3") == ["m1", "m2", "m3"]
+        assert tree.get_path("m5") == ["m1", "m4", "m5"]
+        assert tree.get_path("missing") is None
+
+    def test_incremental_updates(self):
+        tree = self._tree()
+        tree.set_parent("m6", "m3")
+        assert tree.get_path("m6") == ["m1", "m2", "m3", "m6"]
+
+        tree.remove("m4")
+        assert tree.get_path("m5") is None
+
+        tree.set_parent("m4", "m3")
+        assert tree.get_path("m5") == ["m1", "m2", "m3", "m4", "m5"]
+
+    def test_cycles_do_not_hang(self):
+        tree = MessageTree([("a", "b"), ("b", "a")])
+        assert tree.get_path("a") is None
+
+
+class TestGetMessageList:
+    def test_follows_parent_links(self):
+        messages = {
+            "m1": {"id": "m1", "parentId": None},
+            "m2": {"id": "m2", "parentId": "m1"},
+            "m3": {"id": "m3", "parentId": "m2"},
+            "m4": {"id": "m4", "parentId": "m1"},
+        }
+        assert [m["id"] for m in get_message_list(messages, "m3")] == [
+            "m1",
+            "m2",
+            "m3",
+        ]
+        assert [m["id"] for m in get_message_list(messages, "m4")] == ["m1", "m4"]
+        assert get_message_list(messages, "missing") is None
+
+
+class TestChatMessageSync:
+    def setup_method(self):
+        tables = [Chat.__table__, ChatMessage.__table__]
+        Chat.metadata.drop_all(bind=engine, tables=tables)
+        Chat.metadata.create_all(bind=engine, tables=tables)
+
+        self.messages = {
+            "m1": {"id": "m1", "parentId": None, "role": "user", "content": "Hi"},
+            "m2": {"id": "m2", "parentId": "m1", "role": "assistant", "content": ""},
+        }
+        self.chat = Chats.insert_new_chat(
+            "user",
+            ChatForm(
+                chat={
+                    "title": "Chat",
+                    "history": {"messages": self.messages, "currentId": "m2"},
+                }
+            ),
+        )
+
+    def _rows(self) -> dict:
+        with get_db() as db:
+            return {
+                row.message_id: (row.content, row.synced)
+                for row in db.query(ChatMessage).filter_by(chat_id=self.chat.id)
+            }
+
+    def _has_unsynced_messages(self) -> bool:
+        with get_db() as db:
+            return db.get(Chat, self.chat.id).has_unsynced_messages
+
+    def _branch(self, message_id: str) -> list[str]:
+        messages = ChatMessages.get_message_list_by_chat_id_and_message_id(
+            self.chat.id, message_id
+        )
+        return [message["id"] for message in messages]
+
+    def test_branch_follows_messages_reparented_elsewhere(self):
+        assert self._branch("m2") == ["m1", "m2"]
+
+        # Another instance re-parents m2; the cached tree does not know about it
+        with get_db() as db:
+            db.add(ChatMessage(chat_id=self.chat.id, message_id="m0", created_at=0))
+            db.query(ChatMessage).filter_by(
+                chat_id=self.chat.id, message_id="m2"
+            ).update({"parent_id": "m0"})
+            db.commit()
+
+        assert self._branch("m2") == ["m0", "m2"]
+
+    def test_single_message_write_is_overlaid_until_saved(self):
+        assert not self._has_unsynced_messages()
+
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            self.chat.id, "m2", {"content": "Hello"}
+        )
+        assert self._has_unsynced_messages()
+        assert self._rows()["m2"] == ("Hello", False)
+
+        chat = Chats.get_chat_by_id(self.chat.id).chat
+        assert chat["history"]["messages"]["m2"]["content"] == "Hello"
+
+        Chats.update_chat_by_id(self.chat.id, chat)
+        assert not self._has_unsynced_messages()
+        assert self._rows() == {"m1": ("Hi", True), "m2": ("Hello", True)}
+
+    def test_content_is_appended_to_the_current_message(self):
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            self.chat.id, "m2", {"content": "Hel"}
+        )
+        assert Chats.append_message_content_by_id_and_message_id(
+            self.chat.id, "m2", "lo", 3
+        )
+        assert self._rows()["m2"] == ("Hello", False)
+        chat = Chats.get_chat_by_id(self.chat.id).chat
+        assert chat["history"]["messages"]["m2"]["content"] == "Hello"
+
+        # Not when the content changed meanwhile, or for other messages
+        assert not Chats.append_message_content_by_id_and_message_id(
+            self.chat.id, "m2", "!", 3
+        )
+        assert not Chats.append_message_content_by_id_and_message_id(
+            self.chat.id, "m1", "!", 2
+        )
+        assert self._rows()["m2"] == ("Hello", False)
+
+    def test_save_writes_only_changed_messages(self):
+        chat = Chats.get_chat_by_id(self.chat.id).chat
+        messages = chat["history"]["messages"]
+        messages["m2"]["content"] = "Edited"
+        messages["m3"] = {"id": "m3", "parentId": "m2", "role": "user"}
+        del messages["m1"]
+
+        Chats.update_chat_by_id(self.chat.id, chat)
+        assert self._rows() == {"m2": ("Edited", True), "m3": (None, True)}
+        assert Chats.get_messages_by_chat_id(self.chat.id)["m3"]["parentId"] == "m2"
@@ -0,0 +1,134 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+import alembic
+import pytest
+from sqlalchemy import text
+
+from open_webui.internal.db import Base, engine, get_db
+from open_webui.models.chat_messages import ChatMessage
+from open_webui.models.chats import Chat, ChatForm, Chats, get_chat_search_query
+
+
+class TestChatSearchQuery:
+    def test_words_become_prefix_queries(self):
+        assert get_chat_search_query("deploy kube", "sqlite") == '"deploy"* "kube"*'
+        assert get_chat_search_query("deploy kube", "postgresql") == (
+            "deploy:* & kube:*"
+        )
+
+    def test_query_syntax_is_stripped(self):
+        assert get_chat_search_query('"a" OR b* -c:(d)', "sqlite") == (
+            '"a"* "OR"* "b"* "c"* "d"*'
+        )
+        assert get_chat_search_query("x' & !y | z", "postgresql") == ("x:* & y:* & z:*")
+
+    def test_no_words(self):
+        assert get_chat_search_query("  !?  ", "sqlite") is None
+        assert get_chat_search_query("", "postgresql") is None
+
+
+class TestChatSearch:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        with engine.begin() as connection:
+            # Runs the add_chat_search_index migration against the test database
+            op = SimpleNamespace(
+                get_bind=lambda: connection,
+                execute=lambda statement: connection.execute(text(statement)),
+            )
+            monkeypatch.setattr(alembic, "op", op, raising=False)
+            migration = import_module(
+                "open_webui.migrations.versions.5d1e8a4c2f07_add_chat_search_index"
+            )
+            monkeypatch.setattr(migration, "op", op)
+
+            migration.downgrade()
+            tables = [Chat.__table__, ChatMessage.__table__]
+            Base.metadata.drop_all(bind=connection, tables=tables)
+            Base.metadata.create_all(bind=connection, tables=tables)
+            migration.upgrade()
+
+    def _insert_chat(self, title: str, content: str, updated_at: int = 0) -> str:
+        chat = Chats.insert_new_chat(
+            "user",
+            ChatForm(
+                chat={
+                    "title": title,
+                    "history": {
+                        "messages": {
+                            "m1": {"id": "m1", "parentId": None, "content": content}
+                        },
+                        "currentId": "m1",
+                    },
+                }
+            ),
+        )
+        with get_db() as db:
+            db.query(Chat).filter_by(id=chat.id).update({"updated_at": updated_at})
+            db.commit()
+        return chat.id
+
+    def _search(self, search_text: str) -> list[str]:
+        return [
+            chat.id
+            for chat in Chats.get_chats_by_user_id_and_search_text("user", search_text)
+        ]
+
+    def test_title_matches_rank_first(self):
+        in_message = self._insert_chat("Notes", "how to deploy the app", 2)
+        in_title = self._insert_chat("Deployment", "see the runbook", 1)
+        self._insert_chat("Groceries", "milk and eggs", 3)
+
+        assert self._search("deploy") == [in_title, in_message]
+        assert self._search("deploy app") == [in_message]
+
+    def test_index_follows_updates_and_deletes(self):
+        chat_id = self._insert_chat("Cluster", "setting up docker")
+        assert self._search("docker") == [chat_id]
+
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            chat_id, "m1", {"content": "setting up kubernetes"}
+        )
+        assert self._search("docker") == []
+        assert self._search("kube") == [chat_id]
+
+        chat = Chats.get_chat_by_id(chat_id).chat
+        Chats.update_chat_by_id(chat_id, {**chat, "title": "Orchestration"})
+        assert self._search("cluster") == []
+        assert self._search("orchestr") == [chat_id]
+
+        Chats.delete_chat_by_id(chat_id)
+        assert self._search("kube") == []
+
+    def test_index_survives_renumbered_rowids(self):
+        first = self._insert_chat("Docker", "compose files")
+        second = self._insert_chat("Podman", "compose files")
+
+        # VACUUM may renumber the implicit rowids of tables with TEXT keys
+        with get_db() as db:
+            db.execute(text("UPDATE chat SET rowid = rowid + 1000"))
+            db.execute(text("UPDATE chat_message SET rowid = rowid + 1000"))
+            db.commit()
+
+        assert self._search("docker") == [first]
+        Chats.delete_chat_by_id(first)
+        assert self._search("docker") == []
+        assert self._search("compose") == [second]
+
+    def test_tag_filters(self):
+        tagged = self._insert_chat("Deploy at work", "")
+        self._insert_chat("Deploy at home", "")
+        with get_db() as db:
+            db.query(Chat).filter_by(id=tagged).update({"meta": {"tags": ["work"]}})
+            db.commit()
+
+        assert self._search("tag:work deploy") == [tagged]
+        assert self._search("tag:work") == [tagged]
+
+    def test_punctuation_only_matches_titles(self):
+        question = self._insert_chat("Why?", "")
+        self._insert_chat("Answers", "all of them?")
+
+        assert self._search("?") == [question]
+        assert self._search("%") == []
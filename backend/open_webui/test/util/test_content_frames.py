@@ -0,0 +1,64 @@
+import asyncio
+
+from open_webui.socket.frames import ContentFrameEmitter
+
+
+class TestContentFrameEmitter:
+    def run_emitter(self, steps, interval=0):
+        async def run():
+            state = {"content": "", "sids": ["s1"]}
+            sent = []
+
+            async def emit(sid, frame):
+                sent.append((sid, frame))
+
+            async def get_sids():
+                return state["sids"]
+
+            frames = ContentFrameEmitter(
+                lambda: state["content"], emit, get_sids, interval
+            )
+            for step in steps:
+                state.update(step)
+                await frames.update()
+            await frames.flush()
+            frames.close()
+            return sent, frames
+
+        return asyncio.run(run())
+
+    def test_appended_content_is_sent_as_deltas(self):
+        sent, frames = self.run_emitter(
+            [{"content": "Hel"}, {"content": "Hello"}, {"content": "Hello!"}]
+        )
+        assert sent == [
+            ("s1", {"content": "Hel", "seq": 1}),
+            ("s1", {"content_delta": "lo", "seq": 2}),
+            ("s1", {"content_delta": "!", "seq": 3}),
+        ]
+        assert frames.frames == 3
+
+    def test_snapshots_on_new_sessions_and_rewrites(self):
+        sent, _ = self.run_emitter(
+            [
+                {"content": "<think>"},
+                {"content": "<think>a", "sids": ["s1", "s2"]},
+                {"content": "<details>a</details>"},
+            ]
+        )
+        assert sent == [
+            ("s1", {"content": "<think>", "seq": 1}),
+            ("s1", {"content_delta": "a", "seq": 2}),
+            ("s2", {"content": "<think>a", "seq": 2}),
+            ("s1", {"content": "<details>a</details>", "seq": 3}),
+            ("s2", {"content": "<details>a</details>", "seq": 3}),
+        ]
+
+    def test_updates_within_the_interval_are_coalesced(self):
+        sent, _ = self.run_emitter(
+            [{"content": "a"}, {"content": "ab"}, {"content": "abc"}], interval=60
+        )
+        assert sent == [
+            ("s1", {"content": "a", "seq": 1}),
+            ("s1", {"content_delta": "bc", "seq": 2}),
+        ]
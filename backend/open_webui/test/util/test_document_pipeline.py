@@ -0,0 +1,233 @@
+from types import SimpleNamespace
+
+import pytest
+import tiktoken
+from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
+from langchain_core.documents import Document
+
+from open_webui.constants import ERROR_MESSAGES
+from open_webui.retrieval.vector.main import GetResult
+from open_webui.routers import retrieval
+from open_webui.routers.retrieval import (
+    get_split_window_end,
+    iter_batches,
+    iter_split_documents,
+    save_docs_to_vector_db,
+)
+
+TEXT = " ".join(f"word{i}" for i in range(2000))
+
+
+def get_text_splitter():
+    return RecursiveCharacterTextSplitter(
+        chunk_size=100, chunk_overlap=30, add_start_index=True
+    )
+
+
+def get_token_splitter(monkeypatch):
+    # Bytes, plus a few merges so that tokens span several characters
+    mergeable_ranks = {bytes([i]): i for i in range(256)}
+    mergeable_ranks.update({b"wo": 256, b"rd": 257, b"word": 258})
+    encoding = tiktoken.Encoding(
+        name="test",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks=mergeable_ranks,
+        special_tokens={},
+    )
+    monkeypatch.setattr(tiktoken, "get_encoding", lambda name: encoding)
+    return TokenTextSplitter(chunk_size=40, chunk_overlap=10, add_start_index=True)
+
+
+class FakeVectorDB:
+    def __init__(self):
+        self.items: dict[str, dict] = {}
+
+    def has_collection(self, collection_name):
+        return bool(self.items)
+
+    def insert(self, collection_name, items):
+        for item in items:
+            self.items[item["id"]] = item
+
+    def delete(self, collection_name, ids=None, filter=None):
+        for id in ids:
+            self.items.pop(id)
+
+    def query(self, collection_name, filter, limit=None):
+        items = [
+            item
+            for item in self.items.values()
+            if all(item["metadata"].get(k) == v for k, v in filter.items())
+        ]
+        return GetResult(
+            ids=[[item["id"] for item in items]],
+            documents=[[item["text"] for item in items]],
+            metadatas=[[item["metadata"] for item in items]],
+        )
+
+
+class TestSplitWindows:
+    def test_window_end(self):
+        text = "aaaa bbbb\ncccc\n\ndddd eeee"
+        # Paragraph breaks are preferred over lines and words
+        assert get_split_window_end(text, 0, 20) == text.index("dddd")
+        assert get_split_window_end(text, 0, 12) == text.index("cccc")
+        assert get_split_window_end(text, 0, 8) == text.index("bbbb")
+        assert get_split_window_end(text, 5, 8) == text.index("cccc")
+        # Without a break in the second half of the window
+        assert get_split_window_end("a" * 20, 0, 8) == 8
+        assert get_split_window_end(text, 0, len(text) + 1) == len(text)
+
+    def test_windows_split_like_the_whole_document(self, monkeypatch):
+        doc = Document(page_content=TEXT, metadata={"name": "doc"})
+        expected = get_text_splitter().split_documents([doc])
+
+        monkeypatch.setattr(retrieval, "SPLIT_WINDOW_SIZE", 1000)
+        chunks = list(iter_split_documents(get_text_splitter(), [doc]))
+
+        assert [c.page_content for c in chunks] == [c.page_content for c in expected]
+        assert [c.metadata for c in chunks] == [c.metadata for c in expected]
+        for chunk in chunks:
+            start_index = chunk.metadata["start_index"]
+            assert TEXT[start_index:].startswith(chunk.page_content)
+
+    def test_token_splitter_windows(self, monkeypatch):
+        doc = Document(page_content=TEXT, metadata={"name": "doc"})
+        expected = get_token_splitter(monkeypatch).split_documents([doc])
+        # The splitter itself loses the start of chunks after the first
+        assert any(c.metadata["start_index"] == -1 for c in expected)
+
+        monkeypatch.setattr(retrieval, "SPLIT_WINDOW_SIZE", 1000)
+        chunks = list(iter_split_documents(get_token_splitter(monkeypatch), [doc]))
+
+        assert [c.page_content for c in chunks] == [c.page_content for c in expected]
+        for chunk in chunks:
+            start_index = chunk.metadata["start_index"]
+            assert TEXT[start_index:].startswith(chunk.page_content)
+
+    def test_unknown_start_indexes_are_kept(self, monkeypatch):
+        # Byte tokens cut multi-byte characters, so chunks are not in the text
+        text = " ".join(f"wörd{i}" for i in range(2000))
+        monkeypatch.setattr(retrieval, "SPLIT_WINDOW_SIZE", 1000)
+        chunks = list(
+            iter_split_documents(
+                get_token_splitter(monkeypatch), [Document(page_content=text)]
+            )
+        )
+
+        start_indexes = [c.metadata["start_index"] for c in chunks]
+        assert -1 in start_indexes
+        for chunk, start_index in zip(chunks, start_indexes):
+            if start_index != -1:
+                assert text[start_index:].startswith(chunk.page_content)
+        assert chunks[-1].page_content.endswith("wörd1999")
+
+    def test_documents_are_split_in_order(self, monkeypatch):
+        monkeypatch.setattr(retrieval, "SPLIT_WINDOW_SIZE", 1000)
+        docs = [
+            Document(page_content=TEXT[:3000], metadata={"name": "a"}),
+            Document(page_content=TEXT[:50], metadata={"name": "b"}),
+        ]
+        chunks = list(iter_split_documents(get_text_splitter(), docs))
+
+        assert chunks[-1].metadata == {"name": "b", "start_index": 0}
+        assert {c.metadata["name"] for c in chunks[:-1]} == {"a"}
+
+
+class TestBatches:
+    def test_batches(self):
+        assert list(iter_batches(range(5), 2)) == [
+            ([0, 1], False),
+            ([2, 3], False),
+            ([4], True),
+        ]
+        assert list(iter_batches(range(4), 2)) == [([0, 1], False), ([2, 3], True)]
+        assert list(iter_batches([], 2)) == []
+
+
+class TestSaveDocs:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.vector_db = FakeVectorDB()
+        self.embedded_batches = []
+        self.cancel_after = None
+
+        def embedding_function(texts, prefix=None, user=None):
+            self.embedded_batches.append(texts)
+            return [[1.0, 0.0] for _ in texts]
+
+        monkeypatch.setattr(retrieval, "VECTOR_DB_CLIENT", self.vector_db)
+        monkeypatch.setattr(
+            retrieval, "get_embedding_function", lambda *args: embedding_function
+        )
+        monkeypatch.setattr(retrieval, "RAG_INGESTION_BATCH_SIZE", 10)
+
+        config = SimpleNamespace(
+            TEXT_SPLITTER="character",
+            CHUNK_SIZE=100,
+            CHUNK_OVERLAP=30,
+            RAG_EMBEDDING_ENGINE="",
+            RAG_EMBEDDING_MODEL="model",
+            RAG_EMBEDDING_BATCH_SIZE=10,
+            RAG_OLLAMA_BASE_URL="",
+            RAG_OLLAMA_API_KEY="",
+        )
+        self.request = SimpleNamespace(
+            app=SimpleNamespace(state=SimpleNamespace(config=config, ef=None)),
+            state=SimpleNamespace(is_cancelled=self._is_cancelled),
+        )
+
+    def _is_cancelled(self):
+        return (
+            self.cancel_after is not None
+            and len(self.embedded_batches) >= self.cancel_after
+        )
+
+    def _save(self):
+        return save_docs_to_vector_db(
+            self.request,
+            [Document(page_content=TEXT, metadata={"name": "doc"})],
+            "collection",
+            metadata={"file_id": "f1", "hash": "hash"},
+            add=True,
+        )
+
+    def _partial_flags(self):
+        return [
+            item["metadata"].get("partial") for item in self.vector_db.items.values()
+        ]
+
+    def test_batches_are_inserted(self):
+        assert self._save()
+
+        chunk_count = len(get_text_splitter().split_text(TEXT))
+        assert [len(texts) for texts in self.embedded_batches[:-1]] == [10] * (
+            len(self.embedded_batches) - 1
+        )
+        assert sum(len(texts) for texts in self.embedded_batches) == chunk_count
+
+        # Only the chunks before the last batch are marked partial
+        flags = self._partial_flags()
+        last_batch_size = len(self.embedded_batches[-1])
+        assert (
+            flags == [True] * (chunk_count - last_batch_size) + [None] * last_batch_size
+        )
+
+        with pytest.raises(ValueError, match=ERROR_MESSAGES.DUPLICATE_CONTENT):
+            self._save()
+
+    def test_cancelled_document_is_replaced(self):
+        self.cancel_after = 2
+        with pytest.raises(ValueError, match="Processing cancelled"):
+            self._save()
+
+        # Inserted batches are kept, marked partial
+        assert self._partial_flags() == [True] * 20
+
+        self.cancel_after = None
+        self.embedded_batches = []
+        assert self._save()
+
+        chunk_count = len(get_text_splitter().split_text(TEXT))
+        assert len(self.vector_db.items) == chunk_count
+        assert None in self._partial_flags()
@@ -0,0 +1,94 @@
+from open_webui.retrieval.embedding_cache import (
+    EmbeddingCache,
+    SQLiteEmbeddingStore,
+    encode_vector,
+)
+
+
+class TestEmbeddingCache:
+    def setup_method(self):
+        self.calls = []
+
+    def _embed(self, query, prefix=None, user=None):
+        self.calls.append(query)
+        texts = query if isinstance(query, list) else [query]
+        embeddings = [[float(len(text)), float(len(prefix or ""))] for text in texts]
+        return embeddings if isinstance(query, list) else embeddings[0]
+
+    def test_only_missing_texts_are_embedded(self):
+        cache = EmbeddingCache(max_bytes=10000)
+        embed = cache.wrap(self._embed, "openai", "small")
+
+        assert embed(["a", "bb"]) == [[1.0, 0.0], [2.0, 0.0]]
+        assert embed(["bb", "ccc", "ccc"]) == [[2.0, 0.0], [3.0, 0.0], [3.0, 0.0]]
+        assert embed("a") == [1.0, 0.0]
+        assert self.calls == [["a", "bb"], ["ccc"]]
+
+        stats = cache.get_stats()
+        assert stats["memory_hits"] == 2
+        assert stats["misses"] == 3
+
+    def test_prefix_is_part_of_the_key(self):
+        cache = EmbeddingCache(max_bytes=10000)
+        embed = cache.wrap(self._embed, "openai", "small")
+
+        assert embed("a", prefix="query: ") == [1.0, 7.0]
+        assert embed("a") == [1.0, 0.0]
+        assert len(self.calls) == 2
+
+    def test_persistent_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "embeddings.db")
+        embed = EmbeddingCache(1000, store=SQLiteEmbeddingStore(path)).wrap(
+            self._embed, "ollama", "nomic"
+        )
+        embed(["hello", "world"])
+
+        cache = EmbeddingCache(1000, store=SQLiteEmbeddingStore(path))
+        embed = cache.wrap(self._embed, "ollama", "nomic")
+        assert embed(["hello", "world"]) == [[5.0, 0.0], [5.0, 0.0]]
+        assert len(self.calls) == 1
+        assert cache.get_stats()["store_hits"] == 2
+
+    def test_model_change_purges_entries(self, tmp_path):
+        store = SQLiteEmbeddingStore(str(tmp_path / "embeddings.db"))
+        cache = EmbeddingCache(1000, store=store)
+
+        cache.wrap(self._embed, "ollama", "nomic")(["hello"])
+        cache.wrap(self._embed, "ollama", "mxbai")(["hello"])
+        assert len(self.calls) == 2
+        assert store.conn.execute("SELECT COUNT(*) FROM embedding").fetchone()[0] == 1
+
+    def test_base_url_is_part_of_the_namespace(self):
+        cache = EmbeddingCache(max_bytes=10000)
+
+        cache.wrap(self._embed, "ollama", "nomic", "http://a:11434")(["hello"])
+        cache.wrap(self._embed, "ollama", "nomic", "http://b:11434")(["hello"])
+        assert len(self.calls) == 2
+
+    def test_memory_is_bounded_by_bytes(self):
+        # Each [len, 0.0] vector packs into 16 bytes
+        cache = EmbeddingCache(max_bytes=48)
+        embed = cache.wrap(self._embed, "openai", "small")
+
+        embed(["a", "bb", "ccc", "dddd"])
+        stats = cache.get_stats()
+        assert (stats["entries"], stats["bytes"]) == (3, 48)
+
+        # The least recently used entry was evicted
+        embed(["a"])
+        assert self.calls[-1] == ["a"]
+        embed(["dddd"])
+        assert self.calls[-1] == ["a"]
+
+    def test_store_evicts_least_recently_used_entries(self, tmp_path):
+        store = SQLiteEmbeddingStore(str(tmp_path / "embeddings.db"), max_entries=10)
+        store.set_many("ns", {f"old-{i}": encode_vector([float(i)]) for i in range(5)})
+        store.conn.execute("UPDATE embedding SET created_at = 0")
+        # Reading an entry marks it as recently used
+        store.get_many(["old-0"])
+
+        store.set_many("ns", {f"new-{i}": encode_vector([float(i)]) for i in range(6)})
+        keys = {row[0] for row in store.conn.execute("SELECT key FROM embedding")}
+        assert len(keys) == 9
+        assert "old-0" in keys
+        assert all(f"new-{i}" in keys for i in range(6))
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from open_webui.retrieval.embeddings import EmbeddingExecutor
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}")
+
+
+class FakeSession:
+    def __init__(self, status_codes):
+        self.status_codes = list(status_codes)
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.status_codes.pop(0))
+
+
+class TestEmbeddingExecutor:
+    def test_batches_respect_size_and_token_budget(self):
+        executor = EmbeddingExecutor(max_batch_tokens=10)
+        texts = ["a" * 12, "b" * 12, "c" * 60, "d", "e", "f"]
+        assert executor.get_batches(texts, batch_size=2) == [
+            (0, 2),
+            (2, 3),
+            (3, 5),
+            (5, 6),
+        ]
+
+    def test_map_preserves_order_with_bounded_concurrency(self):
+        executor = EmbeddingExecutor(concurrency=3)
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def embed(texts):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01 * (len(texts) % 3))
+            with lock:
+                in_flight -= 1
+            return [[float(text)] for text in texts]
+
+        texts = [str(idx) for idx in range(50)]
+        embeddings = executor.map(embed, texts, batch_size=4)
+
+        assert embeddings == [[float(idx)] for idx in range(50)]
+        assert peak <= 3
+
+    def test_single_batches_share_the_concurrency_cap(self):
+        executor = EmbeddingExecutor(concurrency=2)
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def embed(texts):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return [[1.0] for _ in texts]
+
+        threads = [
+            threading.Thread(target=executor.map, args=(embed, ["a"], 4))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak <= 2
+
+    def test_map_raises_on_failed_batch(self):
+        executor = EmbeddingExecutor()
+        with pytest.raises(ValueError):
+            executor.map(lambda texts: None, ["a", "b", "c"], batch_size=2)
+
+    def test_post_retries_on_throttling(self):
+        executor = EmbeddingExecutor(max_retries=3, backoff=0)
+        executor._session = FakeSession([429, 503, 200])
+        assert executor.post("http://embed").status_code == 200
+        assert executor._session.calls == 3
+
+    def test_post_gives_up_after_max_retries(self):
+        executor = EmbeddingExecutor(max_retries=1, backoff=0)
+        executor._session = FakeSession([500, 500])
+        with pytest.raises(requests.HTTPError):
+            executor.post("http://embed")
+
+    def test_post_does_not_retry_client_errors(self):
+        executor = EmbeddingExecutor(max_retries=3, backoff=0)
+        executor._session = FakeSession([400])
+        with pytest.raises(requests.HTTPError):
+            executor.post("http://embed")
+        assert executor._session.calls == 1
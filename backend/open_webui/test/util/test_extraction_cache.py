@@ -0,0 +1,74 @@
+import os
+import time
+
+from langchain_core.documents import Document
+
+from open_webui.retrieval.extraction_cache import ExtractionCache
+from open_webui.retrieval.loaders.main import Loader
+
+
+class TestExtractionCache:
+    def test_round_trip(self, tmp_path):
+        cache = ExtractionCache(str(tmp_path))
+        docs = [
+            Document(page_content="première page", metadata={"page": 0}),
+            Document(page_content="second page", metadata={"page": 1, "source": "a"}),
+        ]
+
+        assert cache.get("key") is None
+        cache.set("key", docs)
+        assert cache.get("key") == docs
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_unreadable_entry_is_discarded(self, tmp_path):
+        cache = ExtractionCache(str(tmp_path))
+        cache.set("key", [Document(page_content="text")])
+        with open(cache._path("key"), "wb") as f:
+            f.write(b"garbage")
+
+        assert cache.get("key") is None
+        assert not os.path.exists(cache._path("key"))
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        cache = ExtractionCache(str(tmp_path))
+        for key in ["a", "b", "c"]:
+            cache.set(key, [Document(page_content=os.urandom(2000).hex())])
+        entry_size = os.path.getsize(cache._path("a"))
+
+        now = time.time()
+        for idx, key in enumerate(["b", "a", "c"]):
+            os.utime(cache._path(key), (now - 100 + idx, now - 100 + idx))
+
+        cache.max_size = int(entry_size * 3.5)
+        cache.set("d", [Document(page_content=os.urandom(2000).hex())])
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("d") is not None
+
+
+class TestLoaderCacheKey:
+    def test_key_depends_on_engine_settings_and_file_type(self):
+        loader = Loader(engine="tika", TIKA_SERVER_URL="http://tika:9998")
+        key = loader.get_cache_key("report.pdf", "application/pdf", "ab" * 32)
+
+        assert key.startswith("ab" * 32)
+        assert key == loader.get_cache_key("other.PDF", "application/pdf", "ab" * 32)
+        assert key != loader.get_cache_key("report.txt", "text/plain", "ab" * 32)
+        other_engine = Loader(engine="", TIKA_SERVER_URL="http://tika:9998")
+        assert key != other_engine.get_cache_key(
+            "report.pdf", "application/pdf", "ab" * 32
+        )
+
+    def test_credentials_only_count_as_set(self):
+        def key(api_key):
+            return Loader(
+                engine="mistral_ocr", MISTRAL_OCR_API_KEY=api_key
+            ).get_cache_key("scan.pdf", "application/pdf", "cd" * 32)
+
+        assert key("first") == key("second")
+        assert key("first") != key("")
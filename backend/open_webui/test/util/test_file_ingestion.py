@@ -0,0 +1,173 @@
+import asyncio
+import io
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from starlette.datastructures import Headers
+
+from open_webui.internal.db import Base, engine, get_db
+from open_webui.models.files import File, FileForm, Files
+from open_webui.routers import files as files_router
+from open_webui.utils.file_ingestion import FileIngestionQueue
+
+USER = SimpleNamespace(id="user", role="user")
+
+
+def insert_file(id: str, status, updated_at: int = None):
+    Files.insert_new_file(
+        USER.id,
+        FileForm(id=id, filename=f"{id}.txt", path=f"/{id}.txt", status=status),
+    )
+    if updated_at is not None:
+        with get_db() as db:
+            db.query(File).filter_by(id=id).update({"updated_at": updated_at})
+            db.commit()
+
+
+class TestFileStatus:
+    def setup_method(self):
+        Base.metadata.drop_all(bind=engine, tables=[File.__table__])
+        Base.metadata.create_all(bind=engine, tables=[File.__table__])
+
+    def _status(self, id: str):
+        return Files.get_file_by_id(id).status
+
+    def test_transitions(self):
+        insert_file("f1", "pending")
+        # Processing only starts by claiming the file
+        assert not Files.update_file_status_by_id("f1", "embedding")
+        assert not Files.update_file_status_by_id("f1", "ready")
+        assert Files.claim_file_by_id("f1", int(time.time()))
+        assert self._status("f1") == "extracting"
+
+        assert Files.update_file_status_by_id("f1", "embedding")
+        assert Files.update_file_status_by_id("f1", "ready")
+        assert not Files.update_file_status_by_id("f1", "failed")
+        assert self._status("f1") == "ready"
+
+        # Reprocessing starts over
+        assert Files.update_file_status_by_id("f1", "pending")
+        assert Files.update_file_status_by_id("f1", "failed", error="boom")
+        assert Files.get_file_by_id("f1").error == "boom"
+
+    def test_files_without_status_can_be_queued(self):
+        insert_file("f1", None)
+        assert not Files.claim_file_by_id("f1", int(time.time()))
+        assert Files.update_file_status_by_id("f1", "pending")
+
+    def test_one_claim_across_workers(self):
+        insert_file("f1", "pending")
+        stale_before = int(time.time()) - 60
+        assert Files.claim_file_by_id("f1", stale_before)
+        assert not Files.claim_file_by_id("f1", stale_before)
+
+    def test_stale_file_is_reclaimed(self):
+        insert_file("f1", "embedding", updated_at=100)
+        assert not Files.claim_file_by_id("f1", 100)
+        assert Files.claim_file_by_id("f1", 101)
+        assert self._status("f1") == "extracting"
+
+        # Finished files are never reclaimed
+        insert_file("f2", "ready", updated_at=100)
+        assert not Files.claim_file_by_id("f2", 101)
+
+    def test_requeue_stale_files(self):
+        now = int(time.time())
+        insert_file("stale", "extracting", updated_at=now - 3600)
+        insert_file("stale-pending", "pending", updated_at=now - 3600)
+        insert_file("active", "embedding", updated_at=now)
+        insert_file("done", "ready", updated_at=now - 3600)
+
+        async def requeue():
+            queue = FileIngestionQueue(1)
+            queue.loop = asyncio.get_running_loop()
+            queue.queue = asyncio.Queue()
+            await asyncio.to_thread(queue.requeue_stale_files)
+            # Files still waiting in the queue are not queued again
+            await asyncio.to_thread(queue.requeue_stale_files)
+            # Let the thread's call_soon_threadsafe callbacks run
+            await asyncio.sleep(0)
+            return [queue.queue.get_nowait() for _ in range(queue.queue.qsize())]
+
+        assert sorted(asyncio.run(requeue())) == ["stale", "stale-pending"]
+
+
+class TestFileUpload:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        Base.metadata.drop_all(bind=engine, tables=[File.__table__])
+        Base.metadata.create_all(bind=engine, tables=[File.__table__])
+
+        self.processed = []
+        self.enqueued = []
+
+        def process_file(request, form_data, user=None):
+            self.processed.append(form_data.file_id)
+
+        monkeypatch.setattr(files_router, "process_file", process_file)
+        monkeypatch.setattr(
+            files_router.Storage,
+            "upload_file",
+            lambda file, filename: ({"size": 5, "sha256": "hash"}, f"/{filename}"),
+        )
+        monkeypatch.setattr(
+            files_router.FILE_INGESTION_QUEUE, "enqueue", self.enqueued.append
+        )
+        self.monkeypatch = monkeypatch
+
+    def _upload(self, **kwargs):
+        return files_router.upload_file(
+            Request({"type": "http", "app": FastAPI()}),
+            file=UploadFile(
+                io.BytesIO(b"hello"),
+                filename="notes.txt",
+                headers=Headers({"content-type": "text/plain"}),
+            ),
+            user=USER,
+            file_metadata={},
+            process=True,
+            **kwargs,
+        )
+
+    def _set_queue_running(self, running: bool):
+        self.monkeypatch.setattr(
+            files_router.FILE_INGESTION_QUEUE, "is_running", lambda: running
+        )
+
+    def test_upload_is_queued(self):
+        self._set_queue_running(True)
+        file = self._upload(process_in_background=True)
+
+        assert file.status == "pending"
+        assert self.enqueued == [file.id]
+        assert self.processed == []
+
+    def test_inline_processing_fallback(self):
+        self._set_queue_running(True)
+        file = self._upload(process_in_background=False)
+        assert file.status is None
+        assert self.processed == [file.id]
+
+        # Also when the queue is not running, e.g. in scripts
+        self._set_queue_running(False)
+        file = self._upload(process_in_background=True)
+        assert file.status is None
+        assert self.processed[-1] == file.id
+        assert self.enqueued == []
+
+    def test_status_endpoint(self):
+        insert_file("f1", "pending")
+        Files.update_file_status_by_id("f1", "failed", error="Unsupported file")
+
+        result = asyncio.run(files_router.get_file_process_status_by_id("f1", USER))
+        assert result == {"status": "failed", "error": "Unsupported file"}
+
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(
+                files_router.get_file_process_status_by_id(
+                    "f1", SimpleNamespace(id="other", role="user")
+                )
+            )
+        assert e.value.status_code == 404
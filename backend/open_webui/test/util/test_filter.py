@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from open_webui.utils import filter as filter_utils
+from open_webui.utils.filter import FilterPipeline, invalidate_compiled_filters
+
+
+class StreamFilter:
+    class Valves(BaseModel):
+        suffix: str = ""
+
+    class UserValves(BaseModel):
+        enabled: bool = True
+
+    def __init__(self):
+        self.valves = self.Valves()
+
+    def stream(self, event: dict, __user__: dict) -> dict:
+        if __user__["valves"].enabled:
+            event["content"] += self.valves.suffix
+        return event
+
+
+def _function(id, updated_at=1):
+    return SimpleNamespace(id=id, updated_at=updated_at)
+
+
+class TestFilterPipeline:
+    def setup_method(self):
+        self.lookups = []
+        self.valves = {"suffix": "!"}
+        self.module = StreamFilter()
+        self.request = SimpleNamespace(
+            app=SimpleNamespace(state=SimpleNamespace(FUNCTIONS={"f": self.module}))
+        )
+        invalidate_compiled_filters("f")
+
+    def _patch(self, monkeypatch):
+        def get_function_valves_by_id(id):
+            self.lookups.append(("valves", id))
+            return self.valves
+
+        def get_user_valves_by_id_and_user_id(id, user_id):
+            self.lookups.append(("user_valves", id))
+            return {"enabled": True}
+
+        monkeypatch.setattr(
+            filter_utils.Functions,
+            "get_function_valves_by_id",
+            get_function_valves_by_id,
+        )
+        monkeypatch.setattr(
+            filter_utils.Functions,
+            "get_user_valves_by_id_and_user_id",
+            get_user_valves_by_id_and_user_id,
+        )
+
+    def _pipeline(self, function):
+        return FilterPipeline(
+            self.request, [function, None], "stream", {"__user__": {"id": "u1"}}
+        )
+
+    def test_chunks_do_not_look_up_valves(self, monkeypatch):
+        self._patch(monkeypatch)
+        pipeline = self._pipeline(_function("f"))
+
+        async def run():
+            return [
+                (await pipeline.process({"content": str(idx)}))[0]["content"]
+                for idx in range(3)
+            ]
+
+        assert asyncio.run(run()) == ["0!", "1!", "2!"]
+        assert self.lookups == [("valves", "f"), ("user_valves", "f")]
+
+        # Another request reuses the compiled filter, but not the user valves
+        self._pipeline(_function("f"))
+        assert self.lookups[2:] == [("user_valves", "f")]
+
+    def test_function_changes_recompile(self, monkeypatch):
+        self._patch(monkeypatch)
+        self._pipeline(_function("f"))
+
+        self.valves = {"suffix": "?"}
+        pipeline = self._pipeline(_function("f", updated_at=2))
+        event, _ = asyncio.run(pipeline.process({"content": "a"}))
+        assert event["content"] == "a?"
+
+        self.module = StreamFilter()
+        self.request.app.state.FUNCTIONS["f"] = self.module
+        self._pipeline(_function("f", updated_at=2))
+        assert self.lookups.count(("valves", "f")) == 3
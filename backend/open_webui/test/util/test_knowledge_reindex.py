@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from open_webui.internal.db import Base, engine, get_db
+from open_webui.models.knowledge import Knowledge, KnowledgeForm, Knowledges
+from open_webui.models.knowledge_reindex import (
+    KnowledgeReindexFile,
+    KnowledgeReindexJob,
+    KnowledgeReindexJobs,
+)
+from open_webui.utils import knowledge_reindex
+from open_webui.utils.knowledge_reindex import (
+    KnowledgeReindexRunner,
+    get_shadow_collection_name,
+    resume_reindex_jobs,
+)
+
+
+class FakeVectorDB:
+    def __init__(self):
+        # collection name -> file ids
+        self.collections: dict[str, set[str]] = {}
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+    def delete(self, collection_name, ids=None, filter=None):
+        self.collections.get(collection_name, set()).discard(filter["file_id"])
+
+
+class TestKnowledgeReindexRunner:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        tables = [
+            Knowledge.__table__,
+            KnowledgeReindexJob.__table__,
+            KnowledgeReindexFile.__table__,
+        ]
+        Base.metadata.drop_all(bind=engine, tables=tables)
+        Base.metadata.create_all(bind=engine, tables=tables)
+
+        self.app = FastAPI()
+        self.vector_db = FakeVectorDB()
+        self.processed = []
+        self.failing_file_ids = set()
+
+        def process_file(request, form_data, user=None):
+            self.processed.append(form_data.file_id)
+            if form_data.file_id in self.failing_file_ids:
+                raise HTTPException(status_code=400, detail="Unsupported file")
+            self.vector_db.collections.setdefault(form_data.collection_name, set()).add(
+                form_data.file_id
+            )
+
+        monkeypatch.setattr(knowledge_reindex, "VECTOR_DB_CLIENT", self.vector_db)
+        monkeypatch.setattr(knowledge_reindex, "process_file", process_file)
+
+        self.knowledge = Knowledges.insert_new_knowledge(
+            "user",
+            KnowledgeForm(name="Docs", description="", data={"file_ids": ["f1", "f2"]}),
+        )
+        self.vector_db.collections[self.knowledge.id] = {"f1", "f2"}
+
+    def _insert_job(self):
+        job = KnowledgeReindexJobs.insert_new_job("user", [self.knowledge.id], 2)
+        assert KnowledgeReindexJobs.claim_job(job, int(time.time()))
+        return KnowledgeReindexJobs.get_job_by_id(job.id)
+
+    def _file_statuses(self, job_id):
+        with get_db() as db:
+            return {
+                row.file_id: (row.status, row.error)
+                for row in db.query(KnowledgeReindexFile).filter_by(job_id=job_id)
+            }
+
+    def test_shadow_collection_is_swapped_in(self):
+        job = self._insert_job()
+        shadow_collection_name = get_shadow_collection_name(self.knowledge.id, job.id)
+
+        asyncio.run(KnowledgeReindexRunner(self.app, job).run())
+
+        knowledge = Knowledges.get_knowledge_by_id(self.knowledge.id)
+        assert knowledge.collection_name == shadow_collection_name
+        assert Knowledges.get_collection_names_by_ids([self.knowledge.id, "f1"]) == {
+            self.knowledge.id: shadow_collection_name
+        }
+        assert self.vector_db.collections == {shadow_collection_name: {"f1", "f2"}}
+
+        job = KnowledgeReindexJobs.get_job_by_id(job.id)
+        assert (job.status, job.processed, job.failed) == ("completed", 2, 0)
+        assert self._file_statuses(job.id) == {
+            "f1": ("completed", None),
+            "f2": ("completed", None),
+        }
+
+    def test_failed_file_is_checkpointed(self):
+        self.failing_file_ids = {"f2"}
+        job = self._insert_job()
+
+        asyncio.run(KnowledgeReindexRunner(self.app, job).run())
+
+        job = KnowledgeReindexJobs.get_job_by_id(job.id)
+        assert (job.status, job.processed, job.failed) == ("completed", 1, 1)
+        assert self._file_statuses(job.id)["f2"] == ("failed", "Unsupported file")
+
+    def test_stale_job_resumes_from_checkpoints(self):
+        job = self._insert_job()
+        shadow_collection_name = get_shadow_collection_name(self.knowledge.id, job.id)
+
+        # A worker completed f1 and died while processing f2
+        KnowledgeReindexJobs.upsert_file_status(
+            job.id, self.knowledge.id, "f1", "completed"
+        )
+        KnowledgeReindexJobs.upsert_file_status(
+            job.id, self.knowledge.id, "f2", "processing"
+        )
+        KnowledgeReindexJobs.increment_job_counter_by_id(job.id)
+        self.vector_db.collections[shadow_collection_name] = {"f1", "f2"}
+        with get_db() as db:
+            db.query(KnowledgeReindexJob).filter_by(id=job.id).update({"updated_at": 0})
+            db.commit()
+
+        async def resume():
+            await resume_reindex_jobs(self.app)
+            await asyncio.gather(*knowledge_reindex._running_jobs.values())
+
+        asyncio.run(resume())
+
+        assert self.processed == ["f2"]
+        assert self.vector_db.collections == {shadow_collection_name: {"f1", "f2"}}
+
+        job = KnowledgeReindexJobs.get_job_by_id(job.id)
+        assert (job.status, job.processed, job.failed) == ("completed", 2, 0)
@@ -0,0 +1,99 @@
+from open_webui.utils.message_buffer import MessageWriteBuffer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMessageWriteBuffer:
+    def setup_method(self):
+        self.writes = []
+        self.appends = []
+        self.clock = FakeClock()
+        self.content = ""
+
+    def _buffer(self, interval=1.0, max_size=10):
+        return MessageWriteBuffer(
+            "chat",
+            "message",
+            serializer=lambda: self.content,
+            interval=interval,
+            max_size=max_size,
+            writer=lambda chat_id, message_id, message: self.writes.append(message),
+            appender=self._append,
+            clock=self.clock,
+        )
+
+    def _append(self, chat_id, message_id, delta, length):
+        self.appends.append((delta, length))
+        return True
+
+    def _stream(self, buffer, delta):
+        self.content += delta
+        return buffer.append(delta)
+
+    def test_deltas_are_buffered_until_size_budget(self):
+        buffer = self._buffer(max_size=10)
+        assert self._stream(buffer, "hello") is False
+        assert self.writes == []
+
+        assert self._stream(buffer, " world") is True
+        assert self.writes == [{"content": "hello world"}]
+
+    def test_deltas_are_flushed_after_interval(self):
+        buffer = self._buffer(interval=1.0, max_size=1000)
+        self._stream(buffer, "a")
+        self.clock.now = 0.5
+        self._stream(buffer, "b")
+        assert self.writes == []
+
+        self.clock.now = 1.0
+        self._stream(buffer, "c")
+        assert self.writes == [{"content": "abc"}]
+
+    def test_appended_text_is_written_alone(self):
+        buffer = self._buffer(max_size=1)
+        self._stream(buffer, "Hello")
+        self._stream(buffer, " world")
+        assert self.writes == [{"content": "Hello"}]
+        assert self.appends == [(" world", 5)]
+
+        # Content that changed before its end is rewritten
+        self.content = "Hi world"
+        buffer.append("")
+        buffer.flush()
+        assert self.writes[-1] == {"content": "Hi world"}
+
+    def test_content_is_rewritten_when_it_cannot_be_appended(self):
+        buffer = self._buffer(max_size=1)
+        buffer.appender = lambda *args: False
+        self._stream(buffer, "Hello")
+        self._stream(buffer, " world")
+        assert self.writes == [{"content": "Hello"}, {"content": "Hello world"}]
+
+    def test_final_flush_skips_unchanged_content(self):
+        buffer = self._buffer(max_size=1)
+        self._stream(buffer, "done")
+        assert buffer.flush(self.content) is False
+        assert self.writes == [{"content": "done"}]
+
+    def test_failed_write_is_retried(self):
+        attempts = []
+
+        def writer(chat_id, message_id, message):
+            attempts.append(message)
+            if len(attempts) == 1:
+                raise RuntimeError("db unavailable")
+
+        buffer = self._buffer(max_size=1)
+        buffer.writer = writer
+        self._stream(buffer, "a")
+        assert buffer.dirty is True
+
+        self._stream(buffer, "b")
+        assert attempts[-1] == {"content": "ab"}
+        assert buffer.last_content == "ab"
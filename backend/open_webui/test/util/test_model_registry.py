@@ -0,0 +1,146 @@
+import asyncio
+import json
+import time
+
+from open_webui.utils.misc import is_etag_match
+from open_webui.utils.model_registry import ModelRegistry
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, name):
+        return self.values.get(name)
+
+    async def set(self, name, value, nx=False, ex=None):
+        if nx and name in self.values:
+            return None
+        self.values[name] = value
+        return True
+
+    async def delete(self, name):
+        self.values.pop(name, None)
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return [{"id": f"model-{self.calls}"}]
+
+
+class TestModelRegistry:
+    def test_stale_reads_refresh_in_background(self):
+        registry = ModelRegistry(refresh_interval=60)
+        load = Loader()
+
+        async def run():
+            assert await registry.get_models(load) == [{"id": "model-1"}]
+            assert await registry.get_models(load) == [{"id": "model-1"}]
+            assert load.calls == 1
+
+            registry.refreshed_at -= 60
+            # Served from memory while the refresh runs
+            assert await registry.get_models(load) == [{"id": "model-1"}]
+            await registry._refresh_task
+            assert await registry.get_models(load) == [{"id": "model-2"}]
+            assert load.calls == 2
+
+        asyncio.run(run())
+
+    def test_failed_refresh_keeps_previous_models(self):
+        registry = ModelRegistry(refresh_interval=60)
+        load = Loader()
+
+        async def run():
+            await registry.get_models(load)
+            load.error = Exception("upstream down")
+            registry.invalidate()
+            assert await registry.get_models(load) == [{"id": "model-1"}]
+            assert not registry.is_stale()
+
+        asyncio.run(run())
+
+    def test_invalidate_waits_for_fresh_models(self):
+        registry = ModelRegistry(refresh_interval=60)
+        load = Loader()
+
+        async def run():
+            await registry.get_models(load)
+            registry.invalidate()
+            assert await registry.get_models(load) == [{"id": "model-2"}]
+
+        asyncio.run(run())
+
+    def test_upstream_falls_back_to_last_known_list(self):
+        registry = ModelRegistry(refresh_interval=60)
+
+        async def respond(value):
+            return value
+
+        async def run():
+            response = await registry.fetch_upstream(
+                "http://a/models", respond({"data": [{"id": "gpt"}]})
+            )
+            # Callers add prefixes to the returned models in place
+            response["data"][0]["id"] = "prefix.gpt"
+
+            for _ in range(2):
+                response = await registry.fetch_upstream(
+                    "http://a/models", respond(None)
+                )
+                assert response == {"data": [{"id": "gpt"}]}
+                response["data"][0]["id"] = "prefix.gpt"
+
+            assert (
+                await registry.fetch_upstream("http://b/models", respond(None)) is None
+            )
+
+        asyncio.run(run())
+
+    def test_models_are_shared_through_redis(self):
+        redis = FakeRedis()
+        first = ModelRegistry(refresh_interval=60)
+        second = ModelRegistry(refresh_interval=60)
+        first._redis = second._redis = redis
+        load = Loader()
+
+        async def run():
+            await first.get_models(load)
+            assert await second.get_models(load) == [{"id": "model-1"}]
+            assert load.calls == 1
+            assert json.loads(redis.values[first._redis_key])["models"] == [
+                {"id": "model-1"}
+            ]
+
+            # While another worker holds the refresh lock, keep serving
+            redis.values[second._redis_lock_key] = "other"
+            redis.values[first._redis_key] = json.dumps(
+                {"models": [], "refreshed_at": time.time() - 120}
+            )
+            second.refreshed_at -= 60
+            await second.refresh(load)
+            assert await second.get_models(load) == [{"id": "model-1"}]
+            assert load.calls == 1
+
+        asyncio.run(run())
+
+
+class TestIsEtagMatch:
+    def test_strong_and_weak_tags(self):
+        assert is_etag_match('"abc"', '"abc"')
+        assert is_etag_match('W/"abc"', '"abc"')
+        assert not is_etag_match('"abd"', '"abc"')
+        assert not is_etag_match(None, '"abc"')
+
+    def test_lists_and_wildcard(self):
+        assert is_etag_match('"x", W/"abc" , "y"', '"abc"')
+        assert not is_etag_match('"x", "y"', '"abc"')
+        assert is_etag_match("*", '"abc"')
@@ -0,0 +1,105 @@
+import time
+
+from open_webui.utils.ollama_balancer import OllamaBalancer
+
+URLS = {0: "http://ollama-a:11434", 1: "http://ollama-b:11434"}
+
+
+def serve(balancer, url, latency, success=True):
+    request = balancer.start(url)
+    request.started -= latency
+    request.record(success)
+    request.finish()
+
+
+class TestOllamaBalancer:
+    def test_least_requests_prefers_idle_backend(self):
+        balancer = OllamaBalancer(strategy="least_requests")
+        for url in URLS.values():
+            balancer.set_loaded_models(url, ["llama3"])
+        busy = balancer.start(f"{URLS[0]}/api/chat")
+
+        for _ in range(5):
+            assert balancer.select("llama3", URLS) == 1
+
+        busy.finish()
+        assert balancer.backends[URLS[0]].outstanding == 0
+
+    def test_latency_prefers_faster_backend(self):
+        balancer = OllamaBalancer(strategy="latency")
+        balancer.select("llama3", URLS)
+        serve(balancer, f"{URLS[0]}/api/chat", latency=2.0)
+        serve(balancer, f"{URLS[1]}/api/chat", latency=0.1)
+
+        assert balancer.select("llama3", URLS) == 1
+
+    def test_prefers_backend_with_model_loaded(self):
+        balancer = OllamaBalancer(strategy="latency")
+        balancer.set_loaded_models(URLS[0], ["llama3"])
+        balancer.set_loaded_models(URLS[1], ["mistral"])
+        serve(balancer, URLS[0], latency=0.2)
+        serve(balancer, URLS[1], latency=0.1)
+
+        assert balancer.select("llama3", URLS) == 0
+        assert balancer.select("mistral", URLS) == 1
+
+    def test_prefix_id_is_stripped_from_model(self):
+        balancer = OllamaBalancer(strategy="least_requests")
+        balancer.set_loaded_models(URLS[0], ["llama3.1:8b"])
+        balancer.set_loaded_models(URLS[1], ["mistral"])
+        busy = balancer.start(URLS[0])
+
+        # Loaded models are listed without the prefix, and dots in the name
+        # are not mistaken for one
+        assert balancer.select("a.llama3.1:8b", URLS, {0: "a", 1: "b"}) == 0
+        assert balancer.select("llama3.1:8b", URLS) == 0
+        busy.finish()
+
+        balancer.select("b.qwen2", {1: URLS[1]}, {1: "b"})
+        assert "qwen2" in balancer.backends[URLS[1]].loaded_models
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        balancer = OllamaBalancer(failure_threshold=2, cooldown=30)
+        balancer.select("llama3", URLS)
+        serve(balancer, URLS[0], latency=0.1, success=False)
+        assert balancer.get_stats()[URLS[0]]["state"] == "closed"
+        serve(balancer, URLS[0], latency=0.1, success=False)
+        assert balancer.get_stats()[URLS[0]]["state"] == "open"
+
+        for _ in range(5):
+            assert balancer.select("llama3", URLS) == 1
+
+    def test_half_open_allows_single_trial(self):
+        balancer = OllamaBalancer(failure_threshold=1, cooldown=30)
+        balancer.select("llama3", URLS)
+        serve(balancer, URLS[0], latency=0.1, success=False)
+        backend = balancer.backends[URLS[0]]
+        backend.open_until = time.monotonic() - 1
+        # Make the half-open backend the best candidate
+        serve(balancer, URLS[1], latency=5.0)
+
+        assert balancer.select("llama3", URLS) == 0
+        assert backend.trial_in_flight
+        assert balancer.select("llama3", URLS) == 1
+
+        # A failed trial doubles the cooldown
+        serve(balancer, URLS[0], latency=0.1, success=False)
+        assert balancer.get_stats()[URLS[0]]["state"] == "open"
+        assert backend.cooldown == 120
+
+        backend.open_until = time.monotonic() - 1
+        balancer.select("llama3", {0: URLS[0]})
+        serve(balancer, URLS[0], latency=0.1)
+        assert balancer.get_stats()[URLS[0]]["state"] == "closed"
+        assert backend.cooldown == 30
+
+    def test_start_matches_longest_backend_url(self):
+        balancer = OllamaBalancer()
+        urls = {0: "http://ollama:11434", 1: "http://ollama:11434/proxy"}
+        balancer.select("llama3", urls)
+
+        assert balancer.start("http://ollama:11434/proxy/api/chat").backend.url == (
+            urls[1]
+        )
+        assert balancer.start("http://ollama:11434/api/chat").backend.url == urls[0]
+        assert balancer.start("http://other:11434/api/chat").backend is None
@@ -0,0 +1,29 @@
+import asyncio
+
+from open_webui.utils.session_pool import ClientSessionPool
+
+
+class TestClientSessionPool:
+    def test_sessions_are_shared_per_origin(self):
+        async def run():
+            pool = ClientSessionPool(limit_per_host=10, keepalive_timeout=30)
+            session = pool.get_session("https://api.example.com/v1/chat/completions")
+            assert pool.get_session("https://api.example.com/v1/models") is session
+            assert pool.get_session("http://localhost:11434/api/chat") is not session
+            assert session.connector.limit == 10
+
+            await pool.close()
+            assert session.closed
+            assert pool.get_session("https://api.example.com/v1/models") is not session
+            await pool.close()
+
+        asyncio.run(run())
+
+    def test_sessions_are_not_reused_across_loops(self):
+        pool = ClientSessionPool(limit_per_host=10, keepalive_timeout=30)
+
+        async def get_session():
+            return pool.get_session("https://api.example.com/v1")
+
+        first = asyncio.run(get_session())
+        assert asyncio.run(get_session()) is not first
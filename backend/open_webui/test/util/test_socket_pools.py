@@ -0,0 +1,37 @@
+import asyncio
+
+from open_webui.socket.utils import LocalUsagePool, LocalUserPool
+
+
+class TestLocalUserPool:
+    def test_first_and_last_sessions_are_transitions(self):
+        async def run():
+            pool = LocalUserPool()
+            assert await pool.add("u1", "s1")
+            assert not await pool.add("u1", "s2")
+            assert await pool.count() == 1
+
+            assert not await pool.remove("u1", "s1")
+            assert await pool.contains("u1")
+            assert await pool.remove("u1", "s2")
+            assert not await pool.contains("u1")
+            assert not await pool.remove("u1", "s2")
+
+        asyncio.run(run())
+
+
+class TestLocalUsagePool:
+    def test_models_expire_with_their_last_session(self):
+        async def run():
+            pool = LocalUsagePool()
+            assert await pool.touch("m1", "s1", 100)
+            assert not await pool.touch("m1", "s2", 105)
+            assert await pool.touch("m2", "s1", 100)
+
+            assert await pool.expire(100) == []
+            assert await pool.expire(101) == ["m2"]
+            assert await pool.get_model_ids() == ["m1"]
+            assert await pool.expire(106) == ["m1"]
+            assert await pool.count() == 0
+
+        asyncio.run(run())
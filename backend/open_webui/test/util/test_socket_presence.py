@@ -0,0 +1,68 @@
+import asyncio
+
+from open_webui.socket.presence import DeltaBroadcaster, DeltaSet
+
+
+class TestDeltaSet:
+    def test_changes_within_a_window_net_out(self):
+        delta = DeltaSet()
+        delta.add("u1")
+        delta.remove("u1")
+        delta.remove("u2")
+        delta.add("u2")
+        assert not delta
+
+        delta.add("u3")
+        delta.remove("u4")
+        assert delta.pop() == (["u3"], ["u4"])
+        assert not delta
+
+
+class TestDeltaBroadcaster:
+    def test_changes_are_coalesced_into_one_broadcast(self):
+        async def run():
+            sent = []
+            members = set()
+
+            async def emit(delta):
+                sent.append(delta)
+
+            async def get_count():
+                return len(members)
+
+            broadcaster = DeltaBroadcaster(emit, get_count, 0.01)
+            for user_id in ["u1", "u2", "u3"]:
+                members.add(user_id)
+                broadcaster.add(user_id)
+            members.discard("u2")
+            broadcaster.remove("u2")
+            await asyncio.sleep(0.05)
+
+            assert sent == [{"added": ["u1", "u3"], "removed": [], "count": 2}]
+
+            members.discard("u1")
+            broadcaster.remove("u1")
+            await asyncio.sleep(0.05)
+            assert sent[-1] == {"added": [], "removed": ["u1"], "count": 1}
+            assert broadcaster.changes == 5
+            assert broadcaster.broadcasts == 2
+
+        asyncio.run(run())
+
+    def test_nothing_is_sent_when_changes_cancel_out(self):
+        async def run():
+            sent = []
+
+            async def emit(delta):
+                sent.append(delta)
+
+            async def get_count():
+                return 0
+
+            broadcaster = DeltaBroadcaster(emit, get_count, 0.01)
+            broadcaster.add("gpt-4o")
+            broadcaster.remove("gpt-4o")
+            await asyncio.sleep(0.05)
+            assert sent == []
+
+        asyncio.run(run())
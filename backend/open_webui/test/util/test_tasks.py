@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+from open_webui import tasks
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.sets = {}
+        self.keys = set()
+
+    async def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+    async def hdel(self, name, key):
+        self.hashes.get(name, {}).pop(key, None)
+
+    async def srem(self, name, value):
+        self.sets.get(name, set()).discard(value)
+
+    async def exists(self, name):
+        return int(name in self.keys)
+
+
+class TestTasks:
+    def test_local_tasks_can_be_listed_and_stopped(self):
+        async def run():
+            task_id, task = await tasks.create_task(asyncio.sleep(60), id="chat")
+            assert task_id in await tasks.list_tasks()
+            assert await tasks.list_task_ids_by_chat_id("chat") == [task_id]
+
+            result = await tasks.stop_task(task_id)
+            assert result["status"] is True
+            assert task.cancelled()
+            assert await tasks.list_task_ids_by_chat_id("chat") == []
+
+        asyncio.run(run())
+
+    def test_orphaned_tasks_are_removed(self, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(tasks, "redis", redis)
+
+        redis.keys.add(f"{tasks.REDIS_WORKER_KEY}:alive")
+        redis.hashes[tasks.REDIS_TASKS_KEY] = {
+            "t1": json.dumps({"worker_id": "alive", "chat_id": "c1"}),
+            "t2": json.dumps({"worker_id": "gone", "chat_id": "c2"}),
+            # Registered by this worker but no longer running here
+            "t3": json.dumps({"worker_id": tasks.WORKER_ID, "chat_id": None}),
+        }
+        redis.sets[f"{tasks.REDIS_CHAT_TASKS_KEY}:c2"] = {"t2"}
+
+        asyncio.run(tasks.cleanup_orphaned_tasks())
+
+        assert list(redis.hashes[tasks.REDIS_TASKS_KEY]) == ["t1"]
+        assert redis.sets[f"{tasks.REDIS_CHAT_TASKS_KEY}:c2"] == set()
@@ -0,0 +1,66 @@
+import time
+
+from pydantic import BaseModel
+
+from open_webui.utils.user_cache import UserCache
+
+
+class FakeUser(BaseModel):
+    id: str
+    name: str
+
+
+class TestUserCache:
+    def setup_method(self):
+        self.loads = []
+        self.cache = UserCache(ttl=60, last_active_interval=60)
+
+    def _load_user(self, user_id):
+        self.loads.append(user_id)
+        return FakeUser(id=user_id, name="Ada")
+
+    def _load_groups(self, user_id):
+        self.loads.append(f"groups:{user_id}")
+        return ["group"]
+
+    def test_users_are_cached_until_invalidated(self):
+        assert self.cache.get_user("u1", self._load_user).name == "Ada"
+        assert self.cache.get_user("u1", self._load_user).name == "Ada"
+        assert self.loads == ["u1"]
+
+        self.cache.invalidate_user("u1")
+        self.cache.get_user("u1", self._load_user)
+        assert self.loads == ["u1", "u1"]
+
+    def test_returned_users_are_copies(self):
+        self.cache.get_user("u1", self._load_user).name = "Changed"
+        assert self.cache.get_user("u1", self._load_user).name == "Ada"
+
+    def test_group_invalidation_drops_all_memberships(self):
+        self.cache.get_groups("u1", self._load_groups)
+        self.cache.get_groups("u2", self._load_groups)
+        self.cache.invalidate_groups()
+        self.cache.get_groups("u1", self._load_groups)
+        assert self.loads == ["groups:u1", "groups:u2", "groups:u1"]
+
+    def test_request_scope_without_ttl(self):
+        cache = UserCache(ttl=0, last_active_interval=60)
+        with cache.request_scope():
+            cache.get_groups("u1", self._load_groups)
+            cache.get_groups("u1", self._load_groups)
+        cache.get_groups("u1", self._load_groups)
+        assert self.loads == ["groups:u1", "groups:u1"]
+
+    def test_missing_users_are_not_cached(self):
+        loads = []
+        loader = lambda user_id: loads.append(user_id)
+        assert self.cache.get_user("u1", loader) is None
+        assert self.cache.get_user("u1", loader) is None
+        assert loads == ["u1", "u1"]
+
+    def test_last_active_writes_are_coalesced(self):
+        now = int(time.time())
+        assert self.cache.should_update_last_active("u1", now) is False
+        assert self.cache.should_update_last_active("u1", now - 120) is True
+        assert self.cache.should_update_last_active("u1", now - 120) is False
+        assert self.cache.should_update_last_active("u2", now - 120) is True
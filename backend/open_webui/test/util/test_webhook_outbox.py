@@ -0,0 +1,221 @@
+import asyncio
+import time
+
+from open_webui.internal.db import Base, engine, get_db
+from open_webui.models.notifications import (
+    WebhookNotification,
+    WebhookNotificationForm,
+    WebhookNotificationModel,
+    WebhookNotifications,
+    get_dedup_key,
+)
+from open_webui.utils.webhook_outbox import (
+    MAX_BATCH_MESSAGE_LENGTH,
+    RETRY_MAX_DELAY,
+    WebhookDeliveryError,
+    WebhookOutbox,
+    get_batches,
+    get_retry_delay,
+)
+
+
+def _notification(url: str, message: str) -> WebhookNotificationModel:
+    return WebhookNotificationModel(
+        id=message,
+        url=url,
+        dedup_key=message,
+        name="Open WebUI",
+        message=message,
+        status="sending",
+        next_attempt_at=0,
+        created_at=0,
+        updated_at=0,
+    )
+
+
+class TestWebhookBatches:
+    def test_chat_webhook_messages_are_joined_up_to_the_limit(self):
+        url = "https://hooks.slack.com/services/x"
+        size = MAX_BATCH_MESSAGE_LENGTH // 2 - 10
+        notifications = [_notification(url, f"{idx}" * size) for idx in range(5)]
+
+        batches = get_batches(url, notifications)
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [n for batch in batches for n in batch] == notifications
+
+    def test_other_webhooks_are_posted_one_at_a_time(self):
+        url = "https://example.com/hook"
+        notifications = [_notification(url, "a"), _notification(url, "b")]
+        assert get_batches(url, notifications) == [[n] for n in notifications]
+
+
+class TestWebhookRetries:
+    def test_retry_delay_backs_off_up_to_the_maximum(self):
+        assert get_retry_delay(1) < get_retry_delay(2) < get_retry_delay(3)
+        assert get_retry_delay(30) == RETRY_MAX_DELAY
+
+    def test_identical_notifications_share_a_dedup_key(self):
+        form_data = WebhookNotificationForm(
+            url="https://example.com/hook",
+            name="Open WebUI",
+            message="#general",
+            data={"action": "channel", "title": "general"},
+        )
+        other = form_data.model_copy(update={"url": "https://example.com/other"})
+        assert get_dedup_key(form_data) == get_dedup_key(form_data.model_copy())
+        assert get_dedup_key(form_data) != get_dedup_key(other)
+
+
+def _form(message: str, url: str = "https://example.com/hook"):
+    return WebhookNotificationForm(
+        url=url, name="Open WebUI", message=message, data={"message": message}
+    )
+
+
+class TestWebhookNotifications:
+    def setup_method(self):
+        tables = [WebhookNotification.__table__]
+        Base.metadata.drop_all(bind=engine, tables=tables)
+        Base.metadata.create_all(bind=engine, tables=tables)
+
+    def _statuses(self):
+        with get_db() as db:
+            return sorted(
+                (n.message, n.status, n.attempts) for n in db.query(WebhookNotification)
+            )
+
+    def test_identical_notifications_are_queued_once(self):
+        assert (
+            WebhookNotifications.insert_new_notifications(
+                [_form("a"), _form("a"), _form("b")]
+            )
+            == 2
+        )
+        # While the first is still waiting
+        assert (
+            WebhookNotifications.insert_new_notifications(
+                [_form("a"), _form("a", url="https://example.com/other")]
+            )
+            == 1
+        )
+        assert len(self._statuses()) == 3
+
+        now = int(time.time())
+        WebhookNotifications.claim_notifications_by_url(
+            "https://example.com/hook", now, now - 60, 10
+        )
+        # Once it is being sent it can be queued again
+        assert WebhookNotifications.insert_new_notifications([_form("a")]) == 1
+
+    def test_notifications_are_claimed_once(self):
+        WebhookNotifications.insert_new_notifications([_form("a"), _form("b")])
+        url = "https://example.com/hook"
+        now = int(time.time())
+
+        claimed = WebhookNotifications.claim_notifications_by_url(
+            url, now, now - 60, 10
+        )
+        assert [n.message for n in claimed] == ["a", "b"]
+        assert len({n.claim_id for n in claimed}) == 1
+        assert (
+            WebhookNotifications.claim_notifications_by_url(url, now, now - 60, 10)
+            == []
+        )
+        assert WebhookNotifications.get_due_urls(now, now - 60) == []
+
+    def test_stale_claim_is_taken_over(self):
+        WebhookNotifications.insert_new_notifications([_form("a")])
+        url = "https://example.com/hook"
+        now = int(time.time())
+
+        [stale] = WebhookNotifications.claim_notifications_by_url(
+            url, now, now - 60, 10
+        )
+        assert WebhookNotifications.get_due_urls(now, now + 1) == [url]
+        [claimed] = WebhookNotifications.claim_notifications_by_url(
+            url, now, now + 1, 10
+        )
+        assert claimed.claim_id != stale.claim_id
+
+        # The first delivery lost its claim and can no longer change them
+        assert not WebhookNotifications.touch_notifications_by_claim_id(stale.claim_id)
+        WebhookNotifications.delete_notifications_by_ids([stale.id], stale.claim_id)
+        WebhookNotifications.reschedule_notifications_by_ids(
+            [stale.id], stale.claim_id, now, "HTTP 500", 5
+        )
+        assert self._statuses() == [("a", "sending", 0)]
+
+        assert WebhookNotifications.touch_notifications_by_claim_id(claimed.claim_id)
+        WebhookNotifications.delete_notifications_by_ids([claimed.id], claimed.claim_id)
+        assert self._statuses() == []
+
+    def test_failed_after_max_attempts(self):
+        WebhookNotifications.insert_new_notifications([_form("a")])
+        url = "https://example.com/hook"
+
+        for attempt in range(3):
+            now = int(time.time())
+            [claimed] = WebhookNotifications.claim_notifications_by_url(
+                url, now, now - 60, 10
+            )
+            WebhookNotifications.reschedule_notifications_by_ids(
+                [claimed.id], claimed.claim_id, now, "HTTP 500", 3
+            )
+
+        assert self._statuses() == [("a", "failed", 3)]
+        now = int(time.time())
+        assert WebhookNotifications.get_due_urls(now, now - 60) == []
+
+    def test_failed_notifications_are_purged(self):
+        WebhookNotifications.insert_new_notifications([_form("a"), _form("b")])
+        with get_db() as db:
+            db.query(WebhookNotification).update({"status": "failed"})
+            db.query(WebhookNotification).filter_by(message="a").update(
+                {"updated_at": 100}
+            )
+            db.commit()
+
+        assert WebhookNotifications.delete_failed_notifications(200) == 1
+        assert self._statuses() == [("b", "failed", 0)]
+
+
+class TestWebhookDelivery:
+    def setup_method(self):
+        tables = [WebhookNotification.__table__]
+        Base.metadata.drop_all(bind=engine, tables=tables)
+        Base.metadata.create_all(bind=engine, tables=tables)
+
+    def _deliver(self, outbox: WebhookOutbox, url: str):
+        async def deliver():
+            outbox._semaphore = asyncio.Semaphore(1)
+            await outbox._deliver(url)
+
+        asyncio.run(deliver())
+
+    def test_delivered_and_failed_notifications(self):
+        url = "https://example.com/hook"
+        WebhookNotifications.insert_new_notifications(
+            [_form("a"), _form("b"), _form("c")]
+        )
+        posted = []
+
+        async def post(url, batch):
+            posted.append(batch[0].message)
+            if batch[0].message == "b":
+                raise WebhookDeliveryError("HTTP 500", retry=True)
+            if batch[0].message == "c":
+                raise WebhookDeliveryError("HTTP 404", retry=False)
+
+        outbox = WebhookOutbox(1, rate_limit=0, max_attempts=5, poll_interval=10)
+        outbox.post = post
+        self._deliver(outbox, url)
+
+        assert posted == ["a", "b", "c"]
+        with get_db() as db:
+            assert sorted(
+                (n.message, n.status, n.attempts, n.error, n.claim_id)
+                for n in db.query(WebhookNotification)
+            ) == [
+                ("b", "pending", 1, "HTTP 500", None),
+                ("c", "failed", 1, "HTTP 404", None),
+            ]
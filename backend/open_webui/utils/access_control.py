@@ -1,6 +1,7 @@
-from typing import Optional, Union, List, Dict, Any
+from typing import Optional, Union, List, Dict, Any, Iterable, TypeVar
 from open_webui.models.users import Users, UserModel
 from open_webui.models.groups import Groups
+from open_webui.utils.user_cache import USER_CACHE
 
 
 from open_webui.config import DEFAULT_USER_PERMISSIONS
@@ -53,7 +54,7 @@ def get_permissions(
                     )  # Use the most permissive value (True > False)
         return permissions
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_groups = USER_CACHE.get_groups(user_id, Groups.get_groups_by_member_id)
 
     # Deep copy default permissions to avoid modifying the original dict
     permissions = json.loads(json.dumps(default_permissions))
@@ -93,7 +94,7 @@ def has_permission(
     permission_hierarchy = permission_key.split(".")
 
     # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_groups = USER_CACHE.get_groups(user_id, Groups.get_groups_by_member_id)
 
     for group in user_groups:
         group_permissions = group.permissions
@@ -107,25 +108,57 @@ def has_permission(
     return get_permission(default_permissions, permission_hierarchy)
 
 
+def get_user_group_ids(user_id: str) -> set[str]:
+    user_groups = USER_CACHE.get_groups(user_id, Groups.get_groups_by_member_id)
+    return {group.id for group in user_groups}
+
+
 def has_access(
     user_id: str,
     type: str = "write",
     access_control: Optional[dict] = None,
+    user_group_ids: Optional[set[str]] = None,
 ) -> bool:
+    """
+    Pass `user_group_ids` (see `get_user_group_ids`) when checking many
+    resources so the user's groups are only resolved once.
+    """
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
+    if user_group_ids is None:
+        user_group_ids = get_user_group_ids(user_id)
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
 
-    return user_id in permitted_user_ids or any(
-        group_id in permitted_group_ids for group_id in user_group_ids
+    return user_id in permitted_user_ids or not user_group_ids.isdisjoint(
+        permitted_group_ids
     )
 
 
+Resource = TypeVar("Resource")
+
+
+def filter_by_access(
+    user_id: str,
+    resources: Iterable[Resource],
+    type: str = "write",
+) -> List[Resource]:
+    """
+    Returns the resources (anything with `user_id` and `access_control`
+    attributes) the user owns or has `type` access to, resolving the user's
+    groups once for the whole list.
+    """
+    user_group_ids = get_user_group_ids(user_id)
+    return [
+        resource
+        for resource in resources
+        if resource.user_id == user_id
+        or has_access(user_id, type, resource.access_control, user_group_ids)
+    ]
+
+
 # Get all users with access to a resource
 def get_users_with_access(
     type: str = "write", access_control: Optional[dict] = None
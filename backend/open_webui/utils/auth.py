@@ -14,6 +14,7 @@ from pytz import UTC
 from typing import Optional, Union, List, Dict
 
 from open_webui.models.users import Users
+from open_webui.utils.user_cache import USER_CACHE
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
@@ -206,7 +207,7 @@ def get_current_user(
         )
 
     if data is not None and "id" in data:
-        user = Users.get_user_by_id(data["id"])
+        user = USER_CACHE.get_user(data["id"], Users.get_user_by_id)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -215,7 +216,9 @@ def get_current_user(
         else:
             # Refresh the user's last active timestamp asynchronously
             # to prevent blocking the request
-            if background_tasks:
+            if background_tasks and USER_CACHE.should_update_last_active(
+                user.id, user.last_active_at
+            ):
                 background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
         return user
     else:
@@ -233,7 +236,7 @@ def get_current_user_by_api_key(api_key: str):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=ERROR_MESSAGES.INVALID_TOKEN,
         )
-    else:
+    elif USER_CACHE.should_update_last_active(user.id, user.last_active_at):
         Users.update_user_last_active_by_id(user.id)
 
     return user
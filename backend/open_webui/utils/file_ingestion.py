@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
+
+from open_webui.config import FILE_INGESTION_CONCURRENCY
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.files import FILE_PROCESSING_STATUSES, FileModel, Files
+from open_webui.models.users import Users
+from open_webui.routers.audio import transcribe
+from open_webui.routers.retrieval import ProcessFileForm, process_file
+from open_webui.socket.main import sio, USER_POOL
+from open_webui.storage.provider import Storage
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+HEARTBEAT_INTERVAL = 15
+# A file whose processing was not updated for this long is considered
+# orphaned (e.g. its worker restarted) and queued again
+STALE_TIMEOUT = 60
+
+AUDIO_CONTENT_TYPES = ["audio/mpeg", "audio/wav", "audio/ogg", "audio/x-m4a"]
+
+
+def _get_stale_before() -> int:
+    return int(time.time()) - STALE_TIMEOUT
+
+
+async def emit_file_status(file: FileModel, status: str, error: Optional[str] = None):
+    """Pushes a status change to the sessions of the file's owner."""
+    for session_id in await USER_POOL.get_sids(file.user_id):
+        await sio.emit(
+            "chat-events",
+            {
+                "chat_id": None,
+                "message_id": None,
+                "data": {
+                    "type": "file:status",
+                    "data": {"file_id": file.id, "status": status, "error": error},
+                },
+            },
+            to=session_id,
+        )
+
+
+class FileIngestionQueue:
+    """
+    Processes uploaded files in the background: extraction (or transcription),
+    chunking, embedding and vector insert run here instead of in the upload
+    request. `concurrency` files are processed at once per worker.
+
+    The progress of each file is stored in its `status` (see
+    `FILE_STATUS_TRANSITIONS`) and pushed to its owner as "file:status"
+    chat events. Files are claimed before processing, so each is processed
+    once even when several workers share the database; files left behind by a
+    worker that went away are picked up by the others.
+
+    Processing stops between batches when the file is deleted (see `cancel`)
+    or the worker shuts down.
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+
+        self.app: Optional[FastAPI] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        # Ids in `queue`, so that sweeps do not queue a file twice
+        self._queued: set[str] = set()
+        # Cancellation flags of the files being processed
+        self._cancel_events: dict[str, threading.Event] = {}
+
+    def is_running(self) -> bool:
+        return self.loop is not None
+
+    async def start(self, app: FastAPI):
+        self.app = app
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self):
+        # Interrupted files are picked up again as orphaned
+        self.cancel_all()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.loop = None
+
+    def cancel(self, file_id: str):
+        """Stops processing a file, e.g. because it was deleted."""
+        event = self._cancel_events.get(file_id)
+        if event is not None:
+            event.set()
+
+    def cancel_all(self):
+        for event in list(self._cancel_events.values()):
+            event.set()
+
+    def enqueue(self, file_id: str):
+        """Queues a pending file. Safe to call from threadpool endpoints."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is self.loop:
+            self._put(file_id)
+        else:
+            self.loop.call_soon_threadsafe(self._put, file_id)
+
+    def _put(self, file_id: str):
+        if file_id in self._queued or file_id in self._cancel_events:
+            return
+        self._queued.add(file_id)
+        self.queue.put_nowait(file_id)
+
+    async def _worker(self):
+        while True:
+            file_id = await self.queue.get()
+            self._queued.discard(file_id)
+            try:
+                await self.process(file_id)
+            except Exception as e:
+                log.exception(f"Error ingesting file {file_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _sweep(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.requeue_stale_files)
+            except Exception as e:
+                log.warning(f"Failed to requeue stale files: {e}")
+            await asyncio.sleep(STALE_TIMEOUT)
+
+    def requeue_stale_files(self):
+        for file in Files.get_files_by_status(
+            FILE_PROCESSING_STATUSES, _get_stale_before()
+        ):
+            log.info(f"Queueing orphaned file {file.id} ({file.status})")
+            self.enqueue(file.id)
+
+    async def _heartbeat(self, file_id: str):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            await asyncio.to_thread(Files.touch_file_by_id, file_id)
+
+    async def process(self, file_id: str):
+        # Fails if another worker got to the file first or it was deleted
+        if not await asyncio.to_thread(
+            Files.claim_file_by_id, file_id, _get_stale_before()
+        ):
+            return
+
+        file = await asyncio.to_thread(Files.get_file_by_id, file_id)
+        await emit_file_status(file, "extracting")
+
+        cancel_event = threading.Event()
+        self._cancel_events[file_id] = cancel_event
+        heartbeat = asyncio.create_task(self._heartbeat(file_id))
+        try:
+            await asyncio.to_thread(self._process_file, file, cancel_event)
+            status, error = "ready", None
+        except Exception as e:
+            status = "failed"
+            error = str(e.detail) if isinstance(e, HTTPException) else str(e)
+            log.error(f"Error processing file {file_id}: {error}")
+        finally:
+            heartbeat.cancel()
+            self._cancel_events.pop(file_id, None)
+
+        if cancel_event.is_set():
+            log.info(f"Processing of file {file_id} was cancelled")
+            return
+
+        if await asyncio.to_thread(
+            Files.update_file_status_by_id, file_id, status, error=error
+        ):
+            await emit_file_status(file, status, error)
+
+    def _process_file(self, file: FileModel, cancel_event: threading.Event):
+        user = Users.get_user_by_id(file.user_id)
+        # process_file only needs `request.app`; it reports the start of the
+        # embedding through `request.state.set_file_status` and checks
+        # `request.state.is_cancelled` between batches
+        request = Request({"type": "http", "app": self.app})
+        request.state.set_file_status = lambda status: self._set_status(file, status)
+        request.state.is_cancelled = cancel_event.is_set
+
+        if file.meta.get("content_type") in AUDIO_CONTENT_TYPES:
+            result = transcribe(request, Storage.get_file(file.path))
+            form_data = ProcessFileForm(file_id=file.id, content=result.get("text", ""))
+        else:
+            form_data = ProcessFileForm(file_id=file.id)
+
+        process_file(request, form_data, user=user)
+
+    def _set_status(self, file: FileModel, status: str):
+        """Status update from the processing thread."""
+        if Files.update_file_status_by_id(file.id, status):
+            asyncio.run_coroutine_threadsafe(emit_file_status(file, status), self.loop)
+
+
+FILE_INGESTION_QUEUE = FileIngestionQueue(FILE_INGESTION_CONCURRENCY)
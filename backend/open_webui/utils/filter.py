@@ -1,112 +1,196 @@
 import inspect
 import logging
+from typing import Any, Optional
 
 from open_webui.utils.plugin import load_function_module_by_id
-from open_webui.models.functions import Functions
+from open_webui.models.functions import FunctionModel, Functions
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
-def get_sorted_filter_ids(model: dict):
-    def get_priority(function_id):
-        function = Functions.get_function_by_id(function_id)
-        if function is not None:
-            valves = Functions.get_function_valves_by_id(function_id)
-            return valves.get("priority", 0) if valves else 0
-        return 0
-
-    filter_ids = [function.id for function in Functions.get_global_filter_functions()]
+def get_sorted_filter_functions(model: dict) -> list[FunctionModel]:
+    enabled_functions = {
+        function.id: function
+        for function in Functions.get_functions_by_type("filter", active_only=True)
+    }
+
+    filter_ids = [
+        function.id for function in enabled_functions.values() if function.is_global
+    ]
     if "info" in model and "meta" in model["info"]:
         filter_ids.extend(model["info"]["meta"].get("filterIds", []))
         filter_ids = list(set(filter_ids))
 
-    enabled_filter_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
-    ]
+    filter_ids = [fid for fid in filter_ids if fid in enabled_functions]
 
-    filter_ids = [fid for fid in filter_ids if fid in enabled_filter_ids]
-    filter_ids.sort(key=get_priority)
-    return filter_ids
+    valves = Functions.get_function_valves_by_ids(filter_ids)
+    filter_ids.sort(key=lambda fid: (valves.get(fid) or {}).get("priority", 0))
+    return [enabled_functions[fid] for fid in filter_ids]
 
 
-async def process_filter_functions(
-    request, filter_functions, filter_type, form_data, extra_params
-):
-    skip_files = None
-
-    for function in filter_functions:
-        filter = function
-        filter_id = function.id
-        if not filter:
-            continue
-
-        if filter_id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[filter_id]
-        else:
-            function_module, _, _ = load_function_module_by_id(filter_id)
-            request.app.state.FUNCTIONS[filter_id] = function_module
-
-        # Prepare handler function
-        handler = getattr(function_module, filter_type, None)
-        if not handler:
-            continue
-
-        # Check if the function has a file_handler variable
-        if filter_type == "inlet" and hasattr(function_module, "file_handler"):
-            skip_files = function_module.file_handler
-
-        # Apply valves to the function
-        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
-            )
-
-        try:
-            # Prepare parameters
-            sig = inspect.signature(handler)
-
-            params = {"body": form_data}
-            if filter_type == "stream":
-                params = {"event": form_data}
-
-            params = params | {
+def get_sorted_filter_ids(model: dict):
+    return [function.id for function in get_sorted_filter_functions(model)]
+
+
+class CompiledFilter:
+    """
+    A filter handler with everything that does not change between calls
+    resolved: its signature and its valves.
+    """
+
+    def __init__(
+        self,
+        function: FunctionModel,
+        function_module: Any,
+        handler,
+        valves: Optional[Any],
+    ):
+        self.id = function.id
+        self.updated_at = function.updated_at
+        self.function_module = function_module
+        self.handler = handler
+        self.is_coroutine = inspect.iscoroutinefunction(handler)
+        self.parameters = set(inspect.signature(handler).parameters)
+        self.valves = valves
+
+        self.user_valves_class = (
+            getattr(function_module, "UserValves", None)
+            if "__user__" in self.parameters
+            else None
+        )
+
+
+# Compiled filters by (function id, filter type). Entries are reused while the
+# function row is unchanged and its module has not been reloaded.
+_compiled_filters: dict[tuple[str, str], CompiledFilter] = {}
+
+
+def invalidate_compiled_filters(function_id: str):
+    for key in [key for key in _compiled_filters if key[0] == function_id]:
+        _compiled_filters.pop(key, None)
+
+
+def get_compiled_filter(
+    request, function: FunctionModel, filter_type: str
+) -> Optional[CompiledFilter]:
+    filter_id = function.id
+
+    if filter_id in request.app.state.FUNCTIONS:
+        function_module = request.app.state.FUNCTIONS[filter_id]
+    else:
+        function_module, _, _ = load_function_module_by_id(filter_id)
+        request.app.state.FUNCTIONS[filter_id] = function_module
+
+    compiled = _compiled_filters.get((filter_id, filter_type))
+    if (
+        compiled is not None
+        and compiled.function_module is function_module
+        and compiled.updated_at == function.updated_at
+    ):
+        return compiled
+
+    # Prepare handler function
+    handler = getattr(function_module, filter_type, None)
+    if not handler:
+        return None
+
+    valves = None
+    if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
+        valves = function_module.Valves(
+            **(Functions.get_function_valves_by_id(filter_id) or {})
+        )
+
+    compiled = CompiledFilter(function, function_module, handler, valves)
+    _compiled_filters[(filter_id, filter_type)] = compiled
+    return compiled
+
+
+class FilterPipeline:
+    """
+    The filters of one request, resolved once.
+
+    Handlers, signatures, valves and user valves are looked up when the
+    pipeline is built, so processing a stream chunk only calls the handlers.
+    """
+
+    def __init__(self, request, filter_functions, filter_type, extra_params):
+        self.filter_type = filter_type
+        self.skip_files = None
+        self.steps = []
+
+        for function in filter_functions:
+            if not function:
+                continue
+
+            compiled = get_compiled_filter(request, function, filter_type)
+            if compiled is None:
+                continue
+
+            # Check if the function has a file_handler variable
+            if filter_type == "inlet" and hasattr(
+                compiled.function_module, "file_handler"
+            ):
+                self.skip_files = compiled.function_module.file_handler
+
+            # Apply valves to the function
+            if compiled.valves is not None:
+                compiled.function_module.valves = compiled.valves
+
+            params = {
                 k: v
                 for k, v in {
                     **extra_params,
-                    "__id__": filter_id,
+                    "__id__": compiled.id,
                 }.items()
-                if k in sig.parameters
+                if k in compiled.parameters
             }
 
             # Handle user parameters
-            if "__user__" in sig.parameters:
-                if hasattr(function_module, "UserValves"):
-                    try:
-                        params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, params["__user__"]["id"]
-                            )
+            user_valves = None
+            if compiled.user_valves_class is not None and "__user__" in params:
+                try:
+                    user_valves = compiled.user_valves_class(
+                        **Functions.get_user_valves_by_id_and_user_id(
+                            compiled.id, params["__user__"]["id"]
                         )
-                    except Exception as e:
-                        log.exception(f"Failed to get user values: {e}")
+                    )
+                except Exception as e:
+                    log.exception(f"Failed to get user values: {e}")
+
+            self.steps.append((compiled, params, user_valves))
 
-            # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
+    async def process(self, form_data):
+        for compiled, params, user_valves in self.steps:
+            if user_valves is not None:
+                params["__user__"]["valves"] = user_valves
+
+            if self.filter_type == "stream":
+                params = {"event": form_data, **params}
             else:
-                form_data = handler(**params)
+                params = {"body": form_data, **params}
+
+            try:
+                # Execute handler
+                if compiled.is_coroutine:
+                    form_data = await compiled.handler(**params)
+                else:
+                    form_data = compiled.handler(**params)
+            except Exception as e:
+                log.debug(f"Error in {self.filter_type} handler {compiled.id}: {e}")
+                raise e
 
-        except Exception as e:
-            log.debug(f"Error in {filter_type} handler {filter_id}: {e}")
-            raise e
+        # Handle file cleanup for inlet
+        if self.skip_files and "files" in form_data.get("metadata", {}):
+            del form_data["files"]
+            del form_data["metadata"]["files"]
 
-    # Handle file cleanup for inlet
-    if skip_files and "files" in form_data.get("metadata", {}):
-        del form_data["files"]
-        del form_data["metadata"]["files"]
+        return form_data, {}
 
-    return form_data, {}
+
+async def process_filter_functions(
+    request, filter_functions, filter_type, form_data, extra_params
+):
+    pipeline = FilterPipeline(request, filter_functions, filter_type, extra_params)
+    return await pipeline.process(form_data)
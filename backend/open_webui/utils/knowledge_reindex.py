@@ -0,0 +1,338 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
+
+from open_webui.config import (
+    KNOWLEDGE_REINDEX_CONCURRENCY,
+    KNOWLEDGE_REINDEX_FILES_PER_MINUTE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.files import Files
+from open_webui.models.knowledge import Knowledges, get_knowledge_collection_name
+from open_webui.models.knowledge_reindex import (
+    KnowledgeReindexJobs,
+    KnowledgeReindexJobModel,
+)
+from open_webui.models.users import Users
+from open_webui.retrieval.bm25 import BM25_INDEX_CACHE
+from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.routers.retrieval import process_file, ProcessFileForm
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+HEARTBEAT_INTERVAL = 15
+# A job whose heartbeat is older than this is considered orphaned and resumed
+STALE_TIMEOUT = 60
+
+# Keep references so running jobs are not garbage collected
+_running_jobs: dict[str, asyncio.Task] = {}
+
+
+class RateLimiter:
+    """Spaces acquisitions out to at most `per_minute` per minute."""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60 / per_minute if per_minute > 0 else 0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def get_shadow_collection_name(knowledge_id: str, job_id: str) -> str:
+    return f"{knowledge_id}-{job_id[:8]}"
+
+
+def get_knowledge_file_ids(knowledge) -> list[str]:
+    return knowledge.data.get("file_ids", []) if knowledge.data else []
+
+
+class KnowledgeReindexRunner:
+    """
+    Rebuilds every knowledge base of a job into a shadow collection and then
+    points the knowledge base at it, so queries keep hitting the old collection
+    until the new one is complete.
+
+    Files are processed by a bounded, rate limited worker pool across all
+    knowledge bases. Each file's outcome is checkpointed, so a job interrupted
+    by a restart resumes where it stopped.
+    """
+
+    def __init__(self, app: FastAPI, job: KnowledgeReindexJobModel):
+        self.job = job
+        # process_file only needs `request.app`
+        self.request = Request({"type": "http", "app": app})
+        self.user = Users.get_user_by_id(job.user_id)
+
+        self.checkpoints = KnowledgeReindexJobs.get_file_statuses_by_job_id(job.id)
+        self.semaphore = asyncio.Semaphore(KNOWLEDGE_REINDEX_CONCURRENCY)
+        self.limiter = RateLimiter(KNOWLEDGE_REINDEX_FILES_PER_MINUTE)
+
+    async def run(self):
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            await asyncio.gather(
+                *[
+                    self.reindex_knowledge(knowledge_id)
+                    for knowledge_id in self.job.data.get("knowledge_ids", [])
+                ]
+            )
+            status = "completed"
+        except Exception as e:
+            log.exception(f"Reindex job {self.job.id} failed: {e}")
+            status = "failed"
+        finally:
+            heartbeat.cancel()
+
+        await asyncio.to_thread(
+            KnowledgeReindexJobs.update_job_by_id, self.job.id, status=status
+        )
+        log.info(f"Reindex job {self.job.id} {status}")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            await asyncio.to_thread(KnowledgeReindexJobs.update_job_by_id, self.job.id)
+
+    async def reindex_knowledge(self, knowledge_id: str):
+        file_ids = await asyncio.to_thread(self.prepare_knowledge, knowledge_id)
+        if file_ids is None:
+            return
+
+        shadow_collection_name = get_shadow_collection_name(knowledge_id, self.job.id)
+        await asyncio.gather(
+            *[
+                self.reindex_file(knowledge_id, file_id, shadow_collection_name)
+                for file_id in file_ids
+            ]
+        )
+
+        await asyncio.to_thread(
+            self.swap_collection, knowledge_id, shadow_collection_name, set(file_ids)
+        )
+
+    def prepare_knowledge(self, knowledge_id: str) -> Optional[list[str]]:
+        """
+        Returns the files to reindex, or None if the knowledge base is gone.
+        A shadow collection left behind by an attempt that did not get to
+        checkpoint any file is dropped.
+        """
+        knowledge = Knowledges.get_knowledge_by_id(knowledge_id)
+        if knowledge is None:
+            return None
+
+        shadow_collection_name = get_shadow_collection_name(knowledge_id, self.job.id)
+        started = any(key[0] == knowledge_id for key in self.checkpoints)
+        if not started and VECTOR_DB_CLIENT.has_collection(
+            collection_name=shadow_collection_name
+        ):
+            VECTOR_DB_CLIENT.delete_collection(collection_name=shadow_collection_name)
+            BM25_INDEX_CACHE.invalidate(shadow_collection_name)
+
+        return get_knowledge_file_ids(knowledge)
+
+    async def reindex_file(self, knowledge_id: str, file_id: str, collection_name: str):
+        checkpoint = self.checkpoints.get((knowledge_id, file_id))
+        if checkpoint in ("completed", "failed"):
+            return
+
+        async with self.semaphore:
+            await self.limiter.wait()
+            await asyncio.to_thread(
+                KnowledgeReindexJobs.upsert_file_status,
+                self.job.id,
+                knowledge_id,
+                file_id,
+                "processing",
+            )
+
+            try:
+                # An interrupted attempt may have left part of the file behind
+                await asyncio.to_thread(
+                    self.process_file,
+                    knowledge_id,
+                    file_id,
+                    collection_name,
+                    checkpoint == "processing",
+                )
+                await asyncio.to_thread(
+                    self.checkpoint_file, knowledge_id, file_id, "completed"
+                )
+            except Exception as e:
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+                log.error(f"Error reindexing file {file_id} of {knowledge_id}: {error}")
+                await asyncio.to_thread(
+                    self.checkpoint_file, knowledge_id, file_id, "failed", error
+                )
+
+    def checkpoint_file(
+        self,
+        knowledge_id: str,
+        file_id: str,
+        status: str,
+        error: Optional[str] = None,
+    ):
+        KnowledgeReindexJobs.upsert_file_status(
+            self.job.id, knowledge_id, file_id, status, error=error
+        )
+        KnowledgeReindexJobs.increment_job_counter_by_id(
+            self.job.id, failed=status == "failed"
+        )
+
+    def process_file(
+        self,
+        knowledge_id: str,
+        file_id: str,
+        collection_name: str,
+        clear: bool = False,
+    ):
+        if clear and VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+            VECTOR_DB_CLIENT.delete(
+                collection_name=collection_name, filter={"file_id": file_id}
+            )
+            BM25_INDEX_CACHE.delete(collection_name, filter={"file_id": file_id})
+
+        process_file(
+            self.request,
+            ProcessFileForm(file_id=file_id, collection_name=collection_name),
+            user=self.user,
+        )
+        # process_file records the collection it wrote to; file access checks
+        # expect the knowledge base id there
+        Files.update_file_metadata_by_id(file_id, {"collection_name": knowledge_id})
+
+    def swap_collection(
+        self, knowledge_id: str, shadow_collection_name: str, file_ids: set[str]
+    ):
+        knowledge = Knowledges.get_knowledge_by_id(knowledge_id)
+        if knowledge is None:
+            # Deleted while the job was running
+            if VECTOR_DB_CLIENT.has_collection(collection_name=shadow_collection_name):
+                VECTOR_DB_CLIENT.delete_collection(
+                    collection_name=shadow_collection_name
+                )
+            BM25_INDEX_CACHE.invalidate(shadow_collection_name)
+            return
+
+        # Catch up with files added or removed while the job was running
+        current_file_ids = set(get_knowledge_file_ids(knowledge))
+        self.sync_files(
+            knowledge_id, shadow_collection_name, file_ids, current_file_ids
+        )
+
+        previous_collection_name = get_knowledge_collection_name(knowledge)
+        Knowledges.update_knowledge_collection_name_by_id(
+            knowledge_id, shadow_collection_name
+        )
+
+        if previous_collection_name != shadow_collection_name:
+            try:
+                if VECTOR_DB_CLIENT.has_collection(
+                    collection_name=previous_collection_name
+                ):
+                    VECTOR_DB_CLIENT.delete_collection(
+                        collection_name=previous_collection_name
+                    )
+            except Exception as e:
+                log.warning(
+                    f"Error deleting collection {previous_collection_name}: {e}"
+                )
+            BM25_INDEX_CACHE.invalidate(previous_collection_name)
+
+        # Files added between the catch-up and the swap went to the old collection
+        knowledge = Knowledges.get_knowledge_by_id(knowledge_id)
+        if knowledge is not None:
+            self.sync_files(
+                knowledge_id,
+                shadow_collection_name,
+                current_file_ids,
+                set(get_knowledge_file_ids(knowledge)),
+            )
+
+    def sync_files(
+        self,
+        knowledge_id: str,
+        collection_name: str,
+        indexed_file_ids: set[str],
+        file_ids: set[str],
+    ):
+        for file_id in file_ids - indexed_file_ids:
+            try:
+                self.process_file(knowledge_id, file_id, collection_name)
+            except Exception as e:
+                log.error(f"Error reindexing file {file_id} of {knowledge_id}: {e}")
+
+        for file_id in indexed_file_ids - file_ids:
+            try:
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name, filter={"file_id": file_id}
+                )
+                BM25_INDEX_CACHE.delete(collection_name, filter={"file_id": file_id})
+            except Exception as e:
+                log.debug(e)
+
+
+def _run_job(app: FastAPI, job: KnowledgeReindexJobModel):
+    task = asyncio.create_task(KnowledgeReindexRunner(app, job).run())
+    _running_jobs[job.id] = task
+    task.add_done_callback(lambda _: _running_jobs.pop(job.id, None))
+
+
+def _get_stale_before() -> int:
+    return int(time.time()) - STALE_TIMEOUT
+
+
+def _is_stale(job: KnowledgeReindexJobModel) -> bool:
+    return job.id not in _running_jobs and job.updated_at < _get_stale_before()
+
+
+async def start_reindex_job(app: FastAPI, user) -> Optional[KnowledgeReindexJobModel]:
+    """
+    Starts a reindex of all knowledge bases in the background. If a job is
+    already running it is returned instead; an orphaned one is resumed.
+    """
+    for job in KnowledgeReindexJobs.get_unfinished_jobs():
+        if not _is_stale(job):
+            return job
+        if KnowledgeReindexJobs.claim_job(job, _get_stale_before()):
+            _run_job(app, KnowledgeReindexJobs.get_job_by_id(job.id))
+            return job
+
+    knowledge_bases = Knowledges.get_knowledge_bases()
+    job = KnowledgeReindexJobs.insert_new_job(
+        user.id,
+        [knowledge_base.id for knowledge_base in knowledge_bases],
+        total=sum(
+            len(get_knowledge_file_ids(knowledge_base))
+            for knowledge_base in knowledge_bases
+        ),
+    )
+    if job is None or not KnowledgeReindexJobs.claim_job(job, _get_stale_before()):
+        return None
+
+    log.info(f"Starting reindexing for {len(knowledge_bases)} knowledge bases")
+    _run_job(app, KnowledgeReindexJobs.get_job_by_id(job.id))
+    return job
+
+
+async def resume_reindex_jobs(app: FastAPI):
+    """Resumes jobs whose worker went away, e.g. after a restart."""
+    for job in KnowledgeReindexJobs.get_unfinished_jobs():
+        if _is_stale(job) and KnowledgeReindexJobs.claim_job(job, _get_stale_before()):
+            log.info(f"Resuming reindex job {job.id}")
+            _run_job(app, KnowledgeReindexJobs.get_job_by_id(job.id))
@@ -0,0 +1,116 @@
+import logging
+import time
+from typing import Callable, Optional
+
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REALTIME_CHAT_SAVE_INTERVAL,
+    REALTIME_CHAT_SAVE_BUFFER_SIZE,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class MessageWriteBuffer:
+    """
+    Write-behind buffer for a message that is being streamed into a chat.
+
+    Deltas are accumulated in memory and the message is only serialized and
+    written to the database once `interval` seconds have passed or `max_size`
+    characters have been buffered since the last write, and once more when the
+    stream completes.
+
+    While the content only grows at its end, as streamed text does, just the
+    text appended since the last write is sent to the database; other
+    changes (e.g. a reasoning block being closed) rewrite the content.
+    """
+
+    def __init__(
+        self,
+        chat_id: str,
+        message_id: str,
+        serializer: Optional[Callable[[], str]] = None,
+        interval: float = REALTIME_CHAT_SAVE_INTERVAL,
+        max_size: int = REALTIME_CHAT_SAVE_BUFFER_SIZE,
+        writer: Optional[Callable[[str, str, dict], object]] = None,
+        appender: Optional[Callable[[str, str, str, int], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.serializer = serializer
+        self.interval = interval
+        self.max_size = max_size
+        self.writer = writer or Chats.upsert_message_to_chat_by_id_and_message_id
+        self.appender = appender or Chats.append_message_content_by_id_and_message_id
+        self.clock = clock
+
+        self.size = 0
+        self.dirty = False
+        self.flushes = 0
+        self.last_content: Optional[str] = None
+        self.last_flush_at = self.clock()
+
+    def append(self, delta: str) -> bool:
+        """
+        Record that `delta` was appended to the message content.
+        Returns True if the buffer was flushed.
+        """
+        self.size += len(delta or "")
+        self.dirty = True
+        return self.maybe_flush()
+
+    def should_flush(self) -> bool:
+        if not self.dirty:
+            return False
+        return (
+            self.size >= self.max_size
+            or self.clock() - self.last_flush_at >= self.interval
+        )
+
+    def maybe_flush(self) -> bool:
+        if self.should_flush():
+            return self.flush()
+        return False
+
+    def flush(self, content: Optional[str] = None) -> bool:
+        """
+        Write the pending message to the database. The content is serialized only
+        here, and the write is skipped if nothing changed since the last flush.
+        """
+        if content is None and self.dirty and self.serializer:
+            content = self.serializer()
+
+        self.size = 0
+        self.dirty = False
+        self.last_flush_at = self.clock()
+
+        if content is None or content == self.last_content:
+            return False
+
+        try:
+            self.write(content)
+        except Exception as e:
+            log.exception(f"Error flushing message {self.message_id}: {e}")
+            # The next flush retries with the content at that time
+            self.dirty = True
+            return False
+
+        self.last_content = content
+        self.flushes += 1
+        return True
+
+    def write(self, content: str):
+        last_content = self.last_content
+        if last_content and content.startswith(last_content):
+            if self.appender(
+                self.chat_id,
+                self.message_id,
+                content[len(last_content) :],
+                len(last_content),
+            ):
+                return
+
+        self.writer(self.chat_id, self.message_id, {"content": content})
@@ -25,6 +25,7 @@ from starlette.responses import Response, StreamingResponse
 from open_webui.models.chats import Chats
 from open_webui.models.users import Users
 from open_webui.socket.main import (
+    get_content_frame_emitter,
     get_event_call,
     get_event_emitter,
     get_active_status_by_user_id,
@@ -46,7 +47,6 @@ from open_webui.utils.webhook import post_webhook
 
 
 from open_webui.models.users import UserModel
-from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 from open_webui.retrieval.utils import get_sources_from_files
@@ -60,7 +60,6 @@ from open_webui.utils.task import (
 )
 from open_webui.utils.misc import (
     deep_update,
-    get_message_list,
     add_or_update_system_message,
     add_or_update_user_message,
     get_last_user_message,
@@ -71,10 +70,12 @@ from open_webui.utils.misc import (
 from open_webui.utils.tools import get_tools
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
-    get_sorted_filter_ids,
+    get_sorted_filter_functions,
+    FilterPipeline,
     process_filter_functions,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.message_buffer import MessageWriteBuffer
 
 from open_webui.tasks import create_task
 
@@ -775,10 +776,7 @@ async def process_chat_payload(request, form_data, user, metadata, model):
         raise e
 
     try:
-        filter_functions = [
-            Functions.get_function_by_id(filter_id)
-            for filter_id in get_sorted_filter_ids(model)
-        ]
+        filter_functions = get_sorted_filter_functions(model)
 
         form_data, flags = await process_filter_functions(
             request=request,
@@ -955,12 +953,12 @@ async def process_chat_response(
     request, response, form_data, user, metadata, model, events, tasks
 ):
     async def background_tasks_handler():
-        message_map = Chats.get_messages_by_chat_id(metadata["chat_id"])
-        message = message_map.get(metadata["message_id"]) if message_map else None
+        messages = Chats.get_message_list_by_id_and_message_id(
+            metadata["chat_id"], metadata["message_id"]
+        )
+        message = messages[-1] if messages else None
 
         if message:
-            messages = get_message_list(message_map, message.get("id"))
-
             if tasks and messages:
                 if TASKS.TITLE_GENERATION in tasks:
                     if tasks[TASKS.TITLE_GENERATION]:
@@ -1129,7 +1127,7 @@ async def process_chat_response(
                     )
 
                     # Send a webhook notification if the user is not active
-                    if get_active_status_by_user_id(user.id) is None:
+                    if await get_active_status_by_user_id(user.id) is None:
                         webhook_url = Users.get_user_webhook_url_by_id(user.id)
                         if webhook_url:
                             post_webhook(
@@ -1170,10 +1168,9 @@ async def process_chat_response(
         "__request__": request,
         "__model__": model,
     }
-    filter_functions = [
-        Functions.get_function_by_id(filter_id)
-        for filter_id in get_sorted_filter_ids(model)
-    ]
+    filter_functions = get_sorted_filter_functions(model)
+    # Resolved once, as stream filters run on every chunk
+    stream_filter = FilterPipeline(request, filter_functions, "stream", extra_params)
 
     # Streaming response
     if event_emitter and event_caller:
@@ -1532,6 +1529,17 @@ async def process_chat_response(
                 }
             ]
 
+            message_buffer = MessageWriteBuffer(
+                metadata["chat_id"],
+                metadata["message_id"],
+                serializer=lambda: serialize_content_blocks(content_blocks),
+            )
+            # The content is streamed as coalesced frames instead of with
+            # every delta
+            content_frames = get_content_frame_emitter(
+                metadata, lambda: serialize_content_blocks(content_blocks)
+            )
+
             # We might want to disable this by default
             DETECT_REASONING = True
             DETECT_SOLUTION = True
@@ -1595,13 +1603,7 @@ async def process_chat_response(
                         try:
                             data = json.loads(data)
 
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params=extra_params,
-                            )
+                            data, _ = await stream_filter.process(data)
 
                             if data:
                                 if "event" in data:
@@ -1719,12 +1721,6 @@ async def process_chat_response(
 
                                         reasoning_block["content"] += reasoning_content
 
-                                        data = {
-                                            "content": serialize_content_blocks(
-                                                content_blocks
-                                            )
-                                        }
-
                                     if value:
                                         if (
                                             content_blocks
@@ -1796,22 +1792,20 @@ async def process_chat_response(
                                             )
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
-                                            # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                                metadata["chat_id"],
-                                                metadata["message_id"],
-                                                {
-                                                    "content": serialize_content_blocks(
-                                                        content_blocks
-                                                    ),
-                                                },
-                                            )
-                                        else:
-                                            data = {
-                                                "content": serialize_content_blocks(
-                                                    content_blocks
-                                                ),
-                                            }
+                                            # Save message in the database once the write budget is spent
+                                            message_buffer.append(value)
+
+                                    if value or reasoning_content:
+                                        await content_frames.update()
+
+                                        # Pass on what else the chunk carries
+                                        data = {
+                                            key: data[key]
+                                            for key in ("sources", "usage")
+                                            if key in data
+                                        }
+                                        if not data:
+                                            continue
 
                                 await event_emitter(
                                     {
@@ -1868,14 +1862,7 @@ async def process_chat_response(
                         }
                     )
 
-                    await event_emitter(
-                        {
-                            "type": "chat:completion",
-                            "data": {
-                                "content": serialize_content_blocks(content_blocks),
-                            },
-                        }
-                    )
+                    await content_frames.send()
 
                     tools = metadata.get("tools", {})
 
@@ -1980,14 +1967,7 @@ async def process_chat_response(
                         }
                     )
 
-                    await event_emitter(
-                        {
-                            "type": "chat:completion",
-                            "data": {
-                                "content": serialize_content_blocks(content_blocks),
-                            },
-                        }
-                    )
+                    await content_frames.send()
 
                     try:
                         res = await generate_chat_completion(
@@ -2020,14 +2000,7 @@ async def process_chat_response(
                         content_blocks[-1]["type"] == "code_interpreter"
                         and retries < MAX_RETRIES
                     ):
-                        await event_emitter(
-                            {
-                                "type": "chat:completion",
-                                "data": {
-                                    "content": serialize_content_blocks(content_blocks),
-                                },
-                            }
-                        )
+                        await content_frames.send()
 
                         retries += 1
                         log.debug(f"Attempt count: {retries}")
@@ -2157,14 +2130,7 @@ async def process_chat_response(
                             }
                         )
 
-                        await event_emitter(
-                            {
-                                "type": "chat:completion",
-                                "data": {
-                                    "content": serialize_content_blocks(content_blocks),
-                                },
-                            }
-                        )
+                        await content_frames.send()
 
                         try:
                             res = await generate_chat_completion(
@@ -2193,6 +2159,9 @@ async def process_chat_response(
                             log.debug(e)
                             break
 
+                # The final content is sent with the completion
+                content_frames.close()
+
                 title = Chats.get_chat_title_by_id(metadata["chat_id"])
                 data = {
                     "done": True,
@@ -2200,18 +2169,11 @@ async def process_chat_response(
                     "title": title,
                 }
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
-                    # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        metadata["chat_id"],
-                        metadata["message_id"],
-                        {
-                            "content": serialize_content_blocks(content_blocks),
-                        },
-                    )
+                # Save message in the database
+                message_buffer.flush(data["content"])
 
                 # Send a webhook notification if the user is not active
-                if get_active_status_by_user_id(user.id) is None:
+                if await get_active_status_by_user_id(user.id) is None:
                     webhook_url = Users.get_user_webhook_url_by_id(user.id)
                     if webhook_url:
                         post_webhook(
@@ -2236,23 +2198,17 @@ async def process_chat_response(
                 await background_tasks_handler()
             except asyncio.CancelledError:
                 log.warning("Task was cancelled!")
+                content_frames.close()
                 await event_emitter({"type": "task-cancelled"})
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
-                    # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        metadata["chat_id"],
-                        metadata["message_id"],
-                        {
-                            "content": serialize_content_blocks(content_blocks),
-                        },
-                    )
+                # Save message in the database
+                message_buffer.flush(serialize_content_blocks(content_blocks))
 
             if response.background is not None:
                 await response.background()
 
         # background_tasks.add_task(post_response_handler, response, events)
-        task_id, _ = create_task(
+        task_id, _ = await create_task(
             post_response_handler(response, events), id=metadata["chat_id"]
         )
         return {"status": True, "task_id": task_id}
@@ -2264,25 +2220,13 @@ async def process_chat_response(
                 return f"data: {item}\n\n"
 
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=event,
-                    extra_params=extra_params,
-                )
+                event, _ = await stream_filter.process(event)
 
                 if event:
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=data,
-                    extra_params=extra_params,
-                )
+                data, _ = await stream_filter.process(data)
 
                 if data:
                     yield data
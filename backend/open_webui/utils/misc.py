@@ -42,14 +42,16 @@ def get_message_list(messages, message_id):
 
     # Reconstruct the chain by following the parentId links
     message_list = []
+    seen = set()
 
-    while current_message:
-        message_list.insert(
-            0, current_message
-        )  # Insert the message at the beginning of the list
+    while current_message and id(current_message) not in seen:
+        seen.add(id(current_message))
+        message_list.append(current_message)
         parent_id = current_message["parentId"]
         current_message = messages.get(parent_id) if parent_id else None
 
+    # Collected from the leaf up; appending and reversing once keeps this linear
+    message_list.reverse()
     return message_list
 
 
@@ -463,3 +465,21 @@ def convert_logit_bias_input_to_json(user_input):
         bias = 100 if bias > 100 else -100 if bias < -100 else bias
         logit_bias_json[token] = bias
     return json.dumps(logit_bias_json)
+
+
+def is_etag_match(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches `etag`, using the weak comparison
+    (RFC 9110, 13.1.2): "W/" prefixes are ignored and the header may list
+    several tags or be "*".
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def strip_weak(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return strip_weak(etag) in {strip_weak(tag) for tag in if_none_match.split(",")}
@@ -0,0 +1,191 @@
+import asyncio
+import copy
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_KEY_PREFIX,
+    MODEL_REGISTRY_REFRESH_INTERVAL,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+# A refresh that takes longer than this no longer keeps other workers waiting
+REFRESH_LOCK_TIMEOUT = 60
+
+
+class ModelRegistry:
+    """
+    Serves the models of the configured connections from memory.
+
+    Once `refresh_interval` seconds have passed, the next read still returns
+    the current list and starts a refresh in the background
+    (stale-while-revalidate). A failed refresh keeps the previous list, and
+    an upstream that does not answer keeps the last list it returned (see
+    `fetch_upstream`). Only the first read, and the first read after
+    `invalidate()`, wait for the upstreams.
+
+    With Redis, the list is shared: one worker at a time refreshes it and the
+    others adopt its result.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float,
+        redis_url: str = "",
+        redis_sentinels: Optional[list] = None,
+    ):
+        self.refresh_interval = refresh_interval
+
+        self.models: Optional[list[dict]] = None
+        # time.time() of the upstream requests that produced `models`
+        self.refreshed_at = 0.0
+        self._invalidated = False
+        self._generation = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._upstream_responses: dict[str, Any] = {}
+
+        self._redis = (
+            get_redis_connection(
+                redis_url, redis_sentinels, async_mode=True, decode_responses=True
+            )
+            if redis_url
+            else None
+        )
+        self._redis_key = f"{REDIS_KEY_PREFIX}:models"
+        self._redis_lock_key = f"{REDIS_KEY_PREFIX}:models:refresh"
+
+    def is_stale(self) -> bool:
+        return time.time() - self.refreshed_at >= self.refresh_interval
+
+    async def get_models(self, load: Callable[[], Awaitable[list]]) -> list[dict]:
+        """
+        Returns the registered models, using `load` to fetch them from the
+        upstreams when they need a refresh. Callers must not modify the list.
+        """
+        if self.models is None or self._invalidated:
+            await self.refresh(load)
+            if self._invalidated:
+                # The refresh we waited for started before the invalidation
+                await self.refresh(load)
+        elif self.is_stale():
+            self._start_refresh(load)
+        return self.models
+
+    def _start_refresh(self, load) -> asyncio.Task:
+        task = self._refresh_task
+        if (
+            task is None
+            or task.done()
+            or task.get_loop() is not asyncio.get_running_loop()
+        ):
+            task = asyncio.create_task(self._refresh(load))
+            self._refresh_task = task
+        return task
+
+    async def refresh(self, load: Callable[[], Awaitable[list]]):
+        await asyncio.shield(self._start_refresh(load))
+
+    async def _refresh(self, load):
+        generation = self._generation
+        lock_id = None
+        try:
+            if self._redis is not None and not self._invalidated:
+                if await self._adopt_shared():
+                    return
+
+                lock_id = str(uuid4())
+                if not await self._redis.set(
+                    self._redis_lock_key, lock_id, nx=True, ex=REFRESH_LOCK_TIMEOUT
+                ):
+                    lock_id = None
+                    if self.models is not None:
+                        # Another worker is refreshing; it will share the result
+                        return
+
+            refreshed_at = time.time()
+            models = await load()
+            self._set_models(models, refreshed_at, generation)
+
+            if self._redis is not None:
+                await self._redis.set(
+                    self._redis_key,
+                    json.dumps({"models": models, "refreshed_at": refreshed_at}),
+                )
+        except Exception as e:
+            if self.models is None:
+                raise e
+            log.warning(f"Failed to refresh models, keeping the previous list: {e}")
+            # Retry on a later read instead of on every one
+            self.refreshed_at = time.time()
+            self._invalidated = False
+        finally:
+            if lock_id is not None:
+                try:
+                    if await self._redis.get(self._redis_lock_key) == lock_id:
+                        await self._redis.delete(self._redis_lock_key)
+                except Exception as e:
+                    log.debug(f"Failed to release the model refresh lock: {e}")
+
+    async def _adopt_shared(self) -> bool:
+        """Adopts the list of another worker if it is newer than ours and fresh."""
+        value = await self._redis.get(self._redis_key)
+        if not value:
+            return False
+
+        data = json.loads(value)
+        refreshed_at = data.get("refreshed_at", 0)
+        if (
+            refreshed_at <= self.refreshed_at
+            or time.time() - refreshed_at >= self.refresh_interval
+        ):
+            return False
+
+        self._set_models(data.get("models", []), refreshed_at, self._generation)
+        return True
+
+    def _set_models(self, models: list[dict], refreshed_at: float, generation: int):
+        self.models = models
+        self.refreshed_at = refreshed_at
+        if generation == self._generation:
+            self._invalidated = False
+
+    def invalidate(self):
+        """
+        Makes the next read wait for fresh lists, e.g. after a connection
+        changed. Other workers pick the change up on their next refresh.
+        """
+        self._generation += 1
+        self._invalidated = True
+
+    async def fetch_upstream(self, key: str, request: Awaitable) -> Any:
+        """
+        Awaits the model list request of one upstream. When it fails (returns
+        None), the last list that upstream returned is used instead.
+        """
+        response = await request
+        if response is None:
+            if key in self._upstream_responses:
+                log.warning(f"Using the last known model list of {key}")
+                return copy.deepcopy(self._upstream_responses[key])
+            return None
+
+        self._upstream_responses[key] = copy.deepcopy(response)
+        return response
+
+
+MODEL_REGISTRY = ModelRegistry(
+    refresh_interval=MODEL_REGISTRY_REFRESH_INTERVAL,
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
@@ -15,6 +15,7 @@ from open_webui.models.models import Models
 
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_registry import MODEL_REGISTRY
 
 
 from open_webui.config import (
@@ -60,8 +61,31 @@ async def get_all_base_models(request: Request, user: UserModel = None):
     return models
 
 
+async def get_registered_base_models(request: Request) -> list[dict]:
+    """
+    Returns the base models from the model registry, which refreshes them
+    in the background instead of querying every connection on each call.
+    """
+    base_models = await MODEL_REGISTRY.get_models(lambda: get_all_base_models(request))
+
+    # The registry may have been refreshed by another worker
+    request.app.state.OPENAI_MODELS = {
+        model["id"]: model
+        for model in base_models
+        if model.get("owned_by") == "openai" and "urlIdx" in model
+    }
+    request.app.state.OLLAMA_MODELS = {
+        model["ollama"]["model"]: model["ollama"]
+        for model in base_models
+        if model.get("owned_by") == "ollama"
+    }
+
+    # The models are shared; copy them as they are modified below
+    return [{**model} for model in base_models]
+
+
 async def get_all_models(request, user: UserModel = None):
-    models = await get_all_base_models(request, user=user)
+    models = await get_registered_base_models(request)
 
     # If there are no models, return an empty list
     if len(models) == 0:
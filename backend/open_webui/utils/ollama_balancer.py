@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Callable, Optional
+
+from open_webui.config import (
+    OLLAMA_LOAD_BALANCING_STRATEGY,
+    OLLAMA_CIRCUIT_BREAKER_THRESHOLD,
+    OLLAMA_CIRCUIT_BREAKER_COOLDOWN,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
+
+
+# Weight of the newest sample in the latency average
+EWMA_ALPHA = 0.3
+# Score multiplier for backends that do not have the model loaded yet
+AFFINITY_PENALTY = 4
+LOADED_MODELS_REFRESH_INTERVAL = 10
+MAX_COOLDOWN = 600
+
+
+class OllamaBackend:
+    def __init__(self, url: str, cooldown: float):
+        self.url = url
+        self.outstanding = 0
+        # EWMA of the time to the response headers, in seconds
+        self.latency: Optional[float] = None
+
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+        # Circuit breaker: closed while open_until is 0, open until then, and
+        # half-open (a single trial request) afterwards
+        self.open_until = 0.0
+        self.cooldown = cooldown
+        self.trial_in_flight = False
+
+        self.loaded_models: set[str] = set()
+
+    def is_available(self, now: float) -> bool:
+        if self.open_until == 0:
+            return True
+        return now >= self.open_until and not self.trial_in_flight
+
+    def has_model(self, model: str) -> bool:
+        return model in self.loaded_models
+
+    def get_state(self, now: float) -> str:
+        if self.open_until == 0:
+            return "closed"
+        return "open" if now < self.open_until else "half-open"
+
+
+STRATEGIES: dict[str, Callable[[OllamaBackend], float]] = {
+    "random": lambda backend: random.random(),
+    "least_requests": lambda backend: backend.outstanding + 1,
+    # Backends without samples yet score 0 so they get tried
+    "latency": lambda backend: (backend.outstanding + 1) * (backend.latency or 0),
+}
+
+
+def get_backend_model_name(model: str, prefix_id: Optional[str]) -> str:
+    """Name of `model` on a backend that lists its models with `prefix_id`."""
+    if prefix_id and model.startswith(f"{prefix_id}."):
+        return model[len(prefix_id) + 1 :]
+    return model
+
+
+class BackendRequest:
+    """Tracks one request to a backend; see `OllamaBalancer.start`."""
+
+    def __init__(self, balancer: "OllamaBalancer", backend: Optional[OllamaBackend]):
+        self.balancer = balancer
+        self.backend = backend
+        self.started = time.monotonic()
+        self.recorded = False
+        self.finished = False
+
+        if backend is not None:
+            backend.outstanding += 1
+
+    def record(self, success: bool):
+        """Records the outcome once the response headers arrive or the request fails."""
+        if self.recorded or self.backend is None:
+            return
+        self.recorded = True
+        self.balancer.record(self.backend, time.monotonic() - self.started, success)
+
+    def finish(self):
+        """Marks the request done, after its response has been fully read."""
+        if self.finished or self.backend is None:
+            return
+        self.finished = True
+        self.backend.outstanding -= 1
+        if not self.recorded:
+            # Never reached the backend; release a half-open trial
+            self.backend.trial_in_flight = False
+
+
+class OllamaBalancer:
+    """
+    Picks an Ollama backend for a model among the ones serving it.
+
+    Backends are scored by `strategy` (see `STRATEGIES`), and those that do
+    not have the model loaded are penalised, so requests stick to instances
+    that will not have to load it first. Failed requests (connection errors
+    and 5xx responses) are counted passively; after `failure_threshold` in a
+    row a backend is skipped for a cooldown that doubles with every failed
+    trial request.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "latency",
+        failure_threshold: int = 3,
+        cooldown: float = 30,
+    ):
+        if strategy not in STRATEGIES:
+            log.warning(f"Unknown load balancing strategy {strategy}, using latency")
+            strategy = "latency"
+
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.backends: dict[str, OllamaBackend] = {}
+        self._loaded_models_refreshed_at = 0.0
+        self._background_tasks = set()
+
+    def _get_backend(self, url: str) -> OllamaBackend:
+        backend = self.backends.get(url)
+        if backend is None:
+            backend = OllamaBackend(url, self.cooldown)
+            self.backends[url] = backend
+        return backend
+
+    def select(
+        self,
+        model: str,
+        urls: dict[int, str],
+        prefix_ids: Optional[dict[int, str]] = None,
+    ) -> int:
+        """
+        Returns the index of the backend to use out of `urls` ({idx: url}).
+
+        `prefix_ids` ({idx: prefix_id}) holds the prefix the model is listed
+        with for backends that have one; it is not part of the loaded models.
+        """
+        now = time.monotonic()
+        prefix_ids = prefix_ids or {}
+        candidates = [
+            (
+                idx,
+                self._get_backend(url),
+                get_backend_model_name(model, prefix_ids.get(idx)),
+            )
+            for idx, url in urls.items()
+        ]
+
+        available = [item for item in candidates if item[1].is_available(now)]
+        if not available:
+            # Every backend is failing; try the one that failed longest ago
+            idx, _, _ = min(candidates, key=lambda item: item[1].open_until)
+            return idx
+
+        score = STRATEGIES[self.strategy]
+        idx, backend, backend_model = min(
+            available,
+            key=lambda item: (
+                score(item[1])
+                * (1 if item[1].has_model(item[2]) else AFFINITY_PENALTY),
+                random.random(),
+            ),
+        )
+
+        # Every selected request must be tracked with `start` so that the
+        # trial is released once it completes
+        if backend.open_until:
+            backend.trial_in_flight = True
+        # The model will be loaded there by this request
+        backend.loaded_models.add(backend_model)
+        return idx
+
+    def start(self, url: str) -> BackendRequest:
+        """Starts tracking a request to `url`, which begins with a backend URL."""
+        backend = None
+        for backend_url, candidate in self.backends.items():
+            if url.startswith(backend_url) and (
+                backend is None or len(backend_url) > len(backend.url)
+            ):
+                backend = candidate
+        return BackendRequest(self, backend)
+
+    def record(self, backend: OllamaBackend, latency: float, success: bool):
+        backend.requests += 1
+        backend.trial_in_flight = False
+
+        if success:
+            backend.latency = (
+                latency
+                if backend.latency is None
+                else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * backend.latency
+            )
+            backend.consecutive_failures = 0
+            backend.open_until = 0.0
+            backend.cooldown = self.cooldown
+            return
+
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        if backend.open_until or backend.consecutive_failures >= self.failure_threshold:
+            log.warning(
+                f"Ollama backend {backend.url} failed {backend.consecutive_failures} "
+                f"times, skipping it for {backend.cooldown}s"
+            )
+            backend.open_until = time.monotonic() + backend.cooldown
+            backend.cooldown = min(backend.cooldown * 2, MAX_COOLDOWN)
+
+    def should_refresh_loaded_models(self) -> bool:
+        now = time.monotonic()
+        if now - self._loaded_models_refreshed_at < LOADED_MODELS_REFRESH_INTERVAL:
+            return False
+        self._loaded_models_refreshed_at = now
+        return True
+
+    def set_loaded_models(self, url: str, models: list[str]):
+        self._get_backend(url).loaded_models = set(models)
+
+    def run_in_background(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            url: {
+                "state": backend.get_state(now),
+                "outstanding": backend.outstanding,
+                "latency": backend.latency,
+                "requests": backend.requests,
+                "failures": backend.failures,
+                "consecutive_failures": backend.consecutive_failures,
+                "loaded_models": sorted(backend.loaded_models),
+            }
+            for url, backend in self.backends.items()
+        }
+
+
+OLLAMA_BALANCER = OllamaBalancer(
+    strategy=OLLAMA_LOAD_BALANCING_STRATEGY,
+    failure_threshold=OLLAMA_CIRCUIT_BREAKER_THRESHOLD,
+    cooldown=OLLAMA_CIRCUIT_BREAKER_COOLDOWN,
+)
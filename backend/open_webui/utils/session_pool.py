@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    AIOHTTP_CLIENT_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_SIZE_PER_HOST,
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class ClientSessionPool:
+    """
+    Keeps one aiohttp session per upstream origin, so keep-alive connections,
+    TLS sessions and DNS lookups are reused across requests instead of being
+    thrown away with a per-call session.
+
+    Each upstream has its own connector capped at `limit_per_host` connections;
+    requests beyond that wait for a free connection, and a slow provider cannot
+    exhaust the connections of the others.
+
+    Sessions are created lazily on the running event loop. Do not close them;
+    release responses instead and call `close()` on shutdown.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int,
+        keepalive_timeout: float,
+        timeout: Optional[int] = None,
+    ):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def get_origin(url: str) -> str:
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Sessions cannot be used outside the loop they were created on
+            self._sessions = {}
+            self._loop = loop
+
+        origin = self.get_origin(url)
+        session = self._sessions.get(origin)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=300,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trust_env=True,
+            )
+            self._sessions[origin] = session
+        return session
+
+    async def close(self):
+        sessions = list(self._sessions.values())
+        self._sessions = {}
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                log.debug(f"Error closing session: {e}")
+
+
+SESSION_POOL = ClientSessionPool(
+    limit_per_host=AIOHTTP_CLIENT_POOL_SIZE_PER_HOST,
+    keepalive_timeout=AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    timeout=AIOHTTP_CLIENT_TIMEOUT,
+)
@@ -0,0 +1,198 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_KEY_PREFIX,
+    USER_CACHE_TTL,
+    USER_LAST_ACTIVE_UPDATE_INTERVAL,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+# Lookups made while handling the current request
+_request_cache: ContextVar[Optional[dict]] = ContextVar(
+    "user_request_cache", default=None
+)
+
+
+class UserCache:
+    """
+    Caches user rows and group memberships for authentication and access checks.
+
+    Entries are shared within a request and kept for `ttl` seconds in the
+    process. User and group mutations invalidate them locally and, when Redis
+    is configured, on every other instance through pub/sub.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        last_active_interval: int,
+        max_entries: int = 10000,
+        redis_url: str = "",
+        redis_sentinels: Optional[list] = None,
+    ):
+        self.ttl = ttl
+        self.last_active_interval = last_active_interval
+        self.max_entries = max_entries
+
+        self._users: dict[str, tuple[float, Any]] = {}
+        self._groups: dict[str, tuple[float, Any]] = {}
+        self._last_active_writes: dict[str, float] = {}
+        # Bumped on every invalidation so loads racing with one are not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self._redis_url = redis_url
+        self._redis_sentinels = redis_sentinels
+        self._redis = None
+        self._channel = f"{REDIS_KEY_PREFIX}:user-cache"
+
+    @contextmanager
+    def request_scope(self):
+        token = _request_cache.set({})
+        try:
+            yield
+        finally:
+            _request_cache.reset(token)
+
+    def _subscribe(self):
+        if self._redis is not None or not self._redis_url:
+            return
+
+        with self._lock:
+            if self._redis is not None:
+                return
+            try:
+                self._redis = get_redis_connection(
+                    self._redis_url, self._redis_sentinels, decode_responses=True
+                )
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self._channel: self._on_message})
+                pubsub.run_in_thread(sleep_time=1, daemon=True)
+            except Exception as e:
+                log.warning(f"Failed to subscribe to user cache invalidations: {e}")
+                self._redis_url = ""
+
+    def _on_message(self, message):
+        try:
+            data = json.loads(message["data"])
+        except Exception:
+            return
+
+        if data.get("type") == "user":
+            self._invalidate_user(data.get("id"))
+        elif data.get("type") == "groups":
+            self._invalidate_groups()
+
+    def _publish(self, data: dict):
+        self._subscribe()
+        if self._redis is None:
+            return
+        try:
+            self._redis.publish(self._channel, json.dumps(data))
+        except Exception as e:
+            log.warning(f"Failed to broadcast user cache invalidation: {e}")
+
+    def _get(
+        self, entries: dict, kind: str, key: str, loader: Callable[[str], Any]
+    ) -> Any:
+        self._subscribe()
+
+        request_cache = _request_cache.get()
+        if request_cache is not None and (kind, key) in request_cache:
+            return request_cache[(kind, key)]
+
+        entry = entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            value = entry[1]
+        else:
+            generation = self._generation
+            value = loader(key)
+            if self.ttl and value is not None:
+                with self._lock:
+                    if generation == self._generation:
+                        if len(entries) >= self.max_entries:
+                            entries.clear()
+                        entries[key] = (time.monotonic() + self.ttl, value)
+
+        if request_cache is not None:
+            request_cache[(kind, key)] = value
+        return value
+
+    def get_user(self, user_id: str, loader: Callable[[str], Any]):
+        user = self._get(self._users, "user", user_id, loader)
+        # Callers may modify the returned model
+        return user.model_copy() if user is not None else None
+
+    def get_groups(self, user_id: str, loader: Callable[[str], Any]) -> list:
+        return list(self._get(self._groups, "groups", user_id, loader))
+
+    def _invalidate_user(self, user_id: Optional[str]):
+        with self._lock:
+            self._generation += 1
+            self._users.pop(user_id, None)
+            self._groups.pop(user_id, None)
+
+    def _invalidate_groups(self):
+        with self._lock:
+            self._generation += 1
+            self._groups.clear()
+
+    def invalidate_user(self, user_id: str):
+        self._invalidate_user(user_id)
+        request_cache = _request_cache.get()
+        if request_cache is not None:
+            request_cache.pop(("user", user_id), None)
+            request_cache.pop(("groups", user_id), None)
+        self._publish({"type": "user", "id": user_id})
+
+    def invalidate_groups(self):
+        """Drops all cached memberships; group changes are rare."""
+        self._invalidate_groups()
+        request_cache = _request_cache.get()
+        if request_cache is not None:
+            for key in [key for key in request_cache if key[0] == "groups"]:
+                del request_cache[key]
+        self._publish({"type": "groups"})
+
+    def should_update_last_active(
+        self, user_id: str, last_active_at: Optional[int] = None
+    ) -> bool:
+        """
+        Returns True at most once per `last_active_interval` per user, and not
+        at all while the stored timestamp is still recent.
+        """
+        now = time.time()
+        if last_active_at and now - last_active_at < self.last_active_interval:
+            return False
+
+        with self._lock:
+            last_write = self._last_active_writes.get(user_id)
+            if last_write is not None and now - last_write < self.last_active_interval:
+                return False
+
+            if len(self._last_active_writes) >= self.max_entries:
+                self._last_active_writes.clear()
+            self._last_active_writes[user_id] = now
+            return True
+
+
+USER_CACHE = UserCache(
+    ttl=USER_CACHE_TTL,
+    last_active_interval=USER_LAST_ACTIVE_UPDATE_INTERVAL,
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
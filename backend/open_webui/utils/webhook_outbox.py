@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import aiohttp
+
+from open_webui.config import (
+    WEBHOOK_NOTIFICATION_CONCURRENCY,
+    WEBHOOK_NOTIFICATION_MAX_ATTEMPTS,
+    WEBHOOK_NOTIFICATION_POLL_INTERVAL,
+    WEBHOOK_NOTIFICATION_RATE_LIMIT,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.notifications import (
+    WebhookNotificationForm,
+    WebhookNotificationModel,
+    WebhookNotifications,
+)
+from open_webui.utils.session_pool import SESSION_POOL
+from open_webui.utils.webhook import get_webhook_payload, is_chat_webhook
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["WEBHOOK"])
+
+
+# A notification left sending for this long is delivered again
+STALE_TIMEOUT = 60
+# Posts time out well before their claim goes stale
+POST_TIMEOUT = 20
+# Failed notifications are kept this long, checked every PURGE_INTERVAL
+FAILED_RETENTION = 7 * 24 * 3600
+PURGE_INTERVAL = 3600
+# Notifications claimed at once for a URL
+BATCH_SIZE = 50
+# Messages posted to a chat webhook at once are joined up to this length
+MAX_BATCH_MESSAGE_LENGTH = 2000
+RETRY_BASE_DELAY = 10
+RETRY_MAX_DELAY = 3600
+
+
+class WebhookDeliveryError(Exception):
+    def __init__(self, message: str, retry: bool, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.retry = retry
+        self.retry_after = retry_after
+
+
+def get_batches(
+    url: str, notifications: list[WebhookNotificationModel]
+) -> list[list[WebhookNotificationModel]]:
+    """
+    Notifications posted together: for chat webhooks, consecutive messages
+    joined up to `MAX_BATCH_MESSAGE_LENGTH`; one at a time for other webhooks,
+    whose payload is the notification's data.
+    """
+    if not is_chat_webhook(url):
+        return [[notification] for notification in notifications]
+
+    batches = []
+    length = 0
+    for notification in notifications:
+        message_length = len(notification.message) + 2
+        if batches and length + message_length <= MAX_BATCH_MESSAGE_LENGTH:
+            batches[-1].append(notification)
+            length += message_length
+        else:
+            batches.append([notification])
+            length = message_length
+    return batches
+
+
+def get_retry_delay(attempts: int) -> int:
+    return min(RETRY_BASE_DELAY * 2**attempts, RETRY_MAX_DELAY)
+
+
+class WebhookOutbox:
+    """
+    Delivers webhook notifications (e.g. of channel messages to offline users)
+    in the background instead of in the request that caused them.
+
+    Notifications are queued in the `webhook_notification` table, so any
+    process running the outbox may deliver them, and are claimed before
+    delivery so each is posted once. Identical notifications to a URL are
+    queued once, and those for chat webhooks are posted in batches.
+
+    Notifications queued by this process are delivered right away; the
+    database is checked every `poll_interval` seconds for retries and for
+    notifications queued elsewhere.
+
+    Each URL is posted to by one delivery at a time, at most `rate_limit`
+    times per second. Failed posts are retried with exponential backoff
+    (or after the `Retry-After` of a 429) up to `max_attempts` times; posts
+    rejected for other client errors are not retried.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        rate_limit: float,
+        max_attempts: int,
+        poll_interval: float,
+    ):
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._deliveries: dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Earliest time of the next post to each URL
+        self._next_post_at: dict[str, float] = {}
+        self._purged_at = 0.0
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._task = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        # Interrupted deliveries are picked up again as stale
+        tasks = [self._task, *self._deliveries.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._wakeup = None
+        self._deliveries = {}
+
+    async def run(self):
+        """Delivers notifications until cancelled, e.g. in its own process."""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+            await SESSION_POOL.close()
+
+    async def enqueue(self, notifications: list[WebhookNotificationForm]) -> int:
+        """Queues notifications for delivery; returns the number queued."""
+        count = await asyncio.to_thread(
+            WebhookNotifications.insert_new_notifications, notifications
+        )
+        if count and self._wakeup is not None:
+            self._wakeup.set()
+        return count
+
+    async def _dispatch(self):
+        while True:
+            try:
+                now = int(time.time())
+                urls = await asyncio.to_thread(
+                    WebhookNotifications.get_due_urls, now, now - STALE_TIMEOUT
+                )
+                for url in urls:
+                    if url not in self._deliveries:
+                        self._deliveries[url] = asyncio.create_task(self._deliver(url))
+
+                if time.monotonic() - self._purged_at >= PURGE_INTERVAL:
+                    self._purged_at = time.monotonic()
+                    await asyncio.to_thread(
+                        WebhookNotifications.delete_failed_notifications,
+                        now - FAILED_RETENTION,
+                    )
+            except Exception as e:
+                log.warning(f"Failed to dispatch webhook notifications: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _deliver(self, url: str):
+        try:
+            async with self._semaphore:
+                while True:
+                    now = int(time.time())
+                    notifications = await asyncio.to_thread(
+                        WebhookNotifications.claim_notifications_by_url,
+                        url,
+                        now,
+                        now - STALE_TIMEOUT,
+                        BATCH_SIZE,
+                    )
+                    if not notifications:
+                        break
+
+                    claim_id = notifications[0].claim_id
+                    for batch in get_batches(url, notifications):
+                        # Stop when the claim went stale and another delivery
+                        # took the notifications over
+                        if not await asyncio.to_thread(
+                            WebhookNotifications.touch_notifications_by_claim_id,
+                            claim_id,
+                        ):
+                            break
+                        await self._post_batch(url, claim_id, batch)
+        except Exception as e:
+            log.exception(f"Error delivering webhook notifications: {e}")
+        finally:
+            self._deliveries.pop(url, None)
+
+    async def _post_batch(
+        self, url: str, claim_id: str, batch: list[WebhookNotificationModel]
+    ):
+        ids = [notification.id for notification in batch]
+        try:
+            await self._wait_for_rate_limit(url)
+            await self.post(url, batch)
+        except WebhookDeliveryError as e:
+            log.warning(f"Failed to post {len(batch)} webhook notifications: {e}")
+            attempts = max(notification.attempts for notification in batch)
+            await asyncio.to_thread(
+                WebhookNotifications.reschedule_notifications_by_ids,
+                ids,
+                claim_id,
+                int(time.time()) + (e.retry_after or get_retry_delay(attempts)),
+                str(e),
+                # Client errors other than 429 are not retried
+                self.max_attempts if e.retry else 0,
+            )
+            return
+
+        await asyncio.to_thread(
+            WebhookNotifications.delete_notifications_by_ids, ids, claim_id
+        )
+
+    async def _wait_for_rate_limit(self, url: str):
+        if self.rate_limit <= 0:
+            return
+        now = time.monotonic()
+        next_post_at = self._next_post_at.get(url, now)
+        if next_post_at > now:
+            await asyncio.sleep(next_post_at - now)
+        self._next_post_at[url] = max(next_post_at, now) + 1 / self.rate_limit
+
+    async def post(self, url: str, batch: list[WebhookNotificationModel]):
+        first = batch[0]
+        message = "\n\n".join(notification.message for notification in batch)
+        try:
+            payload = get_webhook_payload(first.name, url, message, first.data or {})
+        except Exception as e:
+            raise WebhookDeliveryError(f"Invalid payload: {e}", retry=False)
+
+        try:
+            async with SESSION_POOL.get_session(url).post(
+                url, json=payload, timeout=aiohttp.ClientTimeout(total=POST_TIMEOUT)
+            ) as r:
+                if r.status == 429 or r.status >= 500:
+                    retry_after = r.headers.get("Retry-After", "")
+                    raise WebhookDeliveryError(
+                        f"HTTP {r.status}",
+                        retry=True,
+                        retry_after=int(retry_after) if retry_after.isdigit() else None,
+                    )
+                if r.status >= 400:
+                    raise WebhookDeliveryError(f"HTTP {r.status}", retry=False)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise WebhookDeliveryError(str(e) or type(e).__name__, retry=True)
+
+
+WEBHOOK_OUTBOX = WebhookOutbox(
+    concurrency=WEBHOOK_NOTIFICATION_CONCURRENCY,
+    rate_limit=WEBHOOK_NOTIFICATION_RATE_LIMIT,
+    max_attempts=WEBHOOK_NOTIFICATION_MAX_ATTEMPTS,
+    poll_interval=WEBHOOK_NOTIFICATION_POLL_INTERVAL,
+)
@@ -172,13 +172,19 @@ export const deleteChannelById = async (token: string = '', channel_id: string)
 export const getChannelMessages = async (
 	token: string = '',
 	channel_id: string,
-	skip: number = 0,
+	before: { created_at: number; id: string } | null = null,
 	limit: number = 50
 ) => {
 	let error = null;
 
+	const searchParams = new URLSearchParams({ limit: `${limit}` });
+	if (before !== null) {
+		searchParams.append('before', `${before.created_at}`);
+		searchParams.append('before_id', before.id);
+	}
+
 	const res = await fetch(
-		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?skip=${skip}&limit=${limit}`,
+		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?${searchParams.toString()}`,
 		{
 			method: 'GET',
 			headers: {
@@ -212,13 +218,19 @@ export const getChannelThreadMessages = async (
 	token: string = '',
 	channel_id: string,
 	message_id: string,
-	skip: number = 0,
+	before: { created_at: number; id: string } | null = null,
 	limit: number = 50
 ) => {
 	let error = null;
 
+	const searchParams = new URLSearchParams({ limit: `${limit}` });
+	if (before !== null) {
+		searchParams.append('before', `${before.created_at}`);
+		searchParams.append('before_id', before.id);
+	}
+
 	const res = await fetch(
-		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages/${message_id}/thread?skip=${skip}&limit=${limit}`,
+		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages/${message_id}/thread?${searchParams.toString()}`,
 		{
 			method: 'GET',
 			headers: {
@@ -1,4 +1,5 @@
 import { WEBUI_API_BASE_URL } from '$lib/constants';
+import type { Socket } from 'socket.io-client';
 
 export const uploadFile = async (token: string, file: File) => {
 	const data = new FormData();
@@ -30,6 +31,80 @@ export const uploadFile = async (token: string, file: File) => {
 	return res;
 };
 
+export const FILE_PROCESSING_STATUSES = ['pending', 'extracting', 'embedding'];
+
+export const getFileProcessStatusById = async (token: string, id: string) => {
+	let error = null;
+
+	const res = await fetch(`${WEBUI_API_BASE_URL}/files/${id}/process/status`, {
+		method: 'GET',
+		headers: {
+			Accept: 'application/json',
+			authorization: `Bearer ${token}`
+		}
+	})
+		.then(async (res) => {
+			if (!res.ok) throw await res.json();
+			return res.json();
+		})
+		.catch((err) => {
+			error = err.detail;
+			console.log(err);
+			return null;
+		});
+
+	if (error) {
+		throw error;
+	}
+
+	return res;
+};
+
+// Resolves with the processed file once a file uploaded for background
+// processing is ready or failed, as pushed through "chat-events"
+export const waitForFileProcessing = async (socket: Socket | null, token: string, file) => {
+	if (!FILE_PROCESSING_STATUSES.includes(file?.status)) {
+		return file;
+	}
+
+	const result = await new Promise((resolve) => {
+		const done = (result) => {
+			socket?.off('chat-events', eventHandler);
+			socket?.off('connect', checkStatus);
+			resolve(result);
+		};
+
+		const eventHandler = (event) => {
+			const data = event?.data?.data ?? null;
+			if (
+				event?.data?.type === 'file:status' &&
+				data?.file_id === file.id &&
+				!FILE_PROCESSING_STATUSES.includes(data?.status)
+			) {
+				done(data);
+			}
+		};
+
+		// Events sent before the handler was added or while disconnected are missed
+		const checkStatus = async () => {
+			const result = await getFileProcessStatusById(token, file.id).catch((error) => ({
+				status: 'failed',
+				error
+			}));
+			if (!FILE_PROCESSING_STATUSES.includes(result?.status)) {
+				done(result);
+			}
+		};
+
+		socket?.on('chat-events', eventHandler);
+		socket?.on('connect', checkStatus);
+		checkStatus();
+	});
+
+	const processed = await getFileById(token, file.id);
+	return result?.error ? { ...processed, error: result.error } : processed;
+};
+
 export const uploadDir = async (token: string) => {
 	let error = null;
 